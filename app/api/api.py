@@ -2,7 +2,15 @@
 from fastapi import APIRouter
 
 # Импорт роутеров для различных эндпоинтов
-from app.api.endpoints import auth, users, movies, genres, directors, favorites
+from app.api.endpoints import (
+    auth,
+    users,
+    movies,
+    genres,
+    directors,
+    favorites,
+    monitoring,
+)
 
 # Создание основного роутера для API
 api_router = APIRouter()
@@ -19,3 +27,5 @@ api_router.include_router(genres.router, prefix="/genres", tags=["genres"])
 api_router.include_router(directors.router, prefix="/directors", tags=["directors"])
 # Подключение роутера избранных фильмов с префиксом "/favorites" и тегом "favorites"
 api_router.include_router(favorites.router, prefix="/favorites", tags=["favorites"])
+# Подключение роутера мониторинга с префиксом "/monitoring" и тегом "monitoring"
+api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
@@ -0,0 +1,74 @@
+# Импорт необходимых модулей FastAPI
+from fastapi import Depends, HTTPException, Query
+
+# Импорт asyncio для общей блокировки загрузчиков запроса
+import asyncio
+
+# Импорт Optional для аннотаций типов
+from typing import Optional
+
+# Импорт SQLAlchemy для работы с базой данных
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Импорт функции для получения асинхронной сессии для чтения
+from app.db.session import get_async_read_db
+
+# Импорт пакетного загрузчика
+from app.core.dataloader import DataLoader
+
+# Импорт асинхронных CRUD-объектов каталога
+from app.crud.director import async_crud_director
+from app.crud.genre import async_crud_genre
+from app.crud.movie import async_crud_movie
+
+# Максимальное количество ID в одном запросе ?ids=
+MAX_BATCH_IDS = 1000
+
+
+# Разбор параметра ids=1,2,3 для пакетного получения объектов по списку ID
+def parse_ids(
+    # Список ID через запятую
+    ids: Optional[str] = Query(None, pattern=r"^\d+(,\d+)*$"),
+) -> Optional[list[int]]:
+    if ids is None:
+        return None
+    values = [int(value) for value in ids.split(",")]
+    if len(values) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request"
+        )
+    return values
+
+
+# Загрузчик объектов по ID поверх AsyncCRUDBase.get_many (None для отсутствующих)
+def crud_loader(crud, db: AsyncSession, lock: asyncio.Lock) -> DataLoader:
+    async def batch_load(ids: list[int]) -> list:
+        found = {obj.id: obj for obj in await crud.get_many(db, ids=ids)}
+        return [found.get(id) for id in ids]
+
+    return DataLoader(batch_load, lock=lock)
+
+
+# Загрузчики каталога в рамках одного запроса: обращения к одной сущности из
+# разных мест обработчика объединяются в один запрос WHERE id IN (...)
+class Loaders:
+    def __init__(self, db: AsyncSession):
+        # Загрузчики работают с одной сессией, поэтому их пакеты выполняются по очереди
+        lock = asyncio.Lock()
+        self.movies = crud_loader(async_crud_movie, db, lock)
+        self.genres = crud_loader(async_crud_genre, db, lock)
+        self.directors = crud_loader(async_crud_director, db, lock)
+
+
+# Зависимость: загрузчики текущего запроса
+async def get_loaders(
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+) -> Loaders:
+    return Loaders(db)
+
+
+# Объекты по списку ID в порядке запроса (повторы и отсутствующие пропускаются)
+async def load_by_ids(loader: DataLoader, ids: list[int]) -> list:
+    objs = await loader.load_many(dict.fromkeys(ids))
+    return [obj for obj in objs if obj is not None]
@@ -13,9 +13,15 @@ from pydantic import ValidationError
 # Импорт SQLAlchemy для работы с базой данных
 from sqlalchemy.orm import Session
 
+# Импорт модуля для работы со временем
+import time
+
 # Импорт модуля безопасности и конфигурации
 from app.core import security, config
 
+# Импорт in-process кэша
+from app.core.cache import MISSING, get_cache
+
 # Импорт функции для получения сессии базы данных
 from app.db.session import get_db as get_db_session
 
@@ -30,15 +36,21 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{config.settings.API_V1_STR}/auth/login"
 )
 
+# Кэш проверенных токенов: токен -> имя пользователя
+# Каждая запись живёт ровно до истечения срока действия токена (exp)
+token_cache = (
+    get_cache("auth:tokens", maxsize=config.settings.AUTH_TOKEN_CACHE_SIZE, ttl=None)
+    if config.settings.AUTH_TOKEN_CACHE_SIZE > 0
+    else None
+)
 
-# Функция для получения текущего пользователя из JWT токена
-def get_current_user(
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
-    # Зависимость для получения токена из запроса
-    token: str = Depends(reusable_oauth2),
-) -> User:
-    # Пытаемся декодировать и проверить JWT токен
+
+# Декодирование и проверка JWT токена с кэшированием результата
+def decode_token(token: str) -> TokenData:
+    if token_cache is not None:
+        username = token_cache.get(token)
+        if username is not MISSING:
+            return TokenData(username=username)
     try:
         # Декодируем токен с использованием секретного ключа и алгоритма из конфигурации
         payload = jwt.decode(
@@ -52,10 +64,26 @@ def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+    # Кэшируем только токены с временем истечения: запись удаляется в момент exp
+    expires_in = payload.get("exp", 0) - time.time()
+    if token_cache is not None and expires_in > 0:
+        token_cache.set(token, token_data.username, ttl=expires_in)
+    return token_data
+
+
+# Функция для получения текущего пользователя из JWT токена
+def get_current_user(
+    # Зависимость для получения сессии базы данных
+    db: Session = Depends(get_db_session),
+    # Зависимость для получения токена из запроса
+    token: str = Depends(reusable_oauth2),
+) -> User:
+    # Декодируем и проверяем JWT токен (повторные запросы с тем же токеном — из кэша)
+    token_data = decode_token(token)
     # Импортируем CRUD операции для пользователей
     from app.crud.user import crud_user
 
-    # Получаем пользователя из базы данных по имени пользователя из токена
+    # Получаем пользователя по имени из токена (через короткоживущий кэш)
     user = crud_user.get_by_username(db, username=token_data.username)
     # Если пользователь не найден, возвращаем ошибку
     if not user:
@@ -2,10 +2,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 
 # Импорт SQLAlchemy для работы с базой данных
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-# Импорт функции для получения сессии базы данных
-from app.db.session import get_db as get_db_session
+# Импорт функции для получения асинхронной сессии базы данных
+from app.db.session import get_async_db
 
 # Импорт схемы токена для ответа
 from app.schemas.token import Token
@@ -14,10 +14,13 @@ from app.schemas.token import Token
 from app.schemas.user import UserCreate
 
 # Импорт сервиса аутентификации
-from app.services.auth import login_user
+from app.services.auth import login_user_async
 
 # Импорт CRUD операций для пользователей
-from app.crud.user import crud_user
+from app.crud.user import async_crud_user
+
+# Импорт пула процессов для bcrypt
+from app.core.password_pool import password_pool
 
 # Импорт OAuth2PasswordRequestForm для обработки формы входа
 from fastapi.security import OAuth2PasswordRequestForm
@@ -27,27 +30,28 @@ router = APIRouter()
 
 
 # Эндпоинт для входа пользователя в систему
+# Проверка пароля выполняется в пуле процессов и не занимает поток веб-сервера
 @router.post("/login", response_model=Token)
-def login_for_access_token(
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
+async def login_for_access_token(
+    # Зависимость для получения асинхронной сессии базы данных
+    db: AsyncSession = Depends(get_async_db),
     # Зависимость для получения данных формы входа
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
     # Вызов сервиса аутентификации с данными пользователя
-    return login_user(db, form_data.username, form_data.password)
+    return await login_user_async(db, form_data.username, form_data.password)
 
 
 # Эндпоинт для регистрации нового пользователя
 @router.post("/register", response_model=dict)
-def register_user(
+async def register_user(
     # Параметр запроса с данными нового пользователя
     user_in: UserCreate,
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
+    # Зависимость для получения асинхронной сессии базы данных
+    db: AsyncSession = Depends(get_async_db),
 ):
     # Проверка существования пользователя с таким именем
-    user = crud_user.get_by_username(db, username=user_in.username)
+    user = await async_crud_user.get_by_username(db, username=user_in.username)
     if user:
         # Если пользователь с таким именем уже существует, возвращаем ошибку
         raise HTTPException(
@@ -55,14 +59,18 @@ def register_user(
             detail="The user with this username already exists",
         )
     # Проверка существования пользователя с такой почтой
-    user = crud_user.get_by_email(db, email=user_in.email)
+    user = await async_crud_user.get_by_email(db, email=user_in.email)
     if user:
         # Если пользователь с такой почтой уже существует, возвращаем ошибку
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists",
         )
+    # Хеширование пароля в пуле процессов
+    hashed_password = await password_pool.hash(user_in.password)
     # Создание нового пользователя в базе данных
-    user = crud_user.create(db, obj_in=user_in)
+    user = await async_crud_user.create(
+        db, obj_in=user_in, hashed_password=hashed_password
+    )
     # Возвращаем успешный ответ
     return {"message": "User created successfully"}
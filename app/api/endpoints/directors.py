@@ -1,11 +1,15 @@
 # Импорт необходимых модулей FastAPI для создания API
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+# Импорт Optional для аннотаций типов
+from typing import Optional
 
 # Импорт SQLAlchemy для работы с базой данных
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # Импорт функции для получения сессии базы данных
-from app.db.session import get_db as get_db_session
+from app.db.session import get_async_read_db, get_db as get_db_session
 
 # Импорт модели режиссера
 from app.models.director import Director
@@ -17,7 +21,16 @@ from app.models.user import User
 from app.schemas.director import Director, DirectorCreate, DirectorUpdate
 
 # Импорт CRUD операций для режиссеров
-from app.crud.director import crud_director
+from app.crud.director import async_crud_director, crud_director
+
+# Импорт зависимости HTTP-кэширования (ETag / 304 Not Modified)
+from app.api.http_cache import ETagGuard
+
+# Импорт параметров и функции пагинации
+from app.api.pagination import PageParams, paginate_async
+
+# Импорт пакетного получения объектов по списку ID
+from app.api.batching import Loaders, get_loaders, load_by_ids, parse_ids
 
 # Импорт зависимостей для аутентификации
 from app.api.dependencies import get_current_active_superuser
@@ -43,31 +56,46 @@ def create_director(
 
 
 # Эндпоинт для получения списка режиссеров
-@router.get("/", response_model=list[Director])
-def read_directors(
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
-    # Параметр для пропуска записей (пагинация)
-    skip: int = 0,
-    # Параметр для ограничения количества записей (пагинация)
-    limit: int = 100,
+@router.get(
+    "/",
+    response_model=list[Director],
+    dependencies=[Depends(ETagGuard("directors"))],
+)
+async def read_directors(
+    # Объект ответа для установки заголовка X-Next-Cursor
+    response: Response,
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+    # Параметры пагинации (skip/limit или cursor/limit) и сортировки
+    page: PageParams = Depends(),
+    # Пакетное получение по списку ID (ids=1,2,3) вместо страницы
+    ids: Optional[list[int]] = Depends(parse_ids),
+    # Загрузчики текущего запроса (один запрос WHERE id IN (...) на сущность)
+    loaders: Loaders = Depends(get_loaders),
 ):
+    # Режиссеры по списку ID в порядке запроса
+    if ids is not None:
+        return await load_by_ids(loaders.directors, ids)
     # Получаем список режиссеров из базы данных
-    directors = crud_director.get_multi(db, skip=skip, limit=limit)
+    directors = await paginate_async(async_crud_director, db, response, page)
     # Возвращаем список режиссеров
     return directors
 
 
 # Эндпоинт для получения режиссера по ID
-@router.get("/{director_id}", response_model=Director)
-def read_director(
+@router.get(
+    "/{director_id}",
+    response_model=Director,
+    dependencies=[Depends(ETagGuard("directors"))],
+)
+async def read_director(
     # Параметр пути - ID режиссера
     director_id: int,
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     # Получаем режиссера из базы данных по ID
-    director = crud_director.get(db, id=director_id)
+    director = await async_crud_director.get(db, id=director_id)
     # Если режиссер не найден, возвращаем ошибку 404
     if not director:
         raise HTTPException(status_code=404, detail="Director not found")
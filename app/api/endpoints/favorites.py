@@ -1,9 +1,16 @@
 # Импорт необходимых модулей FastAPI для создания API
 from fastapi import APIRouter, Depends, HTTPException, status
 
+# Импорт ответов с сериализацией orjson и обычного JSON
+from fastapi.responses import JSONResponse, ORJSONResponse
+
 # Импорт SQLAlchemy для работы с базой данных
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+# Импорт настроек приложения
+from app.core.config import settings
+
 # Импорт функции для получения сессии базы данных
 from app.db.session import get_db as get_db_session
 
@@ -20,14 +27,27 @@ from sqlalchemy.orm import joinedload
 from app.models.user import User
 
 # Импорт схемы добавления в избранное
-from app.schemas.favorite import Favorite as FavoriteSchema, FavoriteCreate
+from app.schemas.favorite import (
+    Favorite as FavoriteSchema,
+    FavoriteBatch,
+    FavoriteCreate,
+)
 
 # Импорт CRUD операций для избранных фильмов
 from app.crud.favorite import crud_favorite
 
+# Импорт CRUD операций для фильмов
+from app.crud.movie import crud_movie
+
+# Импорт очереди отложенной записи избранного
+from app.services.favorites_writer import favorites_writer
+
 # Импорт зависимостей для аутентификации
 from app.api.dependencies import get_current_active_user
 
+# Импорт параметров выборки полей и раскрытия связей
+from app.api.projection import FieldsParams
+
 # Создание роутера для эндпоинтов избранных фильмов
 router = APIRouter()
 
@@ -42,36 +62,95 @@ def add_to_favorites(
     # Зависимость для проверки прав активного пользователя
     current_user: User = Depends(get_current_active_user),
 ):
+    # Фильм должен существовать (пакетное добавление несуществующие фильмы пропускает)
+    if not crud_movie.get(db, id=favorite_in.movie_id):
+        raise HTTPException(status_code=404, detail="Movie not found")
+    # Режим отложенной записи: изменение ставится в очередь, ответ 202 без id записи
+    # (удалить фильм из избранного можно по его ID: DELETE /favorites/movies/{movie_id})
+    if settings.FAVORITES_WRITE_BEHIND:
+        return _enqueue_add(db, current_user.id, favorite_in.movie_id)
     try:
-        # Проверяем, не добавлен ли уже этот фильм в избранное для данного пользователя
-        existing = crud_favorite.get_by_user_and_movie(
+        # Повтор проверяется уникальным индексом (user_id, movie_id) без отдельного SELECT;
+        # счётчик популярности фильма обновляется в той же транзакции
+        favorite = crud_favorite.add(
             db, user_id=current_user.id, movie_id=favorite_in.movie_id
         )
+    except IntegrityError:
+        db.rollback()
         # Если фильм уже в избранном, возвращаем ошибку
-        if existing:
-            raise HTTPException(status_code=400, detail="Movie already in favorites")
-        
-        # Создаем новый объект Favorite напрямую
-        from datetime import datetime
-        favorite = FavoriteModel(
-            user_id=current_user.id,
-            movie_id=favorite_in.movie_id,
-            created_at=datetime.utcnow()
+        raise HTTPException(status_code=400, detail="Movie already in favorites")
+
+    # Возвращаем данные в виде dict
+    return {
+        "id": favorite.id,
+        "user_id": favorite.user_id,
+        "movie_id": favorite.movie_id,
+        "created_at": favorite.created_at.isoformat() if favorite.created_at else None
+    }
+
+
+# Постановка добавления в очередь отложенной записи с проверкой повтора с учётом
+# ещё не зафиксированных изменений пользователя
+def _enqueue_add(db: Session, user_id: int, movie_id: int) -> JSONResponse:
+    pending = favorites_writer.state(user_id, movie_id)
+    if pending is None:
+        exists = crud_favorite.get_by_user_and_movie(
+            db, user_id=user_id, movie_id=movie_id
         )
-        db.add(favorite)
-        db.commit()
-        db.refresh(favorite)
-        
-        # Возвращаем данные в виде dict
-        return {
-            "id": favorite.id,
-            "user_id": favorite.user_id,
-            "movie_id": favorite.movie_id,
-            "created_at": favorite.created_at.isoformat() if favorite.created_at else None
-        }
-    except Exception as e:
-        print(f"Error in add_to_favorites: {e}")
-        raise
+    else:
+        exists = pending
+    if exists:
+        raise HTTPException(status_code=400, detail="Movie already in favorites")
+    favorites_writer.add(user_id, movie_id)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "id": None,
+            "user_id": user_id,
+            "movie_id": movie_id,
+            "created_at": None,
+        },
+    )
+
+
+# Эндпоинт для пакетного добавления фильмов в избранное одним запросом к базе данных
+# Уже добавленные и несуществующие фильмы пропускаются
+@router.post("/batch", response_model=dict)
+def add_many_to_favorites(
+    # Тело запроса со списком ID фильмов
+    batch_in: FavoriteBatch,
+    # Зависимость для получения сессии базы данных
+    db: Session = Depends(get_db_session),
+    # Зависимость для проверки прав активного пользователя
+    current_user: User = Depends(get_current_active_user),
+):
+    # Сначала фиксируем отложенные изменения пользователя, чтобы сохранить их порядок
+    favorites_writer.flush(db, user_id=current_user.id)
+    # Добавляем фильмы одним INSERT и возвращаем количество добавленных записей
+    added = crud_favorite.add_many(
+        db, user_id=current_user.id, movie_ids=batch_in.movie_ids
+    )
+    return {"added": added}
+
+
+# Эндпоинт для пакетного удаления фильмов из избранного одним DELETE
+# POST, а не DELETE с телом: тело DELETE-запроса отбрасывают многие клиенты и прокси
+@router.post("/batch/delete", response_model=dict)
+def remove_many_from_favorites(
+    # Тело запроса со списком ID фильмов
+    batch_in: FavoriteBatch,
+    # Зависимость для получения сессии базы данных
+    db: Session = Depends(get_db_session),
+    # Зависимость для проверки прав активного пользователя
+    current_user: User = Depends(get_current_active_user),
+):
+    # Сначала фиксируем отложенные изменения пользователя, чтобы сохранить их порядок
+    favorites_writer.flush(db, user_id=current_user.id)
+    # Удаляем фильмы одним DELETE и возвращаем количество удалённых записей
+    removed = crud_favorite.remove_many(
+        db, user_id=current_user.id, movie_ids=batch_in.movie_ids
+    )
+    return {"removed": removed}
 
 
 # Эндпоинт для получения списка избранных фильмов текущего пользователя
@@ -81,7 +160,17 @@ def read_favorites(
     current_user: User = Depends(get_current_active_user),
     # Зависимость для получения сессии базы данных
     db: Session = Depends(get_db_session),
+    # Выборка полей фильма (fields=) и раскрытие его жанра и режиссёра (expand=)
+    fields: FieldsParams = Depends(),
 ):
+    # Пользователь видит свои ещё не зафиксированные изменения (отложенная запись)
+    favorites_writer.flush(db, user_id=current_user.id)
+    # Быстрый режим: один Core-запрос только нужных колонок, сериализация orjson
+    if settings.FAST_LIST_RESPONSES or fields.is_sparse:
+        rows = crud_favorite.get_rows_by_user(
+            db, user_id=current_user.id, projection=fields.projection()
+        )
+        return ORJSONResponse(rows)
     # Получаем все избранные фильмы текущего пользователя с загрузкой связанных данных о фильме
     favorites = (
         db.query(FavoriteModel)
@@ -111,12 +200,46 @@ def remove_from_favorites(
     # Проверяем, что пользователь пытается удалить только свою запись
     if favorite.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    # Режим отложенной записи: удаление ставится в очередь
+    if settings.FAVORITES_WRITE_BEHIND:
+        if favorites_writer.state(current_user.id, favorite.movie_id) is False:
+            raise HTTPException(status_code=404, detail="Favorite not found")
+        favorites_writer.remove(current_user.id, favorite.movie_id)
+        return {"message": "Movie removed from favorites"}
     # Удаляем запись из избранного
     crud_favorite.remove(db, id=favorite_id)
     # Возвращаем сообщение об успешном удалении
     return {"message": "Movie removed from favorites"}
 
 
+# Эндпоинт для удаления фильма из избранного по ID фильма: не требует id записи,
+# которого нет в ответе 202 при отложенной записи
+@router.delete("/movies/{movie_id}", response_model=dict)
+def remove_movie_from_favorites(
+    # Параметр пути - ID фильма
+    movie_id: int,
+    # Зависимость для получения сессии базы данных
+    db: Session = Depends(get_db_session),
+    # Зависимость для проверки прав активного пользователя
+    current_user: User = Depends(get_current_active_user),
+):
+    # Режим отложенной записи: наличие проверяется с учётом очереди пользователя
+    if settings.FAVORITES_WRITE_BEHIND:
+        exists = favorites_writer.state(current_user.id, movie_id)
+        if exists is None:
+            exists = crud_favorite.get_by_user_and_movie(
+                db, user_id=current_user.id, movie_id=movie_id
+            )
+        if not exists:
+            raise HTTPException(status_code=404, detail="Favorite not found")
+        favorites_writer.remove(current_user.id, movie_id)
+        return {"message": "Movie removed from favorites"}
+    # Удаляем запись одним DELETE; если её не было, возвращаем ошибку 404
+    if not crud_favorite.remove_many(db, user_id=current_user.id, movie_ids=[movie_id]):
+        raise HTTPException(status_code=404, detail="Favorite not found")
+    return {"message": "Movie removed from favorites"}
+
+
 # Эндпоинт для очистки всех избранных фильмов текущего пользователя
 @router.delete("/", response_model=dict)
 def clear_favorites(
@@ -125,12 +248,9 @@ def clear_favorites(
     # Зависимость для проверки прав активного пользователя
     current_user: User = Depends(get_current_active_user),
 ):
-    # Получаем все избранные фильмы текущего пользователя
-    favorites = db.query(FavoriteModel).filter(FavoriteModel.user_id == current_user.id).all()
-    # Удаляем каждую запись из избранного
-    for favorite in favorites:
-        db.delete(favorite)
-    # Фиксируем изменения в базе данных
-    db.commit()
+    # Сначала фиксируем отложенные изменения пользователя, чтобы очистить и их
+    favorites_writer.flush(db, user_id=current_user.id)
+    # Удаляем все записи избранного пользователя одним DELETE без загрузки объектов
+    removed = crud_favorite.clear(db, user_id=current_user.id)
     # Возвращаем сообщение об успешном удалении всех фильмов
-    return {"message": "All movies removed from favorites"}
+    return {"message": "All movies removed from favorites", "removed": removed}
@@ -1,11 +1,15 @@
 # Импорт необходимых модулей FastAPI для создания API
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+# Импорт Optional для аннотаций типов
+from typing import Optional
 
 # Импорт SQLAlchemy для работы с базой данных
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 # Импорт функции для получения сессии базы данных
-from app.db.session import get_db as get_db_session
+from app.db.session import get_async_read_db, get_db as get_db_session
 
 # Импорт модели жанра
 from app.models.genre import Genre
@@ -17,7 +21,16 @@ from app.models.user import User
 from app.schemas.genre import Genre, GenreCreate, GenreUpdate
 
 # Импорт CRUD операций для жанров
-from app.crud.genre import crud_genre
+from app.crud.genre import async_crud_genre, crud_genre
+
+# Импорт зависимости HTTP-кэширования (ETag / 304 Not Modified)
+from app.api.http_cache import ETagGuard
+
+# Импорт параметров и функции пагинации
+from app.api.pagination import PageParams, paginate_async
+
+# Импорт пакетного получения объектов по списку ID
+from app.api.batching import Loaders, get_loaders, load_by_ids, parse_ids
 
 # Импорт зависимостей для аутентификации
 from app.api.dependencies import get_current_active_superuser
@@ -48,31 +61,46 @@ def create_genre(
 
 
 # Эндпоинт для получения списка жанров
-@router.get("/", response_model=list[Genre])
-def read_genres(
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
-    # Параметр для пропуска записей (пагинация)
-    skip: int = 0,
-    # Параметр для ограничения количества записей (пагинация)
-    limit: int = 100,
+@router.get(
+    "/",
+    response_model=list[Genre],
+    dependencies=[Depends(ETagGuard("genres"))],
+)
+async def read_genres(
+    # Объект ответа для установки заголовка X-Next-Cursor
+    response: Response,
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+    # Параметры пагинации (skip/limit или cursor/limit) и сортировки
+    page: PageParams = Depends(),
+    # Пакетное получение по списку ID (ids=1,2,3) вместо страницы
+    ids: Optional[list[int]] = Depends(parse_ids),
+    # Загрузчики текущего запроса (один запрос WHERE id IN (...) на сущность)
+    loaders: Loaders = Depends(get_loaders),
 ):
+    # Жанры по списку ID в порядке запроса
+    if ids is not None:
+        return await load_by_ids(loaders.genres, ids)
     # Получаем список жанров из базы данных
-    genres = crud_genre.get_multi(db, skip=skip, limit=limit)
+    genres = await paginate_async(async_crud_genre, db, response, page)
     # Возвращаем список жанров
     return genres
 
 
 # Эндпоинт для получения жанра по ID
-@router.get("/{genre_id}", response_model=Genre)
-def read_genre(
+@router.get(
+    "/{genre_id}",
+    response_model=Genre,
+    dependencies=[Depends(ETagGuard("genres"))],
+)
+async def read_genre(
     # Параметр пути - ID жанра
     genre_id: int,
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     # Получаем жанр из базы данных по ID
-    genre = crud_genre.get(db, id=genre_id)
+    genre = await async_crud_genre.get(db, id=genre_id)
     # Если жанр не найден, возвращаем ошибку 404
     if not genre:
         raise HTTPException(status_code=404, detail="Genre not found")
@@ -0,0 +1,97 @@
+# Импорт необходимых модулей FastAPI для создания API
+from fastapi import APIRouter, Depends
+
+# Импорт модели пользователя
+from app.models.user import User
+
+# Импорт счётчиков in-process кэшей
+from app.core.cache import cache_stats
+
+# Импорт пула процессов для bcrypt
+from app.core.password_pool import password_pool
+
+# Импорт очереди отложенной записи избранного
+from app.services.favorites_writer import favorites_writer
+
+# Импорт снимка каталога
+from app.services.catalog_snapshot import catalog_snapshot
+
+# Импорт индекса рекомендаций
+from app.services.recommendations import recommendation_index
+
+# Импорт движков базы данных и статистики пулов соединений
+from app.db.engine import pool_stats
+from app.db import session
+
+# Импорт зависимостей для аутентификации
+from app.api.dependencies import get_current_active_superuser
+
+# Создание роутера для эндпоинтов мониторинга
+router = APIRouter()
+
+
+# Эндпоинт со счётчиками кэшей (попадания, промахи, вытеснения)
+@router.get("/cache", response_model=dict)
+def read_cache_stats(
+    # Зависимость для проверки прав суперпользователя
+    current_user: User = Depends(get_current_active_superuser),
+):
+    # Возвращаем статистику всех кэшей процесса
+    return cache_stats()
+
+
+# Эндпоинт с метриками пула bcrypt (глубина очереди, задержка хеширования)
+@router.get("/password-pool", response_model=dict)
+def read_password_pool_stats(
+    # Зависимость для проверки прав суперпользователя
+    current_user: User = Depends(get_current_active_superuser),
+):
+    # Возвращаем метрики пула процессов
+    return password_pool.stats()
+
+
+# Эндпоинт с метриками отложенной записи избранного (глубина очереди, фиксации)
+@router.get("/favorites-writer", response_model=dict)
+def read_favorites_writer_stats(
+    # Зависимость для проверки прав суперпользователя
+    current_user: User = Depends(get_current_active_superuser),
+):
+    # Возвращаем метрики очереди отложенной записи
+    return favorites_writer.stats()
+
+
+# Эндпоинт с состоянием снимка каталога (актуальность, размер, память на фильм)
+@router.get("/catalog-snapshot", response_model=dict)
+def read_catalog_snapshot_stats(
+    # Зависимость для проверки прав суперпользователя
+    current_user: User = Depends(get_current_active_superuser),
+):
+    # Возвращаем статистику снимка каталога процесса
+    return catalog_snapshot.stats()
+
+
+# Эндпоинт со статистикой пулов соединений с базой данных
+@router.get("/db", response_model=dict)
+def read_db_pool_stats(
+    # Зависимость для проверки прав суперпользователя
+    current_user: User = Depends(get_current_active_superuser),
+):
+    # Возвращаем статистику каждого движка (реплика — только если настроена)
+    stats = {
+        "primary": pool_stats(session.engine),
+        "primary_async": pool_stats(session.async_engine),
+    }
+    if session.read_engine is not session.engine:
+        stats["replica"] = pool_stats(session.read_engine)
+        stats["replica_async"] = pool_stats(session.async_read_engine)
+    return stats
+
+
+# Эндпоинт с состоянием индекса рекомендаций (размер, память, ожидающие изменения)
+@router.get("/recommendations", response_model=dict)
+def read_recommendation_stats(
+    # Зависимость для проверки прав суперпользователя
+    current_user: User = Depends(get_current_active_superuser),
+):
+    # Возвращаем статистику индекса рекомендаций процесса
+    return recommendation_index.stats()
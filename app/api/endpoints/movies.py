@@ -1,24 +1,73 @@
 # Импорт необходимых модулей FastAPI для создания API
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+
+# Импорт потокового ответа для выгрузки каталога и ответа с сериализацией orjson
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+# Импорт io для построчного чтения загруженного файла
+import io
+
+# Импорт Optional для аннотаций типов
+from typing import Optional
 
 # Импорт SQLAlchemy для работы с базой данных
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+# Импорт настроек приложения
+from app.core.config import settings
+
 # Импорт функции для получения сессии базы данных
-from app.db.session import get_db as get_db_session
+from app.db.session import get_async_read_db, get_db as get_db_session, get_read_db
 
 # Импорт модели фильма
 from app.models.movie import Movie
 
 # Импорт схем фильма (для запроса и ответа)
-from app.schemas.movie import Movie, MovieCreate, MovieUpdate
+from app.schemas.movie import (
+    Movie,
+    MovieCreate,
+    MovieFacets,
+    MovieFilter,
+    MovieImportReport,
+    MovieRecommendation,
+    MovieSearchResult,
+    MovieUpdate,
+)
 
 # Импорт CRUD операций для фильмов
-from app.crud.movie import crud_movie
+from app.crud.movie import async_crud_movie, crud_movie
 
 # Импорт модели пользователя
 from app.models.user import User
 
+# Импорт сервиса потоковой выгрузки каталога
+from app.services.catalog_export import MEDIA_TYPES, stream_export
+
+# Импорт сервиса массового импорта каталога
+from app.services.catalog_import import detect_format, import_stream
+
+# Импорт зависимости HTTP-кэширования (ETag / 304 Not Modified)
+from app.api.http_cache import ETagGuard
+
+# Импорт параметров и функции пагинации
+from app.api.pagination import PageParams, paginate_async
+
+# Импорт пакетного получения объектов по списку ID
+from app.api.batching import Loaders, get_loaders, load_by_ids, parse_ids
+
+# Импорт параметров выборки полей и раскрытия связей
+from app.api.projection import FieldsParams
+
 # Импорт зависимостей для проверки прав доступа
 from app.api.dependencies import get_current_active_user, get_current_active_superuser
 
@@ -46,32 +95,190 @@ def create_movie(
     return movie
 
 
-# Эндпоинт для получения списка фильмов
-@router.get("/", response_model=list[Movie])
-def read_movies(
+# Эндпоинт массового импорта фильмов из файла NDJSON или CSV
+# Файл обрабатывается потоково, строки вставляются пачками; ошибки отдельных строк
+# возвращаются в отчёте и не прерывают импорт
+@router.post("/import", response_model=MovieImportReport)
+def import_movies(
+    # Загружаемый файл (.ndjson / .jsonl / .csv)
+    file: UploadFile = File(...),
+    # Формат файла; по умолчанию определяется по расширению
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    # Количество строк в одной транзакции
+    batch_size: int = Query(5_000, ge=1, le=100_000),
+    # Зависимость для получения текущего суперпользователя (для проверки прав доступа)
+    current_user: User = Depends(get_current_active_superuser),
     # Зависимость для получения сессии базы данных
     db: Session = Depends(get_db_session),
-    # Параметр для пропуска записей (пагинация)
-    skip: int = 0,
-    # Параметр для ограничения количества записей (пагинация)
-    limit: int = 100,
 ):
-    # Получаем список фильмов из базы данных
-    movies = crud_movie.get_multi(db, skip=skip, limit=limit)
+    # Определяем формат файла
+    fmt = format or detect_format(file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=400, detail="Cannot detect file format, pass ?format="
+        )
+    # Читаем файл построчно, не загружая его в память целиком
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    # Импортируем фильмы и возвращаем отчёт
+    return import_stream(db, stream, fmt, batch_size=batch_size)
+
+
+# Эндпоинт для получения списка фильмов
+@router.get(
+    "/",
+    response_model=list[Movie],
+    dependencies=[
+        Depends(ETagGuard("movies", "movie_favorites", "genres", "directors"))
+    ],
+)
+async def read_movies(
+    # Объект ответа для установки заголовка X-Next-Cursor
+    response: Response,
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+    # Параметры пагинации (skip/limit или cursor/limit) и сортировки
+    page: PageParams = Depends(),
+    # Фильтры каталога (жанр, режиссер, диапазоны рейтинга, даты выхода и длительности)
+    filters: MovieFilter = Depends(),
+    # Выборка полей (fields=) и раскрытие жанра и режиссёра (expand=)
+    fields: FieldsParams = Depends(),
+    # Пакетное получение фильмов по списку ID (ids=1,2,3) вместо страницы каталога
+    ids: Optional[list[int]] = Depends(parse_ids),
+    # Загрузчики текущего запроса (один запрос WHERE id IN (...) на сущность)
+    loaders: Loaders = Depends(get_loaders),
+):
+    # Фильмы по списку ID в порядке запроса; пагинация и фильтры не применяются
+    if ids is not None:
+        if fields.is_sparse:
+            raise HTTPException(
+                status_code=400, detail="ids cannot be combined with fields/expand"
+            )
+        return await load_by_ids(loaders.movies, ids)
+    # Быстрый режим: строки Core-запроса сериализуются orjson напрямую, минуя
+    # ORM-объекты и валидацию response_model (при полной выборке схема ответа та же)
+    if settings.FAST_LIST_RESPONSES or fields.is_sparse:
+        rows = await paginate_async(
+            async_crud_movie,
+            db,
+            response,
+            page,
+            method="get_multi_rows",
+            filters=filters,
+            projection=fields.projection(),
+        )
+        # Переносим заголовки ETag и X-Next-Cursor, выставленные зависимостями
+        return ORJSONResponse(rows, headers=dict(response.headers))
+    # Получаем отфильтрованный список фильмов из базы данных одним запросом
+    movies = await paginate_async(
+        async_crud_movie, db, response, page, filters=filters
+    )
     # Возвращаем список фильмов
     return movies
 
 
+# Эндпоинт потоковой выгрузки каталога в NDJSON или CSV (с необязательным сжатием gzip)
+# Строки читаются курсором на стороне сервера и отдаются клиенту по мере чтения,
+# поэтому память не растёт с размером каталога. Объявлен до /{movie_id}
+# Полная выгрузка каталога доступна только суперпользователю, как и импорт
+@router.get("/export")
+def export_movies(
+    # Зависимость для получения текущего суперпользователя (для проверки прав доступа)
+    current_user: User = Depends(get_current_active_superuser),
+    # Зависимость для получения сессии для чтения (закрывается по окончании потока)
+    db: Session = Depends(get_read_db),
+    # Формат выгрузки
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    # Сжатие выгрузки в gzip
+    gzip: bool = False,
+    # Фильтры каталога (те же, что и у списка фильмов)
+    filters: MovieFilter = Depends(),
+):
+    # Имя файла и тип содержимого зависят от формата и сжатия
+    filename = f"movies.{format}"
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    # Отдаём выгрузку потоком по мере чтения строк из базы данных
+    return StreamingResponse(
+        stream_export(db, format, filters=filters, compress=gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# Эндпоинт рейтинга самых популярных фильмов (по количеству добавлений в избранное)
+# Объявлен до /{movie_id}, чтобы путь /top не принимался за ID
+@router.get("/top", response_model=list[Movie])
+async def read_top_movies(
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+    # ID жанра для рейтинга внутри жанра (по умолчанию — общий рейтинг)
+    genre_id: Optional[int] = None,
+    # Количество фильмов в рейтинге
+    limit: int = Query(10, ge=1, le=100),
+):
+    # Получаем фильмы, отсортированные по счётчику избранного
+    return await async_crud_movie.top(db, genre_id=genre_id, limit=limit)
+
+
+# Эндпоинт фасетов каталога: количество фильмов по жанрам и режиссёрам
+# Объявлен до /{movie_id}, чтобы путь /facets не принимался за ID
+@router.get(
+    "/facets",
+    response_model=MovieFacets,
+    dependencies=[Depends(ETagGuard("movies", "genres", "directors"))],
+)
+async def read_movie_facets(
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+    # Фильтры каталога (те же, что и у списка фильмов)
+    filters: MovieFilter = Depends(),
+    # Количество значений каждого фасета (по убыванию количества фильмов)
+    limit: int = Query(50, ge=1, le=1000),
+):
+    # Получаем количество фильмов по значениям фасетов
+    return await async_crud_movie.facets(db, filters=filters, limit=limit)
+
+
+# Эндпоинт полнотекстового поиска по названию и описанию фильмов
+# Объявлен до /{movie_id}, чтобы путь /search не принимался за ID
+@router.get("/search", response_model=list[MovieSearchResult])
+async def search_movies(
+    # Поисковая строка; каждое слово ищется по префиксу
+    q: str = Query(..., min_length=1),
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+    # Параметр для пропуска записей (пагинация)
+    skip: int = Query(0, ge=0),
+    # Параметр для ограничения количества записей (пагинация)
+    limit: int = Query(20, ge=1, le=100),
+):
+    # Ищем фильмы в полнотекстовом индексе
+    results = await async_crud_movie.search(db, q=q, skip=skip, limit=limit)
+    # Возвращаем результаты, отсортированные по релевантности
+    return [
+        MovieSearchResult(movie=movie, score=score, snippet=snippet)
+        for movie, score, snippet in results
+    ]
+
+
 # Эндпоинт для получения фильма по ID
-@router.get("/{movie_id}", response_model=Movie)
-def read_movie(
+@router.get(
+    "/{movie_id}",
+    response_model=Movie,
+    dependencies=[
+        Depends(ETagGuard("movies", "movie_favorites", "genres", "directors"))
+    ],
+)
+async def read_movie(
     # Параметр пути - ID фильма
     movie_id: int,
-    # Зависимость для получения сессии базы данных
-    db: Session = Depends(get_db_session),
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
 ):
     # Получаем фильм из базы данных по ID
-    movie = crud_movie.get(db, id=movie_id)
+    movie = await async_crud_movie.get(db, id=movie_id)
     # Если фильм не найден, возвращаем ошибку 404
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
@@ -79,6 +286,28 @@ def read_movie(
     return movie
 
 
+# Эндпоинт похожих фильмов: «пользователи, добавившие этот фильм в избранное,
+# также добавили...». Соседи предрасчитываются задачей python -m app.tools.similar_movies
+@router.get("/{movie_id}/similar", response_model=list[MovieRecommendation])
+async def read_similar_movies(
+    # Параметр пути - ID фильма
+    movie_id: int,
+    # Зависимость для получения асинхронной сессии для чтения (реплика, если настроена)
+    db: AsyncSession = Depends(get_async_read_db),
+    # Количество похожих фильмов
+    limit: int = Query(10, ge=1, le=settings.SIMILAR_MOVIES_TOP_K),
+):
+    # Проверяем, что фильм существует
+    if not await async_crud_movie.get(db, id=movie_id):
+        raise HTTPException(status_code=404, detail="Movie not found")
+    # Читаем предрасчитанных соседей фильма
+    similar = await async_crud_movie.similar(db, id=movie_id, limit=limit)
+    # Возвращаем соседей по убыванию близости
+    return [
+        MovieRecommendation(movie=movie, score=score) for movie, score in similar
+    ]
+
+
 # Эндпоинт для обновления фильма по ID
 @router.put("/{movie_id}", response_model=Movie)
 def update_movie(
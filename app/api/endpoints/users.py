@@ -1,15 +1,21 @@
 # Импорт необходимых модулей FastAPI для создания API
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 # Импорт SQLAlchemy для работы с базой данных
 from sqlalchemy.orm import Session
 
 # Импорт функции для получения сессии базы данных
-from app.db.session import get_db as get_db_session
+from app.db.session import get_db as get_db_session, get_read_db
 
 # Импорт модели пользователя
 from app.models.user import User
 
+# Импорт схемы рекомендованного фильма
+from app.schemas.movie import MovieRecommendation
+
+# Импорт сервиса рекомендаций
+from app.services.recommendations import recommend_movies
+
 # Импорт схем пользователя (для запроса и ответа)
 from app.schemas.user import User, UserCreate, UserUpdate
 
@@ -33,6 +39,24 @@ def read_user_me(
     return current_user
 
 
+# Эндпоинт персональных рекомендаций по избранному и любимому жанру пользователя
+# Синхронный: расчёт на NumPy выполняется в пуле потоков, не блокируя цикл событий
+@router.get("/me/recommendations", response_model=list[MovieRecommendation])
+def read_recommendations(
+    # Зависимость для получения текущего активного пользователя
+    current_user: User = Depends(get_current_active_user),
+    # Зависимость для получения сессии для чтения (реплика, если настроена)
+    db: Session = Depends(get_read_db),
+    # Количество рекомендаций
+    limit: int = Query(20, ge=1, le=100),
+):
+    # Считаем оценки всех фильмов и возвращаем лучшие
+    return [
+        MovieRecommendation(movie=movie, score=score)
+        for movie, score in recommend_movies(db, current_user, limit=limit)
+    ]
+
+
 # Эндпоинт для получения пользователя по ID
 @router.get("/{user_id}", response_model=User)
 def read_user(
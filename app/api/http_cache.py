@@ -0,0 +1,101 @@
+# HTTP-кэширование ответов GET-эндпоинтов каталога (ETag / If-None-Match)
+# ETag вычисляется из пути, параметров запроса и версий таблиц, от которых зависит
+# ответ (app/db/versions.py). Если клиент прислал совпадающий If-None-Match, ответ
+# 304 отдаётся сразу после чтения версий — без запроса данных и сериализации.
+# Тело ответа может прийти из in-process кэшей CRUD, поэтому при изменении версии
+# таблицы (в том числе записью из другого процесса) они сбрасываются до чтения данных:
+# кэш не бывает старше версий, из которых построен ETag.
+import hashlib
+import threading
+from typing import Callable, Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.director import crud_director
+from app.crud.genre import crud_genre
+from app.crud.movie import crud_movie
+from app.db.session import get_async_read_db
+from app.db.versions import get_versions
+
+# Сброс кэшей, данные которых зависят от версии таблицы
+INVALIDATORS: dict[str, Callable[[], None]] = {
+    "movies": crud_movie.invalidate_responses,
+    "movie_favorites": crud_movie.favorite_counts_changed,
+    "genres": crud_genre.invalidate,
+    "directors": crud_director.invalidate,
+}
+
+# Версии, для которых кэши процесса уже согласованы
+_seen_versions: dict[str, int] = {}
+_seen_lock = threading.Lock()
+
+
+# Данные клиента актуальны: обрабатывается в app/main.py ответом 304 без тела
+class NotModifiedError(Exception):
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+
+
+# Значение Cache-Control: ответ можно хранить, но перед использованием
+# нужно проверить актуальность (по истечении HTTP_CACHE_MAX_AGE секунд)
+def cache_control() -> str:
+    if settings.HTTP_CACHE_MAX_AGE <= 0:
+        return "no-cache"
+    return f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, must-revalidate"
+
+
+# Сильный ETag: хеш пути, отсортированных параметров запроса и версий таблиц
+def compute_etag(request: Request, versions: dict[str, int]) -> str:
+    query = sorted(request.query_params.multi_items())
+    key = f"{request.url.path}?{query}|{sorted(versions.items())}"
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+# Сброс кэшей таблиц, версия которых отличается от уже согласованной
+# Сравнение на неравенство, а не на рост: запрос со старым снимком базы тоже
+# сбрасывает кэш, чтобы данные его снимка не остались в кэше под новой версией.
+# Сброс идёт под блокировкой, чтобы параллельный запрос с той же новой версией
+# не прочитал кэш раньше него
+def sync_caches(versions: dict[str, int]) -> None:
+    with _seen_lock:
+        for table, version in versions.items():
+            if _seen_versions.get(table) != version:
+                INVALIDATORS[table]()
+                _seen_versions[table] = version
+
+
+# Проверка заголовка If-None-Match (слабое сравнение, как требует RFC 9110)
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# Зависимость для GET-эндпоинтов: выставляет ETag и Cache-Control или прерывает
+# обработку ответом 304, если данные клиента актуальны
+# tables — таблицы, от которых зависит ответ (включая вложенные объекты)
+class ETagGuard:
+    def __init__(self, *tables: str):
+        self.tables = tables
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_async_read_db),
+    ) -> None:
+        versions = await db.run_sync(get_versions, self.tables)
+        if versions is None:
+            return
+        sync_caches(versions)
+        etag = compute_etag(request, versions)
+        headers = {"ETag": etag, "Cache-Control": cache_control()}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise NotModifiedError(headers)
+        response.headers.update(headers)
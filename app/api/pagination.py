@@ -0,0 +1,75 @@
+# Импорт необходимых модулей FastAPI
+from fastapi import HTTPException, Query, Response
+
+# Импорт Optional для аннотаций типов
+from typing import Optional
+
+# Импорт ошибки разбора курсора
+from app.crud.pagination import InvalidCursorError
+
+# Имя заголовка ответа с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# Параметры пагинации и сортировки, общие для всех списочных эндпоинтов
+class PageParams:
+    def __init__(
+        self,
+        # Параметр для пропуска записей (пагинация через OFFSET)
+        skip: int = Query(0, ge=0),
+        # Параметр для ограничения количества записей
+        limit: int = Query(100, ge=1),
+        # Непрозрачный курсор из заголовка X-Next-Cursor предыдущего ответа
+        cursor: Optional[str] = None,
+        # Поле сортировки
+        sort: str = "id",
+        # Направление сортировки: asc или desc
+        order: str = "asc",
+    ):
+        self.skip = skip
+        self.limit = limit
+        self.cursor = cursor
+        self.sort = sort
+        self.order = order
+
+
+# Получение страницы через CRUD-объект с выставлением заголовка X-Next-Cursor
+def paginate(crud, db, response: Response, page: PageParams, **kwargs):
+    try:
+        items = crud.get_multi(db, **_page_kwargs(page), **kwargs)
+    except InvalidCursorError as e:
+        # Некорректный курсор или параметры сортировки — ошибка клиента
+        raise HTTPException(status_code=400, detail=str(e))
+    _set_next_cursor(crud, response, page, items)
+    return items
+
+
+# Асинхронный вариант paginate для AsyncCRUDBase и AsyncSession
+# method — имя метода CRUD-объекта, возвращающего страницу
+async def paginate_async(
+    crud, db, response: Response, page: PageParams, *, method="get_multi", **kwargs
+):
+    try:
+        items = await getattr(crud, method)(db, **_page_kwargs(page), **kwargs)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _set_next_cursor(crud, response, page, items)
+    return items
+
+
+def _page_kwargs(page: PageParams) -> dict:
+    return {
+        "skip": page.skip,
+        "limit": page.limit,
+        "cursor": page.cursor,
+        "sort": page.sort,
+        "order": page.order,
+    }
+
+
+def _set_next_cursor(crud, response: Response, page: PageParams, items) -> None:
+    next_cursor = crud.next_cursor(
+        items, limit=page.limit, sort=page.sort, order=page.order
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,49 @@
+# Импорт необходимых модулей FastAPI
+from fastapi import HTTPException
+
+# Импорт Optional для аннотаций типов
+from typing import Optional
+
+# Импорт проекции фильма для Core-запросов
+from app.crud.movie import RELATIONS, ROW_FIELDS, MovieProjection
+
+
+# Разбор списка имён через запятую с проверкой допустимых значений
+def _parse_names(value: str, allowed: tuple[str, ...], param: str) -> tuple[str, ...]:
+    names = tuple(name.strip() for name in value.split(",") if name.strip())
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported {param}: {', '.join(unknown)}, expected one of: "
+            + ", ".join(allowed),
+        )
+    return names
+
+
+# Параметры выборки полей фильма (sparse fieldsets) и раскрытия связей
+# Меняют сам SQL-запрос: читаются только перечисленные колонки, а жанр и режиссёр
+# соединяются только при раскрытии
+class FieldsParams:
+    def __init__(
+        self,
+        # Поля фильма через запятую (по умолчанию — все); id включается всегда
+        fields: Optional[str] = None,
+        # Вложенные объекты через запятую: genre, director (по умолчанию — оба,
+        # пустое значение — без вложенных объектов)
+        expand: Optional[str] = None,
+    ):
+        self.fields = None
+        self.expand = tuple(RELATIONS)
+        if fields is not None:
+            self.fields = _parse_names(fields, ROW_FIELDS, "fields")
+        if expand is not None:
+            self.expand = _parse_names(expand, tuple(RELATIONS), "expand")
+
+    # Ответ отличается от полной схемы Movie
+    @property
+    def is_sparse(self) -> bool:
+        return self.fields is not None or set(self.expand) != set(RELATIONS)
+
+    def projection(self) -> MovieProjection:
+        return MovieProjection(self.fields, self.expand)
@@ -0,0 +1,122 @@
+# In-process кэш с вытеснением LRU и временем жизни записей (TTL)
+# Используется для редко меняющихся справочных данных (жанры, режиссеры, карточки фильмов)
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Маркер отсутствия значения (None может быть допустимым значением)
+MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, name: str, *, maxsize: int, ttl: Optional[float]):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[Optional[float], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Поколение увеличивается при каждой инвалидации: значение, прочитанное
+        # из БД до инвалидации, не должно попасть в кэш после неё
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    # Сохранение значения; ttl переопределяет время жизни по умолчанию,
+    # generation — поколение кэша на момент начала чтения из БД
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        *,
+        ttl: Optional[float] = None,
+        generation: Optional[int] = None,
+    ) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+# Реестр именованных кэшей процесса
+_caches: dict[str, TTLCache] = {}
+_registry_lock = threading.Lock()
+
+
+# Получение кэша по имени (создаётся при первом обращении)
+def get_cache(name: str, *, maxsize: int, ttl: Optional[float]) -> TTLCache:
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TTLCache(name, maxsize=maxsize, ttl=ttl)
+        return cache
+
+
+# Сброс кэша по имени, если он существует
+def invalidate_cache(name: str) -> None:
+    cache = _caches.get(name)
+    if cache is not None:
+        cache.clear()
+
+
+# Сброс всех кэшей процесса
+def clear_caches() -> None:
+    for cache in list(_caches.values()):
+        cache.clear()
+
+
+# Счётчики всех кэшей для мониторинга
+def cache_stats() -> dict[str, dict]:
+    return {name: cache.stats() for name, cache in sorted(_caches.items())}
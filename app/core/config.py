@@ -1,6 +1,16 @@
 # Импорт BaseSettings из pydantic_settings для создания класса настроек
 from pydantic_settings import BaseSettings
 
+# Импорт Optional для аннотаций типов
+from typing import Optional
+
+
+# Перевод URL SQLite на асинхронный драйвер aiosqlite
+def _to_async_url(url: str) -> str:
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
 
 # Класс настроек приложения, наследующий BaseSettings
 # Позволяет загружать настройки из переменных окружения и .env файла
@@ -12,6 +22,41 @@ class Settings(BaseSettings):
 
     # Настройки базы данных
     DATABASE_URL: str = "sqlite:///./movie_library.db"
+    # URL для асинхронного движка; по умолчанию выводится из DATABASE_URL (sqlite -> sqlite+aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Необязательная реплика только для чтения, обслуживающая GET-эндпоинты каталога
+    DATABASE_REPLICA_URL: Optional[str] = None
+
+    # Пул соединений: queue (QueuePool), static (одно соединение, для тестов) или null (без пула)
+    DB_POOL_CLASS: str = "queue"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    # Пересоздание соединений старше указанного количества секунд
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = False
+
+    # PRAGMA, применяемые к каждому соединению SQLite
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    # Размер кэша страниц (отрицательное значение — в КиБ, здесь 64 МиБ)
+    SQLITE_CACHE_SIZE: int = -64_000
+    # Размер memory-mapped области (256 МиБ)
+    SQLITE_MMAP_SIZE: int = 268_435_456
+    # Ожидание снятия блокировки записи в миллисекундах
+    SQLITE_BUSY_TIMEOUT: int = 5_000
+
+    # Асинхронный URL базы данных для AsyncSession
+    @property
+    def async_database_url(self) -> str:
+        return self.ASYNC_DATABASE_URL or _to_async_url(self.DATABASE_URL)
+
+    # Асинхронный URL реплики для чтения
+    @property
+    def async_replica_url(self) -> Optional[str]:
+        if not self.DATABASE_REPLICA_URL:
+            return None
+        return _to_async_url(self.DATABASE_REPLICA_URL)
 
     # Настройки безопасности
     # Секретный ключ для подписи JWT токенов (должен быть сложным и секретным в продакшене)
@@ -21,6 +66,109 @@ class Settings(BaseSettings):
     # Время жизни токена доступа в минутах
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Настройки in-process кэша справочных данных
+    # Включение кэша для CRUD-операций чтения
+    CACHE_ENABLED: bool = True
+    # Максимальное количество записей в каждом кэше (вытеснение LRU)
+    CACHE_MAX_ENTRIES: int = 10_000
+    # Время жизни записей в секундах для каждой сущности
+    CACHE_TTL_GENRES: int = 3600
+    CACHE_TTL_DIRECTORS: int = 3600
+    CACHE_TTL_MOVIES: int = 60
+
+    # HTTP-кэширование GET-эндпоинтов каталога (ETag)
+    # Время в секундах, в течение которого клиент может использовать ответ без
+    # проверки ETag (0 — проверять при каждом запросе)
+    HTTP_CACHE_MAX_AGE: int = 0
+
+    # Быстрый режим сериализации списка фильмов (GET /movies): Core-запрос и orjson
+    # вместо ORM-объектов и валидации в Pydantic-модели
+    FAST_LIST_RESPONSES: bool = True
+
+    # Инструментирование запросов (app/core/instrumentation.py): метрики Prometheus
+    # на /metrics, учёт SQL-запросов, поиск N+1
+    INSTRUMENTATION_ENABLED: bool = False
+    # Заголовок Server-Timing в ответах: раскрывает клиенту время и количество
+    # SQL-запросов и признаки N+1, поэтому включается отдельно (для отладки)
+    SERVER_TIMING_ENABLED: bool = False
+    # Токен доступа к /metrics (заголовок Authorization: Bearer <токен>);
+    # без него эндпоинт открыт, если инструментирование включено
+    METRICS_TOKEN: Optional[str] = None
+    # Порог медленного SQL-запроса в миллисекундах
+    SLOW_QUERY_MS: float = 100.0
+    # Количество выполнений одного SQL-запроса за HTTP-запрос, считающееся N+1
+    N_PLUS_ONE_THRESHOLD: int = 10
+    # Сэмплирующий профилировщик для запросов с заголовком PROFILE_HEADER
+    # (только при включённом инструментировании; не включать в продакшене)
+    PROFILING_ENABLED: bool = False
+    PROFILE_HEADER: str = "X-Debug-Profile"
+    # Каталог файлов профилей (формат collapsed stacks)
+    PROFILE_DIR: str = "profiles"
+    # Интервал снятия стеков в секундах
+    PROFILE_INTERVAL: float = 0.001
+
+    # Кэш аутентификации
+    # Максимальное количество проверенных JWT токенов в кэше (0 — кэш отключён)
+    AUTH_TOKEN_CACHE_SIZE: int = 10_000
+    # Время жизни кэшированных записей пользователей в секундах (0 — кэш отключён)
+    AUTH_USER_CACHE_TTL: int = 30
+
+    # Пул процессов для bcrypt
+    # Количество процессов для хеширования и проверки паролей
+    PASSWORD_POOL_WORKERS: int = 2
+    # Максимальное количество задач, ожидающих свободный процесс
+    PASSWORD_POOL_MAX_QUEUE: int = 32
+    # Значение заголовка Retry-After (секунды) при переполнении очереди
+    PASSWORD_POOL_RETRY_AFTER: int = 1
+
+    # Отложенная запись избранного (app/services/favorites_writer.py)
+    # Добавления и удаления копятся в памяти процесса и фиксируются одной транзакцией
+    FAVORITES_WRITE_BEHIND: bool = False
+    # Интервал фиксации накопленных изменений в миллисекундах
+    FAVORITES_FLUSH_INTERVAL_MS: int = 50
+    # Количество накопленных изменений, при котором фиксация начинается раньше интервала
+    FAVORITES_FLUSH_MAX_OPS: int = 500
+
+    # Колоночный снимок каталога в памяти процесса (app/services/catalog_snapshot.py)
+    # Списки фильмов (FAST_LIST_RESPONSES, fields=/expand=) строятся из массивов
+    # в памяти, пока снимок актуален, иначе читаются из базы данных
+    CATALOG_SNAPSHOT: bool = False
+    # Интервал фоновой проверки версий таблиц каталога в секундах: снимок строится
+    # заново, если их изменил другой процесс (в это время отдаётся предыдущий
+    # снимок); также пауза перед повтором после ошибки или отказа по бюджету
+    CATALOG_SNAPSHOT_MAX_AGE: int = 60
+    # Бюджет памяти снимка в байтах на фильм; снимок больше бюджета не используется
+    CATALOG_SNAPSHOT_MAX_BYTES_PER_MOVIE: int = 512
+    # Файл снимка, общий для процессов-воркеров (отображается в память через mmap);
+    # пусто — каждый процесс строит снимок в своей памяти
+    CATALOG_SNAPSHOT_PATH: Optional[str] = None
+    # Интервал фоновой проверки версий и поколения файла снимка в секундах
+    CATALOG_SNAPSHOT_CHECK_INTERVAL: float = 1.0
+
+    # Рекомендации
+    # Максимальный возраст матрицы признаков в секундах, после которого она строится
+    # заново (изменения через CRUD применяются сразу, этот интервал подхватывает
+    # изменения, сделанные другими процессами)
+    RECOMMENDATIONS_MAX_AGE: int = 600
+    # Количество соседей, сохраняемых для каждого фильма (/movies/{id}/similar)
+    SIMILAR_MOVIES_TOP_K: int = 50
+    # Минимальное число пользователей, добавивших в избранное оба фильма
+    SIMILAR_MOVIES_MIN_COOCCURRENCE: int = 2
+
+    # Production-запуск с несколькими процессами (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    # Количество процессов-воркеров (0 — по количеству ядер процессора)
+    SERVER_WORKERS: int = 0
+    # Перезапуск воркера после указанного количества запросов (0 — без перезапуска)
+    SERVER_MAX_REQUESTS: int = 0
+    # Случайная добавка к SERVER_MAX_REQUESTS, чтобы воркеры не перезапускались разом
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    # Время на завершение текущих запросов при остановке воркера в секундах
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    # Время ожидания готовности нового воркера в секундах
+    SERVER_READY_TIMEOUT: int = 60
+
 
 # Создание экземпляра настроек
 # При создании экземпляра BaseSettings автоматически загружает значения из:
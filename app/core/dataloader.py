@@ -0,0 +1,67 @@
+# Пакетная загрузка в стиле DataLoader: обращения load(key), сделанные в одной
+# итерации цикла событий (например, из задач asyncio.gather), объединяются в один
+# вызов batch_load(keys) — один запрос WHERE id IN (...) вместо N запросов по ID.
+# Загрузчик живёт в рамках одного запроса: результаты запоминаются и повторные
+# обращения к тому же ключу не идут в базу.
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+
+class DataLoader:
+    # batch_load получает список уникальных ключей и возвращает значения в том же
+    # порядке (None для отсутствующих); lock сериализует пакеты нескольких
+    # загрузчиков, работающих с одной AsyncSession
+    def __init__(
+        self,
+        batch_load: Callable[[list], Awaitable[list]],
+        *,
+        lock: Optional[asyncio.Lock] = None,
+    ):
+        self.batch_load = batch_load
+        self.lock = lock or asyncio.Lock()
+        self._results: dict[Hashable, asyncio.Future] = {}
+        self._pending: dict[Hashable, asyncio.Future] = {}
+        # Ссылки на выполняющиеся пакеты: цикл событий хранит задачи только по слабым
+        # ссылкам, и без них задача может быть собрана сборщиком мусора на полпути
+        self._tasks: set[asyncio.Task] = set()
+        # Количество выполненных пакетов (для диагностики и тестов)
+        self.batches = 0
+
+    def load(self, key: Hashable) -> asyncio.Future:
+        future = self._results.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._results[key] = future
+        if not self._pending:
+            # Пакет отправляется после того, как отработают все уже готовые задачи
+            loop.call_soon(self._start_dispatch, loop)
+        self._pending[key] = future
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> list[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _start_dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        task = loop.create_task(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self.batches += 1
+        try:
+            async with self.lock:
+                values = await self.batch_load(list(pending))
+        except Exception as e:
+            for key, future in pending.items():
+                # Ошибка не запоминается: следующий load повторит запрос
+                self._results.pop(key, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, value in zip(pending.values(), values):
+            # Ожидающая задача могла быть отменена (клиент закрыл соединение)
+            if not future.done():
+                future.set_result(value)
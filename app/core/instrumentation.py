@@ -0,0 +1,293 @@
+# Инструментирование запросов: задержка по маршрутам, счётчики и время SQL-запросов,
+# поиск N+1 и медленных запросов, сэмплирующий профилировщик по заголовку
+# Включается настройкой INSTRUMENTATION_ENABLED (app/main.py). Результаты отдаются
+# в формате Prometheus на /metrics и, при SERVER_TIMING_ENABLED, в заголовке
+# Server-Timing каждого ответа.
+#
+# Статистика текущего запроса хранится в contextvar: он наследуется задачами asyncio,
+# потоками пула Starlette (синхронные эндпоинты) и greenlet'ами AsyncSession, поэтому
+# события курсора SQLAlchemy попадают в статистику своего запроса.
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+# Метка маршрута для запросов, не совпавших ни с одним маршрутом (404)
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route",
+        ("method", "route"),
+    )
+)
+REQUESTS_TOTAL = registry.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by route and status",
+        ("method", "route", "status"),
+    )
+)
+REQUEST_STATEMENTS = registry.register(
+    Histogram(
+        "http_request_db_statements",
+        "SQL statements executed per HTTP request",
+        ("route",),
+        buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+    )
+)
+STATEMENT_DURATION = registry.register(
+    Histogram("db_statement_duration_seconds", "SQL statement execution time")
+)
+SLOW_QUERIES = registry.register(
+    Counter(
+        "db_slow_queries_total",
+        "SQL statements slower than SLOW_QUERY_MS",
+        ("route",),
+    )
+)
+N_PLUS_ONE = registry.register(
+    Counter(
+        "db_n_plus_one_total",
+        "Requests repeating one SQL statement N_PLUS_ONE_THRESHOLD+ times",
+        ("route",),
+    )
+)
+
+
+# Статистика SQL одного HTTP-запроса
+class RequestStats:
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        # Текст запроса -> количество выполнений (параметры передаются отдельно,
+        # поэтому повторы одного запроса с разными ID имеют одинаковый текст)
+        self.counts: collections.Counter = collections.Counter()
+        self.slow: list[tuple[str, float]] = []
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        self.counts[statement] += 1
+        if duration * 1000 >= settings.SLOW_QUERY_MS:
+            self.slow.append((statement, duration))
+
+    # Самый частый запрос, если он повторён не меньше порога N+1, иначе None
+    def n_plus_one(self) -> Optional[tuple[str, int]]:
+        if not self.counts:
+            return None
+        statement, count = self.counts.most_common(1)[0]
+        if count >= settings.N_PLUS_ONE_THRESHOLD:
+            return statement, count
+        return None
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+# Статистика SQL текущего HTTP-запроса (None вне инструментированного запроса)
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+# Время начала хранится в контексте выполнения: при ошибке запроса
+# after_cursor_execute не вызывается и ничего не нужно очищать
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context._query_started
+    STATEMENT_DURATION.observe(duration)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+# Подписка на события курсора всех движков (синхронных и асинхронных) процесса
+def install_sql_instrumentation() -> None:
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# Сэмплирующий профилировщик: фоновый поток периодически снимает стеки всех потоков
+# (цикл событий и потоки пула, где выполняются синхронные эндпоинты) и считает
+# одинаковые стеки. Результат — файл в формате collapsed stacks для flamegraph.pl
+# и speedscope. Во время профилирования в стеки попадают и параллельные запросы.
+class StackSampler:
+    # Модули, в которых простаивают потоки (ожидание задач и событий ввода-вывода)
+    idle_modules = ("threading.py", "selectors.py", "queue.py")
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> collections.Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or frame.f_code.co_filename.endswith(
+                    self.idle_modules
+                ):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                        f":{frame.f_lineno})"
+                    )
+                    frame = frame.f_back
+                self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# Одновременно профилируется только один запрос
+_profile_lock = threading.Lock()
+
+
+def _start_profile(scope) -> Optional[tuple[str, StackSampler]]:
+    if not settings.PROFILING_ENABLED:
+        return None
+    header = settings.PROFILE_HEADER.lower().encode()
+    if not any(name == header for name, _ in scope["headers"]):
+        return None
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    sampler = StackSampler(settings.PROFILE_INTERVAL)
+    sampler.start()
+    return uuid.uuid4().hex, sampler
+
+
+def _finish_profile(profile_id: str, sampler: StackSampler) -> None:
+    try:
+        sampler.stop()
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        sampler.dump(os.path.join(settings.PROFILE_DIR, f"{profile_id}.collapsed"))
+    finally:
+        _profile_lock.release()
+
+
+# Значение заголовка Server-Timing: общее время, время и количество SQL-запросов,
+# признак N+1 и идентификатор профиля
+def server_timing(
+    stats: RequestStats, elapsed: float, profile_id: Optional[str] = None
+) -> str:
+    parts = [
+        f"app;dur={elapsed * 1000:.2f}",
+        f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} queries"',
+    ]
+    n_plus_one = stats.n_plus_one()
+    if n_plus_one is not None:
+        parts.append(f'n-plus-one;desc="{n_plus_one[1]}x same statement"')
+    if profile_id is not None:
+        parts.append(f'profile;desc="{profile_id}"')
+    return ", ".join(parts)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE) if route else UNMATCHED_ROUTE
+
+
+# Учёт завершённого запроса в метриках и журнале
+def _record_request(scope, status: int, elapsed: float, stats: RequestStats) -> None:
+    method, route = scope["method"], _route_label(scope)
+    REQUEST_DURATION.observe(elapsed, method, route)
+    REQUESTS_TOTAL.inc(method, route, str(status))
+    REQUEST_STATEMENTS.observe(stats.statements, route)
+    for statement, duration in stats.slow:
+        SLOW_QUERIES.inc(route)
+        logger.warning(
+            "Slow query in %s %s (%.1f ms): %s",
+            method,
+            route,
+            duration * 1000,
+            statement[:500],
+        )
+    n_plus_one = stats.n_plus_one()
+    if n_plus_one is not None:
+        N_PLUS_ONE.inc(route)
+        statement, count = n_plus_one
+        logger.warning(
+            "Possible N+1 in %s %s: statement executed %d times: %s",
+            method,
+            route,
+            count,
+            statement[:500],
+        )
+
+
+# ASGI-middleware инструментирования: статистика SQL запроса, метрики по маршрутам,
+# заголовок Server-Timing (если разрешён) и профиль по заголовку PROFILE_HEADER
+# (если разрешено; идентификатор профиля отдаётся в Server-Timing всегда)
+class InstrumentationMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        profile = _start_profile(scope)
+        profile_id = profile[0] if profile else None
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING_ENABLED or profile_id is not None:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        server_timing(stats, time.perf_counter() - started, profile_id),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_stats.reset(token)
+            if profile is not None:
+                # Остановка потока сэмплера и запись файла — вне цикла событий
+                await run_in_threadpool(_finish_profile, *profile)
+            _record_request(scope, status, elapsed, stats)
@@ -0,0 +1,132 @@
+# Пул процессов для хеширования и проверки паролей (bcrypt)
+# bcrypt занимает ~250 мс CPU на вызов; в отдельных процессах он не держит GIL
+# и потоки веб-сервера, а ограниченная очередь защищает сервер от всплесков логинов
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core import security
+from app.core.config import settings
+
+
+# Очередь пула заполнена — клиенту следует повторить запрос позже (HTTP 503)
+class PasswordPoolBusyError(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class PasswordHasherPool:
+    def __init__(self, *, workers: int, max_queue: int, retry_after: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Задачи, отправленные в пул и ещё не завершённые (выполняются + ждут в очереди)
+        self._in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    # Пул процессов создаётся при первом обращении (spawn: без копирования потоков родителя)
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    # Резервирование места в очереди пула; при переполнении — PasswordPoolBusyError
+    def _reserve(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordPoolBusyError(self.retry_after)
+            self._in_flight += 1
+
+    # Освобождение места и учёт задержки; неудачные задачи считаются отдельно
+    def _release(self, started: float, ok: bool) -> None:
+        latency = time.perf_counter() - started
+        with self._lock:
+            self._in_flight -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+    async def _submit(self, fn, *args):
+        self._reserve()
+        started, ok = time.perf_counter(), False
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), fn, *args)
+            ok = True
+            return result
+        finally:
+            self._release(started, ok)
+
+    # Синхронный вариант для синхронных эндпоинтов и скриптов: поток ждёт результат,
+    # а bcrypt выполняется в процессе пула и не держит GIL
+    def _submit_blocking(self, fn, *args):
+        self._reserve()
+        started, ok = time.perf_counter(), False
+        try:
+            result = self._get_executor().submit(fn, *args).result()
+            ok = True
+            return result
+        finally:
+            self._release(started, ok)
+
+    # Проверка пароля в пуле процессов
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(security.verify_password, plain_password, hashed_password)
+
+    # Хеширование пароля в пуле процессов
+    async def hash(self, password: str) -> str:
+        return await self._submit(security.get_password_hash, password)
+
+    # Хеширование пароля в пуле процессов из синхронного кода
+    def hash_blocking(self, password: str) -> str:
+        return self._submit_blocking(security.get_password_hash, password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # Метрики пула: глубина очереди и задержка хеширования
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "latency_ms_avg": (
+                    self.total_latency / finished * 1000 if finished else 0.0
+                ),
+                "latency_ms_max": self.max_latency * 1000,
+            }
+
+
+# Общий пул процесса приложения
+password_pool = PasswordHasherPool(
+    workers=settings.PASSWORD_POOL_WORKERS,
+    max_queue=settings.PASSWORD_POOL_MAX_QUEUE,
+    retry_after=settings.PASSWORD_POOL_RETRY_AFTER,
+)
@@ -0,0 +1,43 @@
+from typing import Generic, Iterable, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase, CreateSchemaType, ModelType, UpdateSchemaType
+
+
+# Асинхронная версия CRUDBase
+# Каждая операция выполняется через AsyncSession.run_sync: ORM-логика (кэш, пагинация,
+# фильтры) остаётся общей с синхронным CRUD-классом, а ввод-вывод идёт через
+# async-драйвер и не занимает поток из пула Starlette. Сама ORM-работа (построение
+# запросов, разбор строк в объекты) выполняется в потоке event loop, поэтому тяжёлые
+# выборки стоит держать в быстром режиме списков или в снимке каталога
+class AsyncCRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    def __init__(self, crud: CRUDBase[ModelType, CreateSchemaType, UpdateSchemaType]):
+        self.crud = crud
+        self.model = crud.model
+
+    async def get(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        return await db.run_sync(self.crud.get, id=id)
+
+    async def get_many(
+        self, db: AsyncSession, *, ids: Iterable[int]
+    ) -> List[ModelType]:
+        return await db.run_sync(self.crud.get_many, ids=ids)
+
+    async def get_multi(self, db: AsyncSession, **kwargs) -> List[ModelType]:
+        return await db.run_sync(self.crud.get_multi, **kwargs)
+
+    # Курсор следующей страницы вычисляется без обращения к БД
+    def next_cursor(self, items: List[ModelType], **kwargs) -> Optional[str]:
+        return self.crud.next_cursor(items, **kwargs)
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        return await db.run_sync(self.crud.create, obj_in=obj_in)
+
+    async def update(
+        self, db: AsyncSession, *, db_obj: ModelType, obj_in: UpdateSchemaType | dict
+    ) -> ModelType:
+        return await db.run_sync(self.crud.update, db_obj=db_obj, obj_in=obj_in)
+
+    async def remove(self, db: AsyncSession, *, id: int) -> ModelType:
+        return await db.run_sync(self.crud.remove, id=id)
@@ -1,5 +1,26 @@
-from typing import Generic, Type, TypeVar, Optional, List
-from sqlalchemy.orm import Session
+import pickle
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+)
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, Query
+from app.core.cache import MISSING, get_cache, invalidate_cache
+from app.core.config import settings
+from app.crud.pagination import (
+    InvalidCursorError,
+    coerce_cursor_value,
+    decode_cursor,
+    encode_cursor,
+    keyset_condition,
+)
 
 ModelType = TypeVar("ModelType")
 CreateSchemaType = TypeVar("CreateSchemaType")
@@ -14,28 +35,200 @@ UpdateSchemaType = TypeVar("UpdateSchemaType")
 # - CreateSchemaType: Pydantic схема для создания объекта
 # - UpdateSchemaType: Pydantic схема для обновления объекта
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Поля, по которым разрешена сортировка и курсорная (keyset) пагинация
+    sort_fields: tuple[str, ...] = ("id",)
+    # Время жизни записей кэша чтения в секундах (None — кэш не используется)
+    cache_ttl: Optional[float] = None
+    # Кэши других сущностей, содержащих данные этой (например, фильмы включают жанр)
+    dependent_caches: tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        self.cache = None
+        self.list_cache = None
+        if self.cache_ttl and settings.CACHE_ENABLED:
+            name = model.__tablename__
+            self.cache = get_cache(
+                name, maxsize=settings.CACHE_MAX_ENTRIES, ttl=self.cache_ttl
+            )
+            self.list_cache = get_cache(
+                f"{name}:lists", maxsize=settings.CACHE_MAX_ENTRIES, ttl=self.cache_ttl
+            )
 
     def get(self, db: Session, id: int) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+        return self._cached(
+            self.cache,
+            id,
+            lambda: db.query(self.model).filter(self.model.id == id).first(),
+        )
+
+    # Базовый запрос чтения объектов (наследники добавляют загрузку связей)
+    def _query(self, db: Session) -> Query:
+        return db.query(self.model)
+
+    # Загрузка нескольких объектов по списку ID одним запросом WHERE id IN (...)
+    # Порядок результата совпадает с порядком ids, повторы и отсутствующие ID
+    # пропускаются; объекты из кэша повторно из базы не читаются
+    def get_many(self, db: Session, *, ids: Iterable[int]) -> List[ModelType]:
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        missing = ids
+        if self.cache is not None:
+            missing = []
+            for id in ids:
+                value = self.cache.get(id)
+                if value is MISSING:
+                    missing.append(id)
+                else:
+                    found[id] = value
+        if missing:
+            generation = self.cache.generation if self.cache is not None else None
+            for obj in self._query(db).filter(self.model.id.in_(missing)):
+                found[obj.id] = obj
+                if self.cache is not None:
+                    self.cache.set(
+                        obj.id, pickle.loads(pickle.dumps(obj)), generation=generation
+                    )
+        return [found[id] for id in ids if id in found]
 
+    # Чтение через кэш: при попадании возвращается отсоединённая от сессии копия
+    # объекта (только для чтения), при промахе — объект из текущей сессии
+    def _cached(self, cache, key: Hashable, loader: Callable[[], Any]) -> Any:
+        if cache is None:
+            return loader()
+        value = cache.get(key)
+        if value is not MISSING:
+            return value
+        generation = cache.generation
+        value = loader()
+        if value is not None:
+            # Копия через pickle не привязана ни к одной сессии и не меняется
+            # при последующих изменениях объекта в текущей сессии
+            cache.set(key, pickle.loads(pickle.dumps(value)), generation=generation)
+        return value
+
+    # Сброс кэшированных данных после изменения объекта (или всей таблицы, если id=None)
+    def invalidate(self, id: Optional[int] = None) -> None:
+        if self.cache is not None:
+            if id is None:
+                self.cache.clear()
+            else:
+                self.cache.delete(id)
+        if self.list_cache is not None:
+            self.list_cache.clear()
+        for name in self.dependent_caches:
+            invalidate_cache(name)
+            invalidate_cache(f"{name}:lists")
+
+    # Объект из кэша отсоединён от сессии — для изменения загружаем его заново
+    def _attached(self, db: Session, db_obj: ModelType) -> ModelType:
+        if inspect(db_obj).detached:
+            return db.get(self.model, db_obj.id)
+        return db_obj
+
+    # Список объектов с поддержкой двух режимов пагинации:
+    # - skip/limit (OFFSET) — для обратной совместимости
+    # - cursor/limit (keyset по паре (sort, id)) — стоимость не растёт с глубиной страницы
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        order: str = "asc",
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        query = self._paginate(
+            db.query(self.model),
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            order=order,
+        )
+        key = (skip, limit, cursor, sort, order)
+        return self._cached(self.list_cache, key, query.all)
+
+    # Курсор для следующей страницы или None, если страница последняя
+    def next_cursor(
+        self, items: List[ModelType], *, limit: int, sort: str = "id", order: str = "asc"
+    ) -> Optional[str]:
+        if not items or len(items) < limit:
+            return None
+        last = items[-1]
+        # Строки быстрого режима списка (словари) вместо ORM-объектов
+        if isinstance(last, dict):
+            return encode_cursor(sort, order, last[sort], last["id"])
+        return encode_cursor(sort, order, getattr(last, sort), last.id)
+
+    def _sort_column(self, sort: str):
+        if sort not in self.sort_fields:
+            raise InvalidCursorError(
+                f"Unsupported sort field '{sort}', expected one of: "
+                + ", ".join(self.sort_fields)
+            )
+        return getattr(self.model, sort)
+
+    # Проверка параметров страницы и разбор курсора: (значение ключа сортировки,
+    # id последней записи) или None для первой страницы
+    def _cursor_position(
+        self, *, skip: int, cursor: Optional[str], sort: str, order: str
+    ) -> Optional[tuple[Any, int]]:
+        if order not in ("asc", "desc"):
+            raise InvalidCursorError("Order must be 'asc' or 'desc'")
+        column = self._sort_column(sort)
+        if cursor is None:
+            return None
+        if skip:
+            raise InvalidCursorError("skip cannot be combined with cursor")
+        cursor_sort, cursor_order, value, last_id = decode_cursor(cursor)
+        if (cursor_sort, cursor_order) != (sort, order):
+            raise InvalidCursorError("Cursor does not match sort parameters")
+        return coerce_cursor_value(column, value), last_id
+
+    # Применение сортировки и пагинации к запросу
+    def _paginate(
+        self,
+        query: Query,
+        *,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        sort: str,
+        order: str,
+    ) -> Query:
+        position = self._cursor_position(
+            skip=skip, cursor=cursor, sort=sort, order=order
+        )
+        column = self._sort_column(sort)
+        id_column = self.model.id
+        if position is not None:
+            value, last_id = position
+            query = query.filter(
+                keyset_condition(column, id_column, order, value, last_id)
+            )
+        ordering = [column] if column is id_column else [column, id_column]
+        if order == "desc":
+            ordering = [c.desc() for c in ordering]
+        query = query.order_by(*ordering)
+        if skip:
+            query = query.offset(skip)
+        return query.limit(limit)
 
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         db_obj = self.model(**obj_in.model_dump())
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.invalidate(db_obj.id)
         return db_obj
 
     def update(
         self, db: Session, *, db_obj: ModelType, obj_in: UpdateSchemaType | dict
     ) -> ModelType:
-        obj_data = db_obj.model_dump()
+        db_obj = self._attached(db, db_obj)
+        obj_data = [attr.key for attr in inspect(db_obj).mapper.column_attrs]
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -46,10 +239,12 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.invalidate(db_obj.id)
         return db_obj
 
     def remove(self, db: Session, *, id: int) -> ModelType:
         obj = db.query(self.model).get(id)
         db.delete(obj)
         db.commit()
+        self.invalidate(id)
         return obj
@@ -1,11 +1,28 @@
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.core.config import settings
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
+from app.crud.movie import crud_movie
 from app.models.director import Director
 from app.schemas.director import DirectorCreate, DirectorUpdate
 
 
 class CRUDDirector(CRUDBase[Director, DirectorCreate, DirectorUpdate]):
+    sort_fields = ("id", "last_name")
+    cache_ttl = settings.CACHE_TTL_DIRECTORS
+
+    # Фильмы в ответах (карточки, списки, рейтинги, снимок каталога) содержат
+    # вложенные данные режиссера
+    def invalidate(self, id: Optional[int] = None) -> None:
+        super().invalidate(id)
+        crud_movie.invalidate_responses()
+
+
+# Асинхронная версия CRUD-операций для режиссеров
+class AsyncCRUDDirector(AsyncCRUDBase[Director, DirectorCreate, DirectorUpdate]):
     pass
 
 
 crud_director = CRUDDirector(Director)
+async_crud_director = AsyncCRUDDirector(crud_director)
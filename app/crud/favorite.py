@@ -1,9 +1,21 @@
+import collections
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
+from app.crud.movie import MovieProjection, crud_movie
 from app.models.favorite import Favorite
+from app.models.movie import Movie
 from app.schemas.favorite import FavoriteCreate
 
 
+# Поля записи избранного в порядке схемы app/schemas/favorite.Favorite
+FAVORITE_FIELDS = ("id", "user_id", "movie_id", "created_at")
+
+
 class CRUDFavorite(CRUDBase[Favorite, FavoriteCreate, FavoriteCreate]):
     def get_by_user_and_movie(
         self, db: Session, *, user_id: int, movie_id: int
@@ -14,14 +26,182 @@ class CRUDFavorite(CRUDBase[Favorite, FavoriteCreate, FavoriteCreate]):
             .first()
         )
 
+    # Добавление фильма в избранное; повтор отклоняется уникальным индексом
+    # (user_id, movie_id) с IntegrityError, откат транзакции — на вызывающей стороне
+    def add(self, db: Session, *, user_id: int, movie_id: int) -> Favorite:
+        obj = Favorite(user_id=user_id, movie_id=movie_id, created_at=datetime.utcnow())
+        db.add(obj)
+        db.flush()
+        self._adjust_counts(db, [movie_id], 1)
+        self._commit(db, [movie_id])
+        db.refresh(obj)
+        return obj
+
+    def remove(self, db: Session, *, id: int) -> Favorite | None:
+        obj = db.get(Favorite, id)
+        if obj:
+            db.delete(obj)
+            self._adjust_counts(db, [obj.movie_id], -1)
+            self._commit(db, [obj.movie_id])
+        return obj
+
     def remove_by_user_and_movie(
         self, db: Session, *, user_id: int, movie_id: int
     ) -> Favorite | None:
         obj = self.get_by_user_and_movie(db, user_id=user_id, movie_id=movie_id)
         if obj:
             db.delete(obj)
-            db.commit()
+            self._adjust_counts(db, [movie_id], -1)
+            self._commit(db, [movie_id])
         return obj
 
+    # Добавление списка фильмов в избранное одним INSERT ... SELECT ... ON CONFLICT DO NOTHING
+    # Несуществующие фильмы и фильмы, уже находящиеся в избранном, пропускаются
+    # Возвращает количество добавленных записей
+    def add_many(self, db: Session, *, user_id: int, movie_ids: list[int]) -> int:
+        added = self._insert_many(db, user_id=user_id, movie_ids=movie_ids)
+        self._adjust_counts(db, added, 1)
+        self._commit(db, added)
+        return len(added)
+
+    # Удаление списка фильмов из избранного одним DELETE ... WHERE movie_id IN (...)
+    # Возвращает количество удалённых записей
+    def remove_many(self, db: Session, *, user_id: int, movie_ids: list[int]) -> int:
+        removed = db.execute(
+            delete(Favorite)
+            .where(Favorite.user_id == user_id, Favorite.movie_id.in_(set(movie_ids)))
+            .returning(Favorite.movie_id)
+        ).scalars().all()
+        self._adjust_counts(db, removed, -1)
+        self._commit(db, removed)
+        return len(removed)
+
+    # Применение накопленных изменений избранного разных пользователей одной транзакцией
+    # (отложенная запись, app/services/favorites_writer.py): (user_id, movie_id) ->
+    # True для добавления, False для удаления. Добавления выполняются по одному
+    # INSERT ... SELECT на пользователя, удаления — одним DELETE по парам,
+    # счётчики favorite_count — одним UPDATE на каждое значение изменения
+    # Возвращает количество добавленных и удалённых записей
+    def apply_changes(
+        self, db: Session, *, changes: dict[tuple[int, int], bool]
+    ) -> tuple[int, int]:
+        adds: dict[int, list[int]] = collections.defaultdict(list)
+        removes = []
+        for (user_id, movie_id), add in changes.items():
+            if add:
+                adds[user_id].append(movie_id)
+            else:
+                removes.append((user_id, movie_id))
+        deltas: collections.Counter = collections.Counter()
+        added = 0
+        for user_id, movie_ids in adds.items():
+            inserted = self._insert_many(db, user_id=user_id, movie_ids=movie_ids)
+            deltas.update(inserted)
+            added += len(inserted)
+        removed = []
+        if removes:
+            removed = db.execute(
+                delete(Favorite)
+                .where(tuple_(Favorite.user_id, Favorite.movie_id).in_(removes))
+                .returning(Favorite.movie_id)
+            ).scalars().all()
+            deltas.subtract(removed)
+        by_delta: dict[int, list[int]] = collections.defaultdict(list)
+        for movie_id, delta in deltas.items():
+            if delta:
+                by_delta[delta].append(movie_id)
+        for delta, movie_ids in by_delta.items():
+            self._adjust_counts(db, movie_ids, delta)
+        self._commit(db, [movie_id for movie_id, delta in deltas.items() if delta])
+        return added, len(removed)
+
+    # Очистка избранного пользователя одним DELETE без загрузки объектов
+    def clear(self, db: Session, *, user_id: int) -> int:
+        removed = db.execute(
+            delete(Favorite)
+            .where(Favorite.user_id == user_id)
+            .returning(Favorite.movie_id)
+        ).scalars().all()
+        self._adjust_counts(db, removed, -1)
+        self._commit(db, removed)
+        return len(removed)
+
+    # Избранное пользователя Core-запросом: фильм с нужными полями и связями
+    # читается через LEFT JOIN по проекции, без ORM-объектов (см. get_multi_rows)
+    def get_rows_by_user(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        projection: Optional[MovieProjection] = None,
+    ) -> list[dict]:
+        projection = projection or MovieProjection()
+        query = (
+            select(
+                *(getattr(Favorite, name) for name in FAVORITE_FIELDS),
+                *projection.columns(),
+            )
+            .outerjoin(Movie, Movie.id == Favorite.movie_id)
+            .where(Favorite.user_id == user_id)
+            .order_by(Favorite.id)
+        )
+        query = projection.join(query)
+        offset = len(FAVORITE_FIELDS)
+        # По id фильма определяется, найден ли он при LEFT JOIN
+        movie_id = offset + projection.fields.index("id")
+        return [
+            {
+                **dict(zip(FAVORITE_FIELDS, row)),
+                "movie": (
+                    projection.to_dict(row, offset)
+                    if row[movie_id] is not None
+                    else None
+                ),
+            }
+            for row in db.execute(query)
+        ]
+
+    # INSERT ... SELECT ... ON CONFLICT DO NOTHING без фиксации транзакции
+    # Возвращает ID фильмов, которые действительно добавлены
+    def _insert_many(
+        self, db: Session, *, user_id: int, movie_ids: Iterable[int]
+    ) -> list[int]:
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = (
+            dialect.insert(Favorite)
+            .from_select(
+                ["user_id", "movie_id"],
+                select(literal(user_id), Movie.id).where(Movie.id.in_(set(movie_ids))),
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "movie_id"])
+            .returning(Favorite.movie_id)
+        )
+        return db.execute(stmt).scalars().all()
+
+    # Изменение счётчиков favorite_count затронутых фильмов в текущей транзакции
+    # Каждый фильм встречается у пользователя не более одного раза, поэтому
+    # достаточно одного UPDATE ... WHERE id IN (...) на всю пачку
+    def _adjust_counts(self, db: Session, movie_ids: Iterable[int], delta: int) -> None:
+        movie_ids = set(movie_ids)
+        if not movie_ids:
+            return
+        db.execute(
+            update(Movie)
+            .where(Movie.id.in_(movie_ids))
+            # Счётчик избранного не считается изменением фильма: updated_at
+            # сохраняется (иначе сработал бы onupdate)
+            .values(
+                favorite_count=Movie.favorite_count + delta,
+                updated_at=Movie.updated_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    # Фиксация транзакции и сброс кэшей фильмов с изменёнными счётчиками: после
+    # фиксации, чтобы параллельный запрос не закэшировал старое значение заново
+    def _commit(self, db: Session, movie_ids: Iterable[int]) -> None:
+        db.commit()
+        crud_movie.favorite_counts_changed(movie_ids)
+
 
 crud_favorite = CRUDFavorite(Favorite)
@@ -1,14 +1,34 @@
 from typing import Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
+from app.crud.movie import crud_movie
 from app.models.genre import Genre
 from app.schemas.genre import GenreCreate, GenreUpdate
 
 
 class CRUDGenre(CRUDBase[Genre, GenreCreate, GenreUpdate]):
+    sort_fields = ("id", "name")
+    cache_ttl = settings.CACHE_TTL_GENRES
+
+    # Фильмы в ответах (карточки, списки, рейтинги, снимок каталога) содержат
+    # вложенные данные жанра
+    def invalidate(self, id: Optional[int] = None) -> None:
+        super().invalidate(id)
+        crud_movie.invalidate_responses()
+
     def get_by_name(self, db: Session, name: str) -> Optional[Genre]:
         return db.query(self.model).filter(self.model.name == name).first()
 
 
+# Асинхронная версия CRUD-операций для жанров
+class AsyncCRUDGenre(AsyncCRUDBase[Genre, GenreCreate, GenreUpdate]):
+    async def get_by_name(self, db: AsyncSession, name: str) -> Optional[Genre]:
+        return await db.run_sync(self.crud.get_by_name, name=name)
+
+
 crud_genre = CRUDGenre(Genre)
+async_crud_genre = AsyncCRUDGenre(crud_genre)
@@ -1,26 +1,601 @@
+import collections
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
+from app.db.facets import rebuild_facet_counts
+from app.db.fts import (
+    DESCRIPTION_WEIGHT,
+    FTS_TABLE,
+    SNIPPET_END,
+    SNIPPET_START,
+    TITLE_WEIGHT,
+    build_match_query,
+    render_snippet,
+)
+from app.models.director import Director
+from app.models.favorite import Favorite
+from app.models.genre import Genre
 from app.models.movie import Movie
-from app.schemas.movie import MovieCreate, MovieUpdate
+from app.models.movie_facet import MovieFacet
+from app.models.movie_neighbor import MovieNeighbor
+from app.schemas.movie import MovieCreate, MovieFilter, MovieUpdate
+from app.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
+from app.services.recommendations import recommendation_index
+
+
+# Колонки фильма для быстрого режима списка (get_multi_rows) в порядке полей
+# схемы app/schemas/movie.Movie, чтобы JSON совпадал с ответом через Pydantic
+ROW_FIELDS = (
+    "title",
+    "description",
+    "release_date",
+    "duration",
+    "rating",
+    "poster_url",
+    "id",
+    "created_at",
+    "updated_at",
+    "genre_id",
+    "director_id",
+    "favorite_count",
+)
+
+# Вложенные объекты фильма: имя -> (модель, колонки в порядке полей схемы, внешний ключ)
+# Колонка id идёт последней: по ней определяется, найден ли объект при LEFT JOIN
+RELATIONS = {
+    "genre": (Genre, ("name", "id"), Movie.genre_id),
+    "director": (
+        Director,
+        ("first_name", "last_name", "biography", "id"),
+        Movie.director_id,
+    ),
+}
+
+# Фасеты каталога: имя -> (модель значения, подпись значения, колонка фильма)
+# Имя колонки фильма совпадает с полем фильтра MovieFilter
+FACETS = {
+    "genre": (Genre, Genre.name, Movie.genre_id),
+    "director": (
+        Director,
+        Director.first_name + " " + Director.last_name,
+        Movie.director_id,
+    ),
+}
+
+# Поле MovieFilter -> колонка фильма, по которой оно фильтрует
+FILTER_COLUMNS = {
+    "genre_id": "genre_id",
+    "director_id": "director_id",
+    "min_rating": "rating",
+    "max_rating": "rating",
+    "released_from": "release_date",
+    "released_to": "release_date",
+    "min_duration": "duration",
+    "max_duration": "duration",
+}
+
+
+# Проекция фильма для Core-запросов: какие колонки читать и какие связи соединять
+# fields — поля фильма (None — все), expand — вложенные объекты (genre, director)
+# Поле id и extra (например, поле сортировки для курсора) читаются всегда
+class MovieProjection:
+    def __init__(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        expand: Iterable[str] = tuple(RELATIONS),
+        extra: Iterable[str] = (),
+    ):
+        if fields is None:
+            self.fields = ROW_FIELDS
+        else:
+            wanted = {"id", *fields, *extra}
+            self.fields = tuple(name for name in ROW_FIELDS if name in wanted)
+        self.expand = tuple(name for name in RELATIONS if name in expand)
+
+    # Ключ для кэша списков
+    @property
+    def key(self) -> tuple:
+        return self.fields, self.expand
+
+    def columns(self) -> list:
+        columns = [getattr(Movie, name) for name in self.fields]
+        for name in self.expand:
+            model, names, _ = RELATIONS[name]
+            columns.extend(getattr(model, column) for column in names)
+        return columns
+
+    # LEFT JOIN только раскрываемых связей
+    def join(self, query):
+        for name in self.expand:
+            model, _, foreign_key = RELATIONS[name]
+            query = query.outerjoin(model, model.id == foreign_key)
+        return query
+
+    # Словарь фильма из колонок строки, начиная с позиции offset
+    def to_dict(self, row, offset: int = 0) -> dict:
+        end = offset + len(self.fields)
+        item = dict(zip(self.fields, row[offset:end]))
+        for name in self.expand:
+            names = RELATIONS[name][1]
+            values = row[end : end + len(names)]
+            end += len(names)
+            item[name] = dict(zip(names, values)) if values[-1] is not None else None
+        return item
 
 
 class CRUDMovie(CRUDBase[Movie, MovieCreate, MovieUpdate]):
-    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100):
-        return (
-            db.query(self.model)
+    sort_fields = ("id", "title", "rating", "release_date")
+    cache_ttl = settings.CACHE_TTL_MOVIES
+
+    def __init__(self, model):
+        super().__init__(model)
+        # Рейтинги /movies/top: сбрасываются при каждом изменении счётчиков избранного
+        self.top_cache = None
+        if self.cache is not None:
+            self.top_cache = get_cache(
+                "movies:top", maxsize=settings.CACHE_MAX_ENTRIES, ttl=self.cache_ttl
+            )
+
+    def get_multi(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        order: str = "asc",
+        filters: Optional[MovieFilter] = None,
+    ):
+        query = db.query(self.model).options(
+            joinedload(Movie.genre), joinedload(Movie.director)
+        )
+        query = self.apply_filters(query, filters)
+        query = self._paginate(
+            query, skip=skip, limit=limit, cursor=cursor, sort=sort, order=order
+        )
+        filters_key = tuple(sorted(filters.model_dump().items())) if filters else None
+        key = (skip, limit, cursor, sort, order, filters_key)
+        return self._cached(self.list_cache, key, query.all)
+
+    # Быстрый режим списка: Core-запрос только нужных колонок (projection), связи
+    # соединяются через LEFT JOIN только при раскрытии, строки сразу превращаются
+    # в словари для сериализации orjson. ORM-объекты и Pydantic-модели не создаются
+    def get_multi_rows(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        order: str = "asc",
+        filters: Optional[MovieFilter] = None,
+        projection: Optional[MovieProjection] = None,
+    ) -> list[dict]:
+        projection = projection or MovieProjection()
+        # Поле сортировки нужно для курсора следующей страницы
+        if sort not in projection.fields:
+            projection = MovieProjection(
+                projection.fields, projection.expand, extra=(sort,)
+            )
+        if settings.CATALOG_SNAPSHOT:
+            snapshot = catalog_snapshot.current()
+            if snapshot is not None:
+                return self._snapshot_rows(
+                    db,
+                    snapshot,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    sort=sort,
+                    order=order,
+                    filters=filters,
+                    projection=projection,
+                )
+        query = projection.join(select(*projection.columns()))
+        query = self.apply_filters(query, filters)
+        query = self._paginate(
+            query, skip=skip, limit=limit, cursor=cursor, sort=sort, order=order
+        )
+        filters_key = tuple(sorted(filters.model_dump().items())) if filters else None
+        key = ("rows", skip, limit, cursor, sort, order, filters_key, projection.key)
+        return self._cached(
+            self.list_cache,
+            key,
+            lambda: [projection.to_dict(row) for row in db.execute(query)],
+        )
+
+    # Страница списка из колоночного снимка каталога (app/services/catalog_snapshot.py)
+    # Порядок полей и значения совпадают с Core-запросом, жанры и режиссёры
+    # раскрываются из того же снимка. Кэш списков не нужен: страница строится
+    # из массивов в памяти
+    def _snapshot_rows(
+        self,
+        db: Session,
+        snapshot: CatalogSnapshot,
+        *,
+        skip: int,
+        limit: int,
+        cursor: Optional[str],
+        sort: str,
+        order: str,
+        filters: Optional[MovieFilter],
+        projection: MovieProjection,
+    ) -> list[dict]:
+        after = self._cursor_position(skip=skip, cursor=cursor, sort=sort, order=order)
+        rows = snapshot.select(
+            filters=filters,
+            sort=sort,
+            order=order,
+            skip=skip,
+            limit=limit,
+            after=after,
+        )
+        items = [{} for _ in range(len(rows))]
+        for name in projection.fields:
+            if name == "favorite_count":
+                values = self._favorite_counts(db, snapshot.values("id", rows))
+            else:
+                values = snapshot.values(name, rows)
+            for item, value in zip(items, values):
+                item[name] = value
+        for name in projection.expand:
+            _, names, foreign_key = RELATIONS[name]
+            keys = snapshot.values(foreign_key.key, rows)
+            related = snapshot.related(name, names, keys)
+            for item, value in zip(items, related):
+                item[name] = value
+        return items
+
+    # Счётчики избранного меняются с каждым кликом, поэтому в снимок не входят:
+    # для строк страницы они читаются из базы одним запросом по первичному ключу
+    @staticmethod
+    def _favorite_counts(db: Session, ids: list[int]) -> list[Optional[int]]:
+        if not ids:
+            return []
+        counts = dict(
+            db.execute(
+                select(Movie.id, Movie.favorite_count).where(Movie.id.in_(ids))
+            ).all()
+        )
+        return [counts.get(id) for id in ids]
+
+    # Счётчики фасетов меняются в той же транзакции, что и сам фильм
+    def create(self, db: Session, *, obj_in: MovieCreate) -> Movie:
+        self.adjust_facets(db, self.facet_changes([obj_in.model_dump()], 1))
+        return super().create(db, obj_in=obj_in)
+
+    # Смена жанра или режиссёра переносит фильм между значениями фасета
+    def update(
+        self, db: Session, *, db_obj: Movie, obj_in: MovieUpdate | dict
+    ) -> Movie:
+        db_obj = self._attached(db, db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        old = self._facet_keys(db_obj)
+        new = {**old, **{key: update_data[key] for key in old if key in update_data}}
+        changes = self.facet_changes([old], -1)
+        changes.update(self.facet_changes([new], 1))
+        self.adjust_facets(db, changes)
+        return super().update(db, db_obj=db_obj, obj_in=obj_in)
+
+    def remove(self, db: Session, *, id: int) -> Movie:
+        obj = db.get(Movie, id)
+        if obj is not None:
+            self.adjust_facets(db, self.facet_changes([self._facet_keys(obj)], -1))
+        return super().remove(db, id=id)
+
+    # Значения колонок фасетов фильма: {"genre_id": ..., "director_id": ...}
+    @staticmethod
+    def _facet_keys(movie: Movie) -> dict[str, int]:
+        columns = [column.key for *_, column in FACETS.values()]
+        return {key: getattr(movie, key) for key in columns}
+
+    # Изменения счётчиков фасетов для фильмов (словарей с genre_id и director_id):
+    # (фасет, ID значения) -> delta на каждый фильм
+    @staticmethod
+    def facet_changes(
+        movies: Iterable[dict[str, Any]], delta: int
+    ) -> collections.Counter:
+        changes: collections.Counter = collections.Counter()
+        for movie in movies:
+            for name, (*_, column) in FACETS.items():
+                changes[(name, movie[column.key])] += delta
+        return changes
+
+    # Применение изменений счётчиков фасетов одним INSERT ... ON CONFLICT DO UPDATE
+    # в текущей транзакции (фиксация — на вызывающей стороне)
+    def adjust_facets(self, db: Session, changes: collections.Counter) -> None:
+        rows = [
+            {"facet": facet, "value_id": value_id, "count": delta}
+            for (facet, value_id), delta in changes.items()
+            if delta
+        ]
+        if not rows:
+            return
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(MovieFacet).values(rows)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["facet", "value_id"],
+                set_={"count": MovieFacet.count + stmt.excluded["count"]},
+            )
+        )
+
+    # Полная перестройка счётчиков фасетов по таблице movies
+    def rebuild_facets(self, db: Session) -> None:
+        rebuild_facet_counts(db.connection())
+        db.commit()
+        self.invalidate()
+
+    # Количество фильмов по жанрам и режиссёрам (top-limit значений каждого фасета)
+    # Для каждого фасета учитываются все фильтры, кроме фильтра по нему самому,
+    # чтобы в интерфейсе оставались видны соседние значения. Без других фильтров
+    # количество читается из счётчиков movie_facets, с фильтрами — GROUP BY по
+    # movies, результат которого кэшируется вместе со списками фильмов
+    def facets(
+        self, db: Session, *, filters: Optional[MovieFilter] = None, limit: int = 50
+    ) -> dict[str, list[dict]]:
+        filters = filters or MovieFilter()
+        result = {}
+        for name, (model, label, column) in FACETS.items():
+            others = filters.model_copy(update={column.key: None})
+            if not others.model_dump(exclude_none=True):
+                query = (
+                    select(MovieFacet.value_id, label, MovieFacet.count)
+                    .join(model, model.id == MovieFacet.value_id)
+                    .where(MovieFacet.facet == name, MovieFacet.count > 0)
+                    .order_by(MovieFacet.count.desc(), MovieFacet.value_id)
+                    .limit(limit)
+                )
+                result[name] = self._facet_rows(db, query)
+                continue
+            # Сначала агрегация по movies, подписи — только для top-limit значений
+            total = func.count().label("total")
+            group = self._facet_group_column(column, others)
+            counts = (
+                self.apply_filters(select(group.label("value_id"), total), others)
+                .group_by(group)
+                .order_by(total.desc(), group)
+                .limit(limit)
+                .subquery()
+            )
+            query = (
+                select(counts.c.value_id, label, counts.c.total)
+                .join(model, model.id == counts.c.value_id)
+                .order_by(counts.c.total.desc(), counts.c.value_id)
+            )
+            key = ("facets", name, tuple(sorted(others.model_dump().items())), limit)
+            result[name] = self._cached(
+                self.list_cache, key, lambda: self._facet_rows(db, query)
+            )
+        return result
+
+    # Колонка группировки фасета. SQLite группирует по индексу колонки фасета
+    # и читает строку таблицы на каждый фильм; это быстро, только если индекс
+    # (колонка фасета, колонка фильтра) покрывает фильтр. Иначе группировка
+    # по выражению column + 0 отключает этот индекс, и фильтр использует свой
+    @staticmethod
+    def _facet_group_column(column, filters: MovieFilter):
+        covered = {other.key for *_, other in FACETS.values()}
+        for index in Movie.__table__.indexes:
+            columns = [indexed.key for indexed in index.columns]
+            if len(columns) > 1 and columns[0] == column.key:
+                covered.update(columns[1:])
+        names = filters.model_dump(exclude_none=True)
+        active = {FILTER_COLUMNS[name] for name in names}
+        return column if active <= covered else column + 0
+
+    @staticmethod
+    def _facet_rows(db: Session, query) -> list[dict]:
+        return [
+            {"id": id, "name": name, "count": count}
+            for id, name, count in db.execute(query)
+        ]
+
+    # Помимо кэшей, изменения фильмов передаются в матрицу признаков рекомендаций
+    # и в снимок каталога
+    def invalidate(self, id: Optional[int] = None) -> None:
+        super().invalidate(id)
+        if self.top_cache is not None:
+            self.top_cache.clear()
+        recommendation_index.invalidate(id)
+        catalog_snapshot.invalidate()
+
+    # Сброс кэшей ответов каталога после изменения, замеченного по версии таблицы
+    # (app/api/http_cache.py): изменённые записи неизвестны, а индекс рекомендаций
+    # при этом не перестраивается целиком — его свежесть ограничена сроком жизни
+    def invalidate_responses(self) -> None:
+        super().invalidate()
+        if self.top_cache is not None:
+            self.top_cache.clear()
+        catalog_snapshot.invalidate()
+
+    # Сброс кэшей после фиксации изменения счётчиков favorite_count (избранное):
+    # сами фильмы, страницы списков и рейтинги. Снимок каталога и матрица
+    # рекомендаций счётчиков не содержат и не перестраиваются
+    # movie_ids=None — изменились счётчики любых фильмов (сверка)
+    def favorite_counts_changed(
+        self, movie_ids: Optional[Iterable[int]] = None
+    ) -> None:
+        if self.cache is not None:
+            if movie_ids is None:
+                self.cache.clear()
+            else:
+                for id in set(movie_ids):
+                    self.cache.delete(id)
+        if self.list_cache is not None:
+            self.list_cache.clear()
+        if self.top_cache is not None:
+            self.top_cache.clear()
+
+    # Компиляция фильтров каталога в условия WHERE одного SQL-запроса
+    def apply_filters(self, query, filters: Optional[MovieFilter]):
+        if filters is None:
+            return query
+        conditions = []
+        if filters.genre_id is not None:
+            conditions.append(Movie.genre_id == filters.genre_id)
+        if filters.director_id is not None:
+            conditions.append(Movie.director_id == filters.director_id)
+        if filters.min_rating is not None:
+            conditions.append(Movie.rating >= filters.min_rating)
+        if filters.max_rating is not None:
+            conditions.append(Movie.rating <= filters.max_rating)
+        if filters.released_from is not None:
+            conditions.append(Movie.release_date >= filters.released_from)
+        if filters.released_to is not None:
+            conditions.append(Movie.release_date <= filters.released_to)
+        if filters.min_duration is not None:
+            conditions.append(Movie.duration >= filters.min_duration)
+        if filters.max_duration is not None:
+            conditions.append(Movie.duration <= filters.max_duration)
+        return query.filter(*conditions) if conditions else query
+
+    # Фильм читается вместе с жанром и режиссёром
+    def _query(self, db: Session):
+        return db.query(self.model).options(
+            joinedload(Movie.genre), joinedload(Movie.director)
+        )
+
+    def get(self, db: Session, *, id: int):
+        return self._cached(
+            self.cache,
+            id,
+            lambda: self._query(db).filter(self.model.id == id).first(),
+        )
+
+    # Рейтинг самых добавляемых в избранное фильмов (общий или по жанру)
+    # Читает денормализованный счётчик favorite_count по индексу, без GROUP BY
+    # по таблице favorites; результат кэшируется до изменения счётчиков
+    def top(self, db: Session, *, genre_id: Optional[int] = None, limit: int = 10):
+        query = db.query(self.model).options(
+            joinedload(Movie.genre), joinedload(Movie.director)
+        )
+        if genre_id is not None:
+            query = query.filter(Movie.genre_id == genre_id)
+        query = query.order_by(Movie.favorite_count.desc(), Movie.id.desc()).limit(
+            limit
+        )
+        return self._cached(self.top_cache, (genre_id, limit), query.all)
+
+    # Пересчёт счётчиков favorite_count по таблице favorites (сверка после сбоев
+    # или ручных изменений данных); обновляются только расходящиеся значения,
+    # время изменения фильмов (updated_at) сохраняется
+    # Возвращает количество исправленных фильмов
+    def recount_favorites(self, db: Session) -> int:
+        counts = (
+            select(Favorite.movie_id, func.count().label("total"))
+            .group_by(Favorite.movie_id)
+            .subquery()
+        )
+        fixed = db.execute(
+            update(Movie)
+            .where(Movie.id == counts.c.movie_id, Movie.favorite_count != counts.c.total)
+            .values(favorite_count=counts.c.total, updated_at=Movie.updated_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        fixed += db.execute(
+            update(Movie)
+            .where(
+                Movie.favorite_count != 0,
+                Movie.id.not_in(select(Favorite.movie_id)),
+            )
+            .values(favorite_count=0, updated_at=Movie.updated_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        self.favorite_counts_changed()
+        return fixed
+
+    # Похожие фильмы по совместному добавлению в избранное: чтение предрасчитанных
+    # соседей (app/services/similar_movies.py) по первичному ключу, O(limit)
+    # Возвращает список кортежей (фильм, косинусная близость)
+    def similar(self, db: Session, *, id: int, limit: int = 10):
+        rows = (
+            db.query(self.model, MovieNeighbor.score)
+            .join(MovieNeighbor, MovieNeighbor.neighbor_id == Movie.id)
             .options(joinedload(Movie.genre), joinedload(Movie.director))
-            .offset(skip)
+            .filter(MovieNeighbor.movie_id == id)
+            .order_by(MovieNeighbor.rank)
             .limit(limit)
             .all()
         )
-    
-    def get(self, db: Session, *, id: int):
-        return (
-            db.query(self.model)
+        return [(movie, score) for movie, score in rows]
+
+    # Полнотекстовый поиск по названию и описанию (FTS5, ранжирование BM25)
+    # Возвращает список кортежей (фильм, релевантность, фрагмент с подсветкой)
+    # Фрагмент — экранированный HTML, размеченный только тегами <mark>
+    def search(self, db: Session, *, q: str, skip: int = 0, limit: int = 20):
+        match = build_match_query(q)
+        if match is None:
+            return []
+        rows = db.execute(
+            text(
+                f"""
+                SELECT rowid AS id,
+                       bm25({FTS_TABLE}, :title_weight, :description_weight) AS rank,
+                       snippet({FTS_TABLE}, -1, :mark_start, :mark_end, '…', 12)
+                           AS snippet
+                FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH :match
+                ORDER BY rank
+                LIMIT :limit OFFSET :skip
+                """
+            ),
+            {
+                "title_weight": TITLE_WEIGHT,
+                "description_weight": DESCRIPTION_WEIGHT,
+                "match": match,
+                "mark_start": SNIPPET_START,
+                "mark_end": SNIPPET_END,
+                "limit": limit,
+                "skip": skip,
+            },
+        ).all()
+        if not rows:
+            return []
+        movies = {
+            movie.id: movie
+            for movie in db.query(self.model)
             .options(joinedload(Movie.genre), joinedload(Movie.director))
-            .filter(self.model.id == id)
-            .first()
-        )
+            .filter(self.model.id.in_([row.id for row in rows]))
+        }
+        # BM25 в SQLite отрицателен (меньше — лучше), отдаём положительную оценку
+        return [
+            (movies[row.id], -row.rank, render_snippet(row.snippet))
+            for row in rows
+            if row.id in movies
+        ]
+
+
+# Асинхронная версия CRUD-операций для фильмов
+class AsyncCRUDMovie(AsyncCRUDBase[Movie, MovieCreate, MovieUpdate]):
+    async def get_multi_rows(self, db: AsyncSession, **kwargs):
+        return await db.run_sync(self.crud.get_multi_rows, **kwargs)
+
+    async def top(self, db: AsyncSession, **kwargs):
+        return await db.run_sync(self.crud.top, **kwargs)
+
+    async def facets(self, db: AsyncSession, **kwargs):
+        return await db.run_sync(self.crud.facets, **kwargs)
+
+    async def similar(self, db: AsyncSession, **kwargs):
+        return await db.run_sync(self.crud.similar, **kwargs)
+
+    async def search(self, db: AsyncSession, **kwargs):
+        return await db.run_sync(self.crud.search, **kwargs)
 
 
 crud_movie = CRUDMovie(Movie)
+async_crud_movie = AsyncCRUDMovie(crud_movie)
@@ -0,0 +1,69 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import and_, or_
+
+
+# Ошибка разбора или несоответствия курсора пагинации
+class InvalidCursorError(ValueError):
+    pass
+
+
+# Кодирование позиции (значение ключа сортировки + id последней записи) в непрозрачный курсор
+def encode_cursor(sort: str, order: str, value: Any, id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort, order, value, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+# Декодирование курсора обратно в (sort, order, value, id)
+def decode_cursor(cursor: str) -> tuple[str, str, Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort, order, value, id = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(id, int):
+        raise InvalidCursorError("Invalid cursor")
+    return sort, order, value, id
+
+
+# Условие WHERE для keyset-пагинации по паре (column, id)
+# SQLite сортирует NULL первыми при ASC и последними при DESC,
+# поэтому NULL-значения ключа обрабатываются отдельно
+def keyset_condition(column, id_column, order: str, value: Any, id: int):
+    if order == "desc":
+        if column is id_column:
+            return id_column < id
+        if value is None:
+            return and_(column.is_(None), id_column < id)
+        return or_(
+            column < value,
+            and_(column == value, id_column < id),
+            column.is_(None),
+        )
+    if column is id_column:
+        return id_column > id
+    if value is None:
+        return or_(column.isnot(None), and_(column.is_(None), id_column > id))
+    return or_(column > value, and_(column == value, id_column > id))
+
+
+# Приведение значения из курсора к типу колонки сортировки
+def coerce_cursor_value(column, value: Any) -> Optional[Any]:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        return python_type(value)
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
@@ -1,30 +1,80 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.crud.async_base import AsyncCRUDBase
 from app.crud.base import CRUDBase
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash
+from app.core.password_pool import password_pool
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    # Короткий TTL: пользователь читается на каждом аутентифицированном запросе
+    cache_ttl = settings.AUTH_USER_CACHE_TTL
+
+    def __init__(self, model):
+        super().__init__(model)
+        # Отдельный кэш по имени пользователя для get_current_user
+        self.username_cache = None
+        if self.cache is not None:
+            self.username_cache = get_cache(
+                "users:username", maxsize=settings.CACHE_MAX_ENTRIES, ttl=self.cache_ttl
+            )
+
     def get_by_username(self, db: Session, *, username: str) -> User | None:
-        return db.query(User).filter(User.username == username).first()
+        return self._cached(
+            self.username_cache,
+            username,
+            lambda: db.query(User).filter(User.username == username).first(),
+        )
+
+    # Изменение пользователя (в том числе его имени) сбрасывает кэш по именам целиком
+    def invalidate(self, id: int | None = None) -> None:
+        super().invalidate(id)
+        if self.username_cache is not None:
+            self.username_cache.clear()
 
     def get_by_email(self, db: Session, *, email: str) -> User | None:
         return db.query(User).filter(User.email == email).first()
 
-    def create(self, db: Session, *, obj_in: UserCreate) -> User:
+    # hashed_password позволяет передать хеш, посчитанный заранее (например, в пуле процессов)
+    # Без него пароль хешируется в пуле процессов, а текущий поток только ждёт результат
+    def create(
+        self, db: Session, *, obj_in: UserCreate, hashed_password: str | None = None
+    ) -> User:
+        if hashed_password is None:
+            hashed_password = password_pool.hash_blocking(obj_in.password)
         db_obj = User(
             username=obj_in.username,
             email=obj_in.email,
             full_name=obj_in.full_name,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=hashed_password,
             is_superuser=obj_in.is_superuser,
             favorite_genre=obj_in.favorite_genre,
         )
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        self.invalidate(db_obj.id)
         return db_obj
 
 
+# Асинхронная версия CRUD-операций для пользователей
+class AsyncCRUDUser(AsyncCRUDBase[User, UserCreate, UserUpdate]):
+    async def get_by_username(self, db: AsyncSession, *, username: str) -> User | None:
+        return await db.run_sync(self.crud.get_by_username, username=username)
+
+    async def get_by_email(self, db: AsyncSession, *, email: str) -> User | None:
+        return await db.run_sync(self.crud.get_by_email, email=email)
+
+    async def create(
+        self, db: AsyncSession, *, obj_in: UserCreate, hashed_password: str | None = None
+    ) -> User:
+        return await db.run_sync(
+            self.crud.create, obj_in=obj_in, hashed_password=hashed_password
+        )
+
+
 crud_user = CRUDUser(User)
+async_crud_user = AsyncCRUDUser(crud_user)
@@ -0,0 +1,104 @@
+# Единая фабрика движков SQLAlchemy (синхронных и асинхронных)
+# Настройки пула соединений и PRAGMA для SQLite берутся из Settings
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
+
+from app.core.config import settings
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+# Параметры create_engine для выбранного типа пула: queue | static | null
+def _engine_kwargs(url: str, pool_class: str, is_async: bool) -> dict:
+    kwargs: dict = {}
+    if _is_sqlite(url):
+        # Соединения SQLite используются из потоков пула Starlette
+        kwargs["connect_args"] = {"check_same_thread": False}
+    if pool_class == "static":
+        # Одно общее соединение (тесты, in-memory базы)
+        kwargs["poolclass"] = StaticPool
+    elif pool_class == "null":
+        kwargs["poolclass"] = NullPool
+    elif pool_class == "queue":
+        kwargs.update(
+            poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+    else:
+        raise ValueError(
+            f"Unknown pool class '{pool_class}', expected queue, static or null"
+        )
+    return kwargs
+
+
+# Установка PRAGMA на каждое новое соединение SQLite
+# WAL позволяет читателям не блокироваться писателем, busy_timeout — ждать блокировку
+# вместо немедленной ошибки "database is locked"
+def _install_sqlite_pragmas(engine: Engine, read_only: bool) -> None:
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        # Реплика только для чтения: случайная запись завершится ошибкой
+        pragmas.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+# Создание синхронного движка
+def create_db_engine(
+    url: str, *, pool_class: Optional[str] = None, read_only: bool = False
+) -> Engine:
+    engine = create_engine(
+        url, **_engine_kwargs(url, pool_class or settings.DB_POOL_CLASS, False)
+    )
+    if _is_sqlite(url):
+        _install_sqlite_pragmas(engine, read_only)
+    return engine
+
+
+# Создание асинхронного движка (PRAGMA ставятся через sync_engine)
+def create_async_db_engine(
+    url: str, *, pool_class: Optional[str] = None, read_only: bool = False
+) -> AsyncEngine:
+    engine = create_async_engine(
+        url, **_engine_kwargs(url, pool_class or settings.DB_POOL_CLASS, True)
+    )
+    if _is_sqlite(url):
+        _install_sqlite_pragmas(engine.sync_engine, read_only)
+    return engine
+
+
+# Статистика пула соединений движка для мониторинга
+def pool_stats(engine: Engine | AsyncEngine) -> dict:
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+    pool = engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    return stats
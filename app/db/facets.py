@@ -0,0 +1,29 @@
+# Счётчики фасетов каталога: количество фильмов по жанрам и режиссёрам
+# Таблица movie_facets хранит строку (фасет, ID значения, количество) и обновляется
+# инкрементально в транзакциях crud_movie.create/update/remove и массового импорта.
+# Полная перестройка по таблице movies — rebuild_facet_counts (python -m
+# app.tools.rebuild_facets), например после изменения данных в обход CRUD.
+from sqlalchemy import inspect, text
+
+FACETS_TABLE = "movie_facets"
+
+# Фасет -> колонка таблицы movies
+FACET_COLUMNS = {"genre": "genre_id", "director": "director_id"}
+
+
+# Пересчёт всех счётчиков фасетов по текущему содержимому movies
+def rebuild_facet_counts(connection) -> None:
+    # Таблица movies может ещё не существовать (создание пустой схемы)
+    if not inspect(connection).has_table("movies"):
+        return
+    connection.execute(text(f"DELETE FROM {FACETS_TABLE}"))
+    for facet, column in FACET_COLUMNS.items():
+        connection.execute(
+            text(
+                f"""
+                INSERT INTO {FACETS_TABLE} (facet, value_id, count)
+                SELECT :facet, {column}, COUNT(*) FROM movies GROUP BY {column}
+                """
+            ),
+            {"facet": facet},
+        )
@@ -0,0 +1,54 @@
+# Денормализованные счётчики избранного в базах, созданных до их появления
+# Колонка movies.favorite_count и индексы рейтинга создаются вместе с таблицами
+# (app/models/movie.py); в существующей базе create_all их не добавляет, поэтому
+# при запуске (app/server.py, warm_up) недостающая схема создаётся здесь.
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+
+# Индексы рейтинга популярных фильмов и уникальность избранного
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS ix_movies_favorite_count ON movies (favorite_count)",
+    "CREATE INDEX IF NOT EXISTS ix_movies_genre_id_favorite_count "
+    "ON movies (genre_id, favorite_count)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_favorites_user_id_movie_id "
+    "ON favorites (user_id, movie_id)",
+)
+
+
+# Добавление колонки, индексов и заполнение счётчиков по таблице favorites
+# Повторные добавления фильма в избранное (до уникального индекса) удаляются,
+# остаётся самая ранняя запись. Возвращает True, если колонка добавлена
+def ensure_favorite_counts(connection) -> bool:
+    from app.crud.movie import crud_movie
+
+    inspector = inspect(connection)
+    if not inspector.has_table("movies") or not inspector.has_table("favorites"):
+        return False
+    columns = {column["name"] for column in inspector.get_columns("movies")}
+    added = "favorite_count" not in columns
+    if added:
+        connection.execute(
+            text(
+                "ALTER TABLE movies "
+                "ADD COLUMN favorite_count INTEGER NOT NULL DEFAULT 0"
+            )
+        )
+    indexes = {index["name"] for index in inspector.get_indexes("favorites")}
+    if "ix_favorites_user_id_movie_id" not in indexes:
+        connection.execute(
+            text(
+                """
+                DELETE FROM favorites WHERE id NOT IN (
+                    SELECT MIN(id) FROM favorites GROUP BY user_id, movie_id
+                )
+                """
+            )
+        )
+    for statement in INDEXES:
+        connection.execute(text(statement))
+    if added:
+        # Сессия работает в транзакции соединения: commit() в recount_favorites
+        # не фиксирует её раньше остальных шагов
+        with Session(bind=connection) as db:
+            crud_movie.recount_favorites(db)
+    return added
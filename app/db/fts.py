@@ -0,0 +1,107 @@
+# Полнотекстовый индекс фильмов на базе SQLite FTS5
+# Виртуальная таблица movies_fts хранит только индекс (external content = movies),
+# а триггеры синхронизируют её с таблицей movies при любых INSERT/UPDATE/DELETE,
+# включая операции crud_movie.create/update/remove
+import html
+import re
+
+from sqlalchemy import inspect, text
+
+FTS_TABLE = "movies_fts"
+
+CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='movies', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS movies_fts_ai AFTER INSERT ON movies BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS movies_fts_ad AFTER DELETE ON movies BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS movies_fts_au AFTER UPDATE OF title, description ON movies BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+# Веса колонок для BM25: совпадение в названии важнее совпадения в описании
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# Создание FTS-таблицы и триггеров (вызывается после CREATE TABLE movies)
+def create_search_index(connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    for statement in CREATE_STATEMENTS:
+        connection.execute(text(statement))
+
+
+# Удаление FTS-таблицы (триггеры удаляются вместе с таблицей movies)
+def drop_search_index(connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+# Полная перестройка индекса по текущему содержимому movies
+# Нужна для баз, созданных до появления полнотекстового поиска
+def rebuild_search_index(connection) -> None:
+    create_search_index(connection)
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+# Создание и заполнение индекса в существующей базе, где movies уже есть, а movies_fts
+# ещё нет (база создана до появления поиска). Возвращает True, если индекс построен
+def ensure_search_index(connection) -> bool:
+    if connection.dialect.name != "sqlite":
+        return False
+    inspector = inspect(connection)
+    if not inspector.has_table("movies") or inspector.has_table(FTS_TABLE):
+        return False
+    rebuild_search_index(connection)
+    return True
+
+
+# Маркеры подсветки во фрагменте snippet(): управляющие символы не встречаются в
+# тексте фильмов, поэтому текст экранируется целиком, а маркеры заменяются на <mark>
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+
+# Фрагмент с подсветкой как безопасный HTML: текст экранирован, теги только <mark>
+def render_snippet(snippet: str | None) -> str | None:
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(SNIPPET_START, "<mark>")
+        .replace(SNIPPET_END, "</mark>")
+    )
+
+
+# Преобразование пользовательской строки в безопасный FTS5-запрос:
+# каждое слово берётся в кавычки (никакого синтаксиса FTS от клиента)
+# и ищется по префиксу, слова объединяются через AND
+def build_match_query(query: str) -> str | None:
+    tokens = _TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
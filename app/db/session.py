@@ -1,20 +1,24 @@
 # app/db/session.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.engine import create_async_db_engine, create_db_engine
 
-# Создание движка базы данных
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}  # только для SQLite
+# Создание движка базы данных (основная база, чтение и запись)
+engine = create_db_engine(settings.DATABASE_URL)
+
+# Движок для чтения: реплика, если она настроена, иначе основная база
+read_engine = (
+    create_db_engine(settings.DATABASE_REPLICA_URL, read_only=True)
+    if settings.DATABASE_REPLICA_URL
+    else engine
 )
 
-# Фабрика сессий
+# Фабрики сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
-# Базовый класс для моделей
-Base = declarative_base()
 
 # Зависимость для получения сессии БД в FastAPI
 def get_db():
@@ -22,4 +26,45 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Зависимость для получения сессии БД только для чтения (GET-эндпоинты)
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Асинхронный движок (aiosqlite) для async-эндпоинтов
+# Синхронный движок выше остаётся для тестов, скриптов и синхронных эндпоинтов
+async_engine = create_async_db_engine(settings.async_database_url)
+
+# Асинхронный движок для чтения (реплика, если настроена)
+async_read_engine = (
+    create_async_db_engine(settings.async_replica_url, read_only=True)
+    if settings.DATABASE_REPLICA_URL
+    else async_engine
+)
+
+# Фабрики асинхронных сессий
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine, class_=AsyncSession, autoflush=False
+)
+
+
+# Зависимость для получения асинхронной сессии БД в FastAPI
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Зависимость для получения асинхронной сессии БД только для чтения (GET-эндпоинты)
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,116 @@
+# Счётчики версий таблиц для HTTP-кэширования (ETag)
+# Таблица table_versions хранит номер версии для каждой отслеживаемой таблицы,
+# триггеры увеличивают его при любом INSERT/UPDATE/DELETE — в том числе при массовых
+# операциях в обход ORM (импорт, пакетное избранное) и при записи из других процессов.
+# Обновление счётчика favorite_count фильмов учитывается отдельной версией
+# movie_favorites.
+# Чтение версий — один запрос по первичному ключу без загрузки ORM-объектов.
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+VERSIONS_TABLE = "table_versions"
+
+# Таблицы, версии которых отслеживаются
+VERSIONED_TABLES = ("movies", "genres", "directors")
+
+# Столбцы с отдельной версией: обновление счётчика избранного не меняет версию
+# movies, поэтому ETag ответов без этого счётчика (фасеты) не сбрасывается кликами
+SEPARATE_COLUMNS = {"movies": {"favorite_count": "movie_favorites"}}
+
+# Время изменения обновляется только вместе с другими столбцами и само версию
+# не меняет (обновление счётчика избранного сохраняет его прежним значением)
+IGNORED_COLUMNS = ("updated_at",)
+
+CREATE_TABLE_STATEMENT = f"""
+CREATE TABLE IF NOT EXISTS {VERSIONS_TABLE} (
+    table_name VARCHAR PRIMARY KEY,
+    version INTEGER NOT NULL
+)
+"""
+
+TRIGGER_STATEMENT = """
+CREATE TRIGGER IF NOT EXISTS {table}_version_{suffix} AFTER {operation} ON {table} BEGIN
+    INSERT INTO {versions}(table_name, version) VALUES ('{version}', 1)
+    ON CONFLICT(table_name) DO UPDATE SET version = version + 1;
+END
+"""
+
+OPERATIONS = {"ai": "INSERT", "au": "UPDATE", "ad": "DELETE"}
+
+
+# Создание таблицы версий и триггеров для таблицы table_name
+def create_version_triggers(connection, table_name: str) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    connection.execute(text(CREATE_TABLE_STATEMENT))
+    operations = dict(OPERATIONS)
+    separate = SEPARATE_COLUMNS.get(table_name, {})
+    if separate:
+        # UPDATE учитывается только по остальным столбцам; прежний триггер на любое
+        # UPDATE (в базах, созданных раньше) удаляется
+        columns = [
+            column["name"]
+            for column in inspect(connection).get_columns(table_name)
+            if column["name"] not in separate
+            and column["name"] not in IGNORED_COLUMNS
+        ]
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {table_name}_version_au"))
+        del operations["au"]
+        operations["auc"] = f"UPDATE OF {', '.join(columns)}"
+    for suffix, operation in operations.items():
+        _create_trigger(connection, table_name, suffix, operation, table_name)
+    for column, version in separate.items():
+        _create_trigger(
+            connection, table_name, f"{column}_au", f"UPDATE OF {column}", version
+        )
+
+
+def _create_trigger(
+    connection, table_name: str, suffix: str, operation: str, version: str
+) -> None:
+    connection.execute(
+        text(
+            TRIGGER_STATEMENT.format(
+                table=table_name,
+                suffix=suffix,
+                operation=operation,
+                versions=VERSIONS_TABLE,
+                version=version,
+            )
+        )
+    )
+
+
+# Установка триггеров в базу, созданную до появления счётчиков версий
+def install_version_triggers(connection) -> None:
+    existing = set(inspect(connection).get_table_names())
+    for table_name in VERSIONED_TABLES:
+        if table_name in existing:
+            create_version_triggers(connection, table_name)
+
+
+# Подключение отслеживания версий к таблице модели: триггеры создаются вместе
+# с таблицей (и удаляются вместе с ней)
+def track_versions(table) -> None:
+    @event.listens_for(table, "after_create")
+    def _create_version_triggers(target, connection, **kw):
+        create_version_triggers(connection, target.name)
+
+
+# Текущие версии таблиц (для таблиц без изменений — 0) или None, если счётчики
+# версий не поддерживаются этой базой и HTTP-кэширование нужно отключить
+def get_versions(db: Session, tables: tuple[str, ...]) -> dict[str, int] | None:
+    if db.get_bind().dialect.name != "sqlite":
+        return None
+    versions = dict.fromkeys(tables, 0)
+    statement = text(
+        f"SELECT table_name, version FROM {VERSIONS_TABLE} WHERE table_name IN :tables"
+    ).bindparams(bindparam("tables", expanding=True))
+    try:
+        rows = db.execute(statement, {"tables": list(tables)})
+    except OperationalError:
+        # Таблица версий ещё не создана (см. install_version_triggers)
+        return None
+    versions.update({name: version for name, version in rows})
+    return versions
@@ -1,7 +1,20 @@
+# Импорт os для идентификатора процесса-воркера в проверках состояния
+import os
+
+# Импорт secrets для сравнения токена доступа к метрикам
+import secrets
+
+# Импорт asynccontextmanager для описания жизненного цикла приложения
+from contextlib import asynccontextmanager
+
 # Импорт FastAPI для создания веб-приложения
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 # Импорт роутера API
 from app.api.api import api_router
@@ -9,8 +22,58 @@ from app.api.api import api_router
 # Импорт настроек приложения
 from app.core.config import settings
 
+# Импорт зависимости сессии базы данных для проверки готовности
+from app.db.session import get_read_db
+
+# Импорт исключения для ответа 304 Not Modified
+from app.api.http_cache import NotModifiedError
+
+# Импорт пула процессов для bcrypt
+from app.core.password_pool import PasswordPoolBusyError, password_pool
+
+# Импорт очереди отложенной записи избранного
+from app.services.favorites_writer import favorites_writer
+
+# Импорт инструментирования запросов и реестра метрик
+from app.core.instrumentation import (
+    InstrumentationMiddleware,
+    install_sql_instrumentation,
+)
+from app.core.metrics import CONTENT_TYPE, registry
+
+
+# Жизненный цикл приложения: освобождение ресурсов при остановке
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Фоновая фиксация отложенных изменений избранного
+    if settings.FAVORITES_WRITE_BEHIND:
+        favorites_writer.start()
+    yield
+    # Останавливаем фоновую фиксацию и фиксируем оставшиеся изменения избранного
+    favorites_writer.stop()
+    # Завершаем процессы пула хеширования паролей
+    password_pool.shutdown()
+
+
 # Создание экземпляра FastAPI с названием проекта и версией из настроек
-app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0")
+app = FastAPI(title=settings.PROJECT_NAME, version="1.0.0", lifespan=lifespan)
+
+
+# Переполнение очереди bcrypt — сервер перегружен логинами, клиент повторит позже
+@app.exception_handler(PasswordPoolBusyError)
+async def password_pool_busy_handler(request: Request, exc: PasswordPoolBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service is busy, retry later"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Данные клиента актуальны (совпал ETag) — ответ 304 без тела
+@app.exception_handler(NotModifiedError)
+async def not_modified_handler(request: Request, exc: NotModifiedError):
+    return Response(status_code=304, headers=exc.headers)
+
 
 # Настройка CORS для разрешения запросов с фронтенда
 app.add_middleware(
@@ -19,8 +82,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Разрешаем фронтенду читать курсор следующей страницы и ETag
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Инструментирование запросов (opt-in): метрики по маршрутам, учёт SQL, Server-Timing
+if settings.INSTRUMENTATION_ENABLED:
+    install_sql_instrumentation()
+    app.add_middleware(InstrumentationMiddleware)
+
 # Подключение роутера API с префиксом из настроек (обычно "/api/v1")
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -59,3 +129,51 @@ app.openapi = custom_openapi
 def read_root():
     # Возвращает приветственное сообщение
     return {"message": "Welcome to Movie Library API"}
+
+
+# Доступ к метрикам: эндпоинт существует только при INSTRUMENTATION_ENABLED
+# и, если задан METRICS_TOKEN, требует его в заголовке Authorization
+def require_metrics_access(request: Request) -> None:
+    if not settings.INSTRUMENTATION_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN is None:
+        return
+    authorization = request.headers.get("authorization", "")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not secrets.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# Метрики процесса в формате Prometheus
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_access)],
+)
+def read_metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+
+# Проверка живости процесса (liveness): воркер запущен и обрабатывает запросы
+@app.get("/health", include_in_schema=False)
+def read_health():
+    return {"status": "ok", "pid": os.getpid()}
+
+
+# Проверка готовности (readiness): воркер может обслуживать запросы к базе данных
+@app.get("/ready", include_in_schema=False)
+def read_ready(
+    # Зависимость для получения сессии базы данных для чтения
+    db: Session = Depends(get_read_db),
+):
+    try:
+        db.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        return JSONResponse(
+            status_code=503, content={"status": "unavailable", "pid": os.getpid()}
+        )
+    return {"status": "ready", "pid": os.getpid()}
@@ -4,3 +4,6 @@ from app.models.movie import Movie
 from app.models.genre import Genre
 from app.models.director import Director
 from app.models.favorite import Favorite
+from app.models.movie_neighbor import MovieNeighbor
+from app.models.job_state import JobState
+from app.models.movie_facet import MovieFacet
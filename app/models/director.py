@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, DateTime, Text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
+from app.db.versions import track_versions
 
 
 class Director(Base):
@@ -17,3 +18,7 @@ class Director(Base):
 
     # Relationships
     movies = relationship("Movie", back_populates="director")
+
+
+# Счётчик версий таблицы для ETag (app/db/versions.py)
+track_versions(Director.__table__)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
@@ -6,6 +6,14 @@ from app.db.base_class import Base
 
 class Favorite(Base):
     __tablename__ = "favorites"
+    # Фильм может быть в избранном пользователя только один раз; индекс также
+    # обслуживает выборку избранного пользователя и пакетное удаление.
+    # AUTOINCREMENT: id не переиспользуются после удаления, поэтому по ним можно
+    # находить записи, добавленные после предыдущего запуска фоновой задачи
+    __table_args__ = (
+        Index("ix_favorites_user_id_movie_id", "user_id", "movie_id", unique=True),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
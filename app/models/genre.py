@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, DateTime
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
+from app.db.versions import track_versions
 
 
 class Genre(Base):
@@ -15,3 +16,7 @@ class Genre(Base):
 
     # Relationships
     movies = relationship("Movie", back_populates="genre")
+
+
+# Счётчик версий таблицы для ETag (app/db/versions.py)
+track_versions(Genre.__table__)
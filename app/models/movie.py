@@ -1,19 +1,33 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Float, Index, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
+from app.db.versions import track_versions
+from app.db.fts import create_search_index, drop_search_index, ensure_search_index
 
 
 class Movie(Base):
     __tablename__ = "movies"
+    # Составные индексы под фильтры каталога с сортировкой
+    __table_args__ = (
+        Index("ix_movies_genre_id_rating", "genre_id", "rating"),
+        Index("ix_movies_genre_id_release_date", "genre_id", "release_date"),
+        Index("ix_movies_director_id_release_date", "director_id", "release_date"),
+        # Индексы для рейтинга самых популярных фильмов (общего и по жанру)
+        Index("ix_movies_favorite_count", "favorite_count"),
+        Index("ix_movies_genre_id_favorite_count", "genre_id", "favorite_count"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
-    release_date = Column(DateTime, nullable=True)
+    release_date = Column(DateTime, index=True, nullable=True)
     duration = Column(Integer, nullable=True)  # in minutes
-    rating = Column(Float, nullable=True)
+    rating = Column(Float, index=True, nullable=True)
     poster_url = Column(String, nullable=True)
+    # Денормализованное количество добавлений в избранное; обновляется в той же
+    # транзакции, что и таблица favorites (app/crud/favorite.py)
+    favorite_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -25,3 +39,24 @@ class Movie(Base):
     genre = relationship("Genre", back_populates="movies")
     director = relationship("Director", back_populates="movies")
     favorites = relationship("Favorite", back_populates="movie")
+
+
+# Полнотекстовый индекс создаётся и удаляется вместе с таблицей movies
+@event.listens_for(Movie.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Movie.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    drop_search_index(connection)
+
+
+# create_all на существующей базе без индекса (movies уже есть) строит и заполняет его
+@event.listens_for(Base.metadata, "after_create")
+def _ensure_search_index(target, connection, **kw):
+    ensure_search_index(connection)
+
+
+# Счётчик версий таблицы для ETag (app/db/versions.py)
+track_versions(Movie.__table__)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Index, event
+from app.db.base_class import Base
+from app.db.facets import rebuild_facet_counts
+
+
+# Количество фильмов по значению фасета (жанр или режиссёр) для /movies/facets
+# Поддерживается crud_movie (app/crud/movie.py), перестраивается app/db/facets.py
+class MovieFacet(Base):
+    __tablename__ = "movie_facets"
+    # Индекс для выдачи значений фасета по убыванию количества
+    __table_args__ = (Index("ix_movie_facets_facet_count", "facet", "count"),)
+
+    facet = Column(String, primary_key=True)
+    value_id = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# Таблица, добавленная в существующую базу, сразу заполняется по таблице movies
+@event.listens_for(MovieFacet.__table__, "after_create")
+def _fill_facet_counts(target, connection, **kw):
+    rebuild_facet_counts(connection)
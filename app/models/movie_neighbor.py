@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from app.db.base_class import Base
+
+
+# Предрасчитанные соседи фильма по совместному добавлению в избранное
+# (top-K по косинусной близости); строятся задачей app/tools/similar_movies.py
+class MovieNeighbor(Base):
+    __tablename__ = "movie_neighbors"
+
+    movie_id = Column(Integer, ForeignKey("movies.id"), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey("movies.id"), nullable=False)
+    score = Column(Float, nullable=False)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
 
@@ -14,6 +14,11 @@ class FavoriteCreate(BaseModel):
     movie_id: int
 
 
+# Пакетное добавление или удаление фильмов из избранного
+class FavoriteBatch(BaseModel):
+    movie_ids: list[int] = Field(..., min_length=1, max_length=1000)
+
+
 class FavoriteInDBBase(BaseModel):
     id: int
     user_id: int
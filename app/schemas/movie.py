@@ -50,6 +50,7 @@ class MovieInDBBase(MovieBase):
     updated_at: Optional[datetime] = None
     genre_id: int
     director_id: int
+    favorite_count: int = 0
 
     class Config:
         from_attributes = True
@@ -62,3 +63,62 @@ class Movie(MovieInDBBase):
 
 class MovieInDB(MovieInDBBase):
     pass
+
+
+# Результат полнотекстового поиска: фильм, релевантность и фрагмент с подсветкой
+class MovieSearchResult(BaseModel):
+    movie: Movie
+    score: float
+    snippet: Optional[str] = None
+
+
+# Рекомендованный фильм с оценкой близости к профилю пользователя
+class MovieRecommendation(BaseModel):
+    movie: Movie
+    score: float
+
+
+# Строка файла массового импорта: жанр и режиссёр задаются именем или ID
+class MovieImportRow(MovieBase):
+    genre: Optional[str] = None
+    genre_id: Optional[int] = None
+    director: Optional[str] = None
+    director_id: Optional[int] = None
+
+
+# Ошибка импорта конкретной строки файла
+class MovieImportError(BaseModel):
+    line: int
+    error: str
+
+
+# Итог массового импорта
+class MovieImportReport(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: list[MovieImportError] = []
+
+
+# Значение фасета каталога (жанр или режиссёр) с количеством фильмов
+class MovieFacetValue(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+# Количество фильмов по жанрам и режиссёрам для текущего набора фильтров
+class MovieFacets(BaseModel):
+    genre: list[MovieFacetValue]
+    director: list[MovieFacetValue]
+
+
+# Фильтры каталога фильмов (передаются как query-параметры)
+class MovieFilter(BaseModel):
+    genre_id: Optional[int] = None
+    director_id: Optional[int] = None
+    min_rating: Optional[float] = None
+    max_rating: Optional[float] = None
+    released_from: Optional[datetime] = None
+    released_to: Optional[datetime] = None
+    min_duration: Optional[int] = None
+    max_duration: Optional[int] = None
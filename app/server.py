@@ -0,0 +1,424 @@
+# Production-запуск: несколько процессов-воркеров uvicorn на общем сокете (pre-fork)
+# Мастер-процесс открывает сокет, импортирует приложение и прогревает его (preload):
+# соединение с базой, снимок каталога, матрица рекомендаций. Затем воркеры создаются
+# через fork() и получают прогретые данные готовыми, страницы памяти остаются общими
+# (copy-on-write), пока воркер их не изменит.
+#
+# Сигналы мастеру:
+# - SIGHUP — плавный поочерёдный перезапуск: запускается новый воркер, и только после
+#   его готовности старый дообслуживает текущие запросы и завершается. С preload
+#   мастер перед этим заново прогревает кэши; новый код подхватывается только без
+#   preload (--no-preload: каждый воркер импортирует приложение сам, в том числе
+#   заново — модули app, уже загруженные мастером, например настройки из .env)
+# - SIGTERM, SIGINT — плавная остановка всех воркеров
+# Воркер перезапускается после SERVER_MAX_REQUESTS запросов (плюс случайная добавка
+# до SERVER_MAX_REQUESTS_JITTER), чтобы ограничить рост памяти, и после падения.
+#
+# Запуск: python -m app.server --workers 4 --port 8000
+import argparse
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Optional
+
+import uvicorn
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from uvicorn.importer import import_from_string
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.server")
+
+# Приложение ASGI для воркеров
+APP = "app.main:app"
+
+# Запас времени сверх SERVER_GRACEFUL_TIMEOUT до принудительной остановки воркера
+KILL_GRACE = 5
+
+
+# Воркер с точки зрения мастера
+class Worker:
+    def __init__(self, pid: int, ready_fd: int, replaces: Optional[int]):
+        self.pid = pid
+        # Канал, в который воркер пишет байт после запуска (закрыт — воркер упал)
+        self.ready_fd: Optional[int] = ready_fd
+        self.ready = False
+        # Воркер, которого заменяет этот при поочерёдном перезапуске
+        self.replaces = replaces
+        self.started_at = time.monotonic()
+        # Время, после которого останавливаемый воркер завершается принудительно
+        self.kill_at: Optional[float] = None
+
+
+# Сервер uvicorn, сообщающий мастеру о готовности после запуска приложения
+class _WorkerServer(uvicorn.Server):
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets: Optional[list[socket.socket]] = None) -> None:
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+
+def _load_app():
+    return import_from_string(APP)
+
+
+# Выгрузка модулей приложения, унаследованных от мастера через fork (ему нужны
+# настройки для аргументов по умолчанию): без preload воркер импортирует их заново
+def _unload_app_modules() -> None:
+    for name in list(sys.modules):
+        if name == "app" or name.startswith("app."):
+            del sys.modules[name]
+
+
+# Прогрев процесса перед обслуживанием запросов: полнотекстовый индекс и счётчики
+# избранного для старых баз, соединение с базой, снимок каталога (CATALOG_SNAPSHOT)
+# и матрица признаков рекомендаций. Ошибка прогрева не мешает запуску: данные будут
+# построены при первом запросе
+def warm_up() -> None:
+    from app.core.config import settings
+    from app.db.favorite_counts import ensure_favorite_counts
+    from app.db.fts import ensure_search_index
+    from app.db.session import SessionLocal, engine
+    from app.db.versions import install_version_triggers
+    from app.services.catalog_snapshot import catalog_snapshot
+    from app.services.recommendations import recommendation_index
+
+    started = time.perf_counter()
+    try:
+        # База, созданная до появления поиска, счётчиков избранного и версий,
+        # получает индекс movies_fts, колонку favorite_count и триггеры table_versions
+        with engine.begin() as connection:
+            if ensure_search_index(connection):
+                logger.info("Built the full-text search index")
+            if ensure_favorite_counts(connection):
+                logger.info("Added and backfilled movies.favorite_count")
+            install_version_triggers(connection)
+        with SessionLocal() as db:
+            db.execute(text("SELECT 1"))
+            if settings.CATALOG_SNAPSHOT:
+                catalog_snapshot.refresh(db)
+            recommendation_index.refresh(db)
+    except SQLAlchemyError:
+        logger.warning("Warm-up failed, caches will be built lazily", exc_info=True)
+        return
+    logger.info("Warmed up in %.1fs", time.perf_counter() - started)
+
+
+# Закрытие соединений пула перед fork(): воркеры не должны делить сокеты и файлы
+# соединений мастера, каждый открывает свои
+def _release_connections() -> None:
+    from app.db.session import engine, read_engine
+
+    engine.dispose()
+    read_engine.dispose()
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+# Мастер-процесс: запуск, перезапуск и остановка воркеров
+class Arbiter:
+    def __init__(
+        self,
+        *,
+        host: str,
+        port: int,
+        workers: int,
+        preload: bool = True,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        graceful_timeout: int = 30,
+        ready_timeout: int = 60,
+        log_level: str = "info",
+        access_log: bool = True,
+    ):
+        self.host = host
+        self.port = port
+        self.count = workers
+        self.preload = preload
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self.log_level = log_level
+        self.access_log = access_log
+        self.app = None
+        self.workers: dict[int, Worker] = {}
+        # Воркеры, ожидающие замены при поочерёдном перезапуске
+        self._rollout: list[int] = []
+        self._signals: list[int] = []
+        self._stopping = False
+        self._exit_code = 0
+
+    def run(self) -> int:
+        self.socket = _bind(self.host, self.port)
+        if self.preload:
+            self.app = _load_app()
+            warm_up()
+            _release_connections()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_w, False)
+        signal.set_wakeup_fd(self._wakeup_w)
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, self._handle_signal)
+        logger.info(
+            "Listening on %s:%d with %d workers (pid %d)",
+            self.host,
+            self.port,
+            self.count,
+            os.getpid(),
+        )
+        while True:
+            self._reap()
+            self._process_signals()
+            if self._stopping:
+                if not self.workers:
+                    break
+            else:
+                self._maintain()
+            self._kill_stuck()
+            self._wait(1.0)
+        self.socket.close()
+        logger.info("Shutdown complete")
+        return self._exit_code
+
+    def _handle_signal(self, sig: int, frame) -> None:
+        if sig != signal.SIGCHLD:
+            self._signals.append(sig)
+
+    def _process_signals(self) -> None:
+        while self._signals:
+            sig = self._signals.pop(0)
+            if sig == signal.SIGHUP and not self._stopping:
+                self._reload()
+            elif sig in (signal.SIGTERM, signal.SIGINT):
+                self.stop()
+
+    # Поочерёдная замена всех текущих воркеров
+    def _reload(self) -> None:
+        logger.info("Rolling restart of %d workers", len(self.workers))
+        if self.preload:
+            warm_up()
+            _release_connections()
+        self._rollout = [
+            pid for pid, worker in self.workers.items() if worker.kill_at is None
+        ]
+
+    # Плавная остановка: воркеры дообслуживают запросы и завершаются
+    def stop(self, exit_code: int = 0) -> None:
+        if not self._stopping:
+            logger.info("Stopping %d workers", len(self.workers))
+        self._stopping = True
+        self._exit_code = self._exit_code or exit_code
+        self._rollout = []
+        for worker in list(self.workers.values()):
+            self._retire(worker)
+
+    def _retire(self, worker: Worker) -> None:
+        if worker.kill_at is not None:
+            return
+        worker.kill_at = time.monotonic() + self.graceful_timeout + KILL_GRACE
+        try:
+            os.kill(worker.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    # Запуск недостающих воркеров и следующий шаг поочерёдного перезапуска
+    def _maintain(self) -> None:
+        active = [w for w in self.workers.values() if w.kill_at is None]
+        for _ in range(self.count - len(active)):
+            self._spawn()
+        booting = any(w.replaces and not w.ready for w in self.workers.values())
+        while self._rollout and not booting:
+            old = self.workers.get(self._rollout.pop(0))
+            if old is not None and old.kill_at is None:
+                self._spawn(replaces=old.pid)
+                booting = True
+
+    # Принудительная остановка зависших воркеров и не запустившихся вовремя
+    def _kill_stuck(self) -> None:
+        now = time.monotonic()
+        for worker in list(self.workers.values()):
+            stuck = worker.kill_at is not None and now > worker.kill_at
+            if not worker.ready and now - worker.started_at > self.ready_timeout:
+                logger.error("Worker %d did not become ready in time", worker.pid)
+                stuck = True
+            if stuck:
+                try:
+                    os.kill(worker.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
+    def _wait(self, timeout: float) -> None:
+        pending = {
+            w.ready_fd: w for w in self.workers.values() if w.ready_fd is not None
+        }
+        try:
+            readable, _, _ = select.select([self._wakeup_r, *pending], [], [], timeout)
+        except InterruptedError:
+            return
+        for fd in readable:
+            if fd == self._wakeup_r:
+                os.read(self._wakeup_r, 4096)
+                continue
+            worker = pending[fd]
+            data = os.read(fd, 1)
+            os.close(fd)
+            worker.ready_fd = None
+            if data:
+                self._on_ready(worker)
+
+    def _on_ready(self, worker: Worker) -> None:
+        worker.ready = True
+        logger.info("Worker %d is ready", worker.pid)
+        old = self.workers.get(worker.replaces) if worker.replaces else None
+        if old is not None:
+            logger.info("Worker %d replaces worker %d", worker.pid, old.pid)
+            self._retire(old)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if worker.ready_fd is not None:
+                os.close(worker.ready_fd)
+            code = os.waitstatus_to_exitcode(status)
+            if worker.kill_at is not None or self._stopping:
+                logger.info("Worker %d stopped", pid)
+            elif not worker.ready and worker.replaces:
+                # Новый код не запускается: старые воркеры продолжают работу
+                logger.error("Worker %d failed to boot, restart aborted", pid)
+                self._rollout = []
+            elif not worker.ready:
+                logger.error("Worker %d failed to boot (code %d)", pid, code)
+                self.stop(exit_code=1)
+            else:
+                logger.info("Worker %d exited (code %d), starting another", pid, code)
+
+    def _spawn(self, replaces: Optional[int] = None) -> None:
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            code = 0
+            try:
+                self._serve(ready_w)
+            except BaseException:
+                logger.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(ready_w)
+        self.workers[pid] = Worker(pid, ready_r, replaces)
+
+    # Тело процесса-воркера
+    def _serve(self, ready_fd: int) -> None:
+        signal.set_wakeup_fd(-1)
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+        for pending in self.workers.values():
+            if pending.ready_fd is not None:
+                os.close(pending.ready_fd)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        # На время работы uvicorn ставит свои обработчики SIGTERM и SIGINT, а после
+        # плавной остановки повторяет пойманный сигнал: он должен быть проигнорирован
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        random.seed()
+        app = self.app
+        if app is None:
+            _unload_app_modules()
+            app = _load_app()
+            warm_up()
+        limit = None
+        if self.max_requests:
+            limit = self.max_requests + random.randint(0, self.max_requests_jitter)
+        config = uvicorn.Config(
+            app,
+            lifespan="on",
+            limit_max_requests=limit,
+            timeout_graceful_shutdown=self.graceful_timeout,
+            log_level=self.log_level,
+            access_log=self.access_log,
+        )
+        _WorkerServer(config, ready_fd).run(sockets=[self.socket])
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the API with several workers")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS or os.cpu_count()
+    )
+    parser.add_argument(
+        "--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS
+    )
+    parser.add_argument(
+        "--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=settings.SERVER_GRACEFUL_TIMEOUT
+    )
+    parser.add_argument(
+        "--ready-timeout", type=int, default=settings.SERVER_READY_TIMEOUT
+    )
+    parser.add_argument(
+        "--no-preload",
+        dest="preload",
+        action="store_false",
+        help="import the app in each worker (SIGHUP then picks up new code)",
+    )
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--no-access-log", dest="access_log", action="store_false")
+    args = parser.parse_args(argv)
+    # Очередь отложенной записи избранного живёт в памяти одного процесса: чтение,
+    # попавшее в другой воркер, не увидело бы ещё не зафиксированные изменения
+    if settings.FAVORITES_WRITE_BEHIND and args.workers > 1:
+        parser.error("FAVORITES_WRITE_BEHIND requires --workers 1")
+    logging.basicConfig(
+        level=args.log_level.upper(), format="%(asctime)s [%(process)d] %(message)s"
+    )
+    arbiter = Arbiter(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        preload=args.preload,
+        max_requests=args.max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        graceful_timeout=args.graceful_timeout,
+        ready_timeout=args.ready_timeout,
+        log_level=args.log_level,
+        access_log=args.access_log,
+    )
+    return arbiter.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,7 +14,10 @@ from app.models.user import User
 from app.schemas.token import Token
 
 # Импорт CRUD операций для пользователей
-from app.crud.user import crud_user
+from app.crud.user import async_crud_user, crud_user
+
+# Импорт пула процессов для bcrypt
+from app.core.password_pool import password_pool
 
 
 # Функция для аутентификации пользователя
@@ -31,10 +34,36 @@ def authenticate_user(db, username: str, password: str) -> User | None:
     return user
 
 
+# Асинхронная аутентификация: проверка bcrypt выполняется в пуле процессов
+async def authenticate_user_async(db, username: str, password: str) -> User | None:
+    # Получаем пользователя из базы данных по имени пользователя
+    user = await async_crud_user.get_by_username(db, username=username)
+    # Если пользователь не найден, возвращаем None
+    if not user:
+        return None
+    # Проверяем пароль вне потоков веб-сервера
+    if not await password_pool.verify(password, user.hashed_password):
+        return None
+    # Если все проверки пройдены, возвращаем пользователя
+    return user
+
+
 # Функция для входа пользователя в систему
 def login_user(db, username: str, password: str) -> Token:
     # Сначала аутентифицируем пользователя
     user = authenticate_user(db, username, password)
+    # Возвращаем токен или ошибку аутентификации
+    return _issue_token(user)
+
+
+# Асинхронный вход пользователя в систему (используется эндпоинтом /auth/login)
+async def login_user_async(db, username: str, password: str) -> Token:
+    user = await authenticate_user_async(db, username, password)
+    return _issue_token(user)
+
+
+# Выпуск токена для аутентифицированного пользователя
+def _issue_token(user: User | None) -> Token:
     # Если аутентификация не удалась, возвращаем ошибку
     if not user:
         raise HTTPException(
@@ -0,0 +1,98 @@
+# Потоковая выгрузка каталога фильмов в NDJSON или CSV
+# Строки читаются курсором на стороне сервера (stream_results + yield_per) и сразу
+# сериализуются в байтовые фрагменты, поэтому потребление памяти не зависит от размера
+# каталога: ORM-объекты и Pydantic-модели не создаются, список результатов не строится.
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.crud.movie import crud_movie
+from app.models.movie import Movie
+from app.schemas.movie import MovieFilter
+from app.services.catalog_import import COLUMNS
+
+# Поддерживаемые форматы выгрузки
+FORMATS = ("ndjson", "csv")
+
+# MIME-типы форматов выгрузки
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Колонки выгрузки; формат совместим с импортом (app/services/catalog_import.py)
+EXPORT_COLUMNS = ("id",) + COLUMNS
+
+
+# Запрос на выборку колонок таблицы movies (без ORM-объектов) в порядке id
+def export_query(filters: Optional[MovieFilter] = None) -> Select:
+    query = select(*(getattr(Movie, name) for name in EXPORT_COLUMNS))
+    return crud_movie.apply_filters(query, filters).order_by(Movie.id)
+
+
+# Чтение строк пачками по chunk_size через курсор на стороне сервера
+def iter_rows(db: Session, query: Select, chunk_size: int) -> Iterator[list]:
+    result = db.execute(
+        query.execution_options(stream_results=True, yield_per=chunk_size)
+    )
+    for partition in result.partitions():
+        yield partition
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _encode_ndjson(rows: list) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=_json_default) + "\n"
+        for row in rows
+    )
+
+
+def _encode_csv(rows: list) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue()
+
+
+# Генератор байтовых фрагментов выгрузки: один фрагмент на пачку строк
+# Сессия закрывается по окончании потока (или при обрыве соединения клиентом)
+def stream_export(
+    db: Session,
+    fmt: str,
+    *,
+    filters: Optional[MovieFilter] = None,
+    compress: bool = False,
+    chunk_size: int = 1_000,
+) -> Iterator[bytes]:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of: ndjson, csv")
+    encode = _encode_ndjson if fmt == "ndjson" else _encode_csv
+    # wbits=16+MAX_WBITS — заголовок и контрольная сумма формата gzip
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compress else data
+
+    try:
+        if fmt == "csv":
+            yield emit(",".join(EXPORT_COLUMNS) + "\n")
+        for rows in iter_rows(db, export_query(filters), chunk_size):
+            chunk = emit(encode(rows))
+            if chunk:
+                yield chunk
+        if compress:
+            yield compressor.flush()
+    finally:
+        db.close()
@@ -0,0 +1,173 @@
+# Массовый импорт каталога фильмов из потока NDJSON или CSV
+# Файл читается построчно (без загрузки целиком в память), имена жанров и режиссёров
+# разрешаются в ID через словари в памяти, строки вставляются пачками через executemany
+# по одной транзакции на пачку. Ошибочные строки попадают в отчёт и не прерывают импорт.
+import csv
+import json
+from typing import Iterable, Iterator, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud.movie import crud_movie
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.schemas.movie import MovieImportError, MovieImportReport, MovieImportRow
+
+# Поддерживаемые форматы входного файла
+FORMATS = ("ndjson", "csv")
+
+# Колонки таблицы movies, заполняемые при импорте
+COLUMNS = (
+    "title",
+    "description",
+    "release_date",
+    "duration",
+    "rating",
+    "poster_url",
+    "genre_id",
+    "director_id",
+)
+
+
+# Определение формата по имени файла
+def detect_format(filename: str | None) -> str | None:
+    if not filename:
+        return None
+    lowered = filename.lower()
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return None
+
+
+# Разбор NDJSON: (номер строки, словарь) или (номер строки, текст ошибки)
+def iter_ndjson(stream: TextIO) -> Iterator[tuple[int, dict | str]]:
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(value, dict):
+            yield line_no, "Expected a JSON object"
+            continue
+        yield line_no, value
+
+
+# Разбор CSV с заголовком; пустые ячейки считаются отсутствующими значениями
+def iter_csv(stream: TextIO) -> Iterator[tuple[int, dict | str]]:
+    reader = csv.DictReader(stream)
+    for record in reader:
+        yield reader.line_num, {k: v for k, v in record.items() if k and v != ""}
+
+
+# Словари для разрешения имён: название жанра -> ID, "Имя Фамилия" режиссёра -> ID
+def _load_lookups(db: Session):
+    genres = {
+        name.casefold(): id for id, name in db.execute(select(Genre.id, Genre.name))
+    }
+    directors = {
+        f"{first} {last}".casefold(): id
+        for id, first, last in db.execute(
+            select(Director.id, Director.first_name, Director.last_name)
+        )
+    }
+    return genres, directors, set(genres.values()), set(directors.values())
+
+
+def import_movies(
+    db: Session,
+    records: Iterable[tuple[int, dict | str]],
+    *,
+    batch_size: int = 5_000,
+    max_errors: int = 1_000,
+) -> MovieImportReport:
+    report = MovieImportReport()
+    genres, directors, genre_ids, director_ids = _load_lookups(db)
+
+    def fail(line: int, error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < max_errors:
+            report.errors.append(MovieImportError(line=line, error=error))
+
+    batch: list[tuple[int, dict]] = []
+    for line, record in records:
+        if isinstance(record, str):
+            fail(line, record)
+            continue
+        try:
+            row = MovieImportRow(**record)
+        except ValidationError as e:
+            fail(line, _format_validation_error(e))
+            continue
+        genre_id = row.genre_id
+        if genre_id is None and row.genre is not None:
+            genre_id = genres.get(row.genre.strip().casefold())
+        if genre_id not in genre_ids:
+            fail(line, f"Unknown genre: {row.genre or row.genre_id}")
+            continue
+        director_id = row.director_id
+        if director_id is None and row.director is not None:
+            director_id = directors.get(" ".join(row.director.split()).casefold())
+        if director_id not in director_ids:
+            fail(line, f"Unknown director: {row.director or row.director_id}")
+            continue
+        values = row.model_dump(include=set(COLUMNS))
+        values.update(genre_id=genre_id, director_id=director_id)
+        batch.append((line, values))
+        if len(batch) >= batch_size:
+            _flush(db, batch, report, fail)
+            batch = []
+    if batch:
+        _flush(db, batch, report, fail)
+    # Кэши списков и карточек фильмов больше не актуальны
+    crud_movie.invalidate()
+    return report
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in error.errors()
+    )
+
+
+# Вставка пачки одной транзакцией; при ошибке БД пачка повторяется построчно,
+# чтобы отделить конкретные ошибочные строки
+def _flush(db: Session, batch: list[tuple[int, dict]], report, fail) -> None:
+    try:
+        db.execute(insert(Movie), [values for _, values in batch])
+        crud_movie.adjust_facets(
+            db, crud_movie.facet_changes([values for _, values in batch], 1)
+        )
+        db.commit()
+        report.inserted += len(batch)
+        return
+    except IntegrityError:
+        db.rollback()
+    for line, values in batch:
+        try:
+            db.execute(insert(Movie), [values])
+            crud_movie.adjust_facets(db, crud_movie.facet_changes([values], 1))
+            db.commit()
+            report.inserted += 1
+        except IntegrityError as e:
+            db.rollback()
+            fail(line, str(e.orig))
+
+
+# Импорт из текстового потока в указанном формате
+def import_stream(db: Session, stream: TextIO, fmt: str, **kwargs) -> MovieImportReport:
+    if fmt not in FORMATS:
+        raise ValueError(
+            f"Unsupported format '{fmt}', expected one of: {', '.join(FORMATS)}"
+        )
+    records = iter_ndjson(stream) if fmt == "ndjson" else iter_csv(stream)
+    return import_movies(db, records, **kwargs)
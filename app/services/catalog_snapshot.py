@@ -0,0 +1,775 @@
+# Колоночный снимок каталога фильмов (read model для GET /movies)
+# Каждая колонка movies хранится массивом NumPy: числа и даты — массивами фиксированной
+# ширины (NULL — NaN, NaT или NULL_INT), строки — одним буфером UTF-8 с таблицей
+# смещений, без объекта str на каждое значение. Для полей сортировки заранее
+# построены перестановки в порядке ORDER BY поле, id (как в SQLite: NULL первыми),
+# поэтому фильтрация, сортировка и keyset-пагинация — векторные операции над
+# порциями перестановки, а объекты Python создаются только для строк страницы.
+# Жанры и режиссёры хранятся так же (по возрастанию id) для раскрытия expand=.
+#
+# Снимок неизменяем: после изменения каталога через CRUD (invalidate в app/crud)
+# он перестраивается в фоновом потоке и подменяется целиком (copy-on-write), а до
+# этого списки читаются из базы. Снимок помнит версии таблиц каталога
+# (app/db/versions.py), прочитанные перед построением: фоновая проверка раз
+# в CATALOG_SNAPSHOT_MAX_AGE секунд перестраивает его, только если версии в базе
+# изменились (запись из других процессов), и до готовности отдаёт предыдущий снимок.
+# Свежесть не зависит от системных часов. Счётчики избранного (favorite_count)
+# меняются с каждым кликом и в снимок не входят: для строк страницы они читаются
+# из базы. Снимок, которому на фильм нужно больше CATALOG_SNAPSHOT_MAX_BYTES_PER_MOVIE
+# байт, не используется.
+#
+# С CATALOG_SNAPSHOT_PATH снимок строится в файл, а процессы-воркеры отображают
+# его в память (mmap) и читают массивы без копирования: страницы файла общие
+# для всех процессов через page cache. Файл заменяется атомарно (os.replace),
+# номер поколения в заголовке увеличивается при каждой перестройке. Фоновый поток
+# воркера раз в CATALOG_SNAPSHOT_CHECK_INTERVAL секунд сравнивает версии таблиц
+# в заголовке файла с базой: совпадающее новое поколение отображается, устаревший
+# файл перестраивается. Запросы только читают текущий снимок.
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import ReadSessionLocal
+from app.db.versions import get_versions
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.schemas.movie import MovieFilter
+
+logger = logging.getLogger(__name__)
+
+# Размер пачки строк при построении снимка
+FETCH_SIZE = 50_000
+# Количество позиций перестановки, фильтруемых за один шаг
+CHUNK_SIZE = 65_536
+# Значение NULL в целочисленных колонках
+NULL_INT = np.iinfo(np.int32).min
+
+# Тип колонок даты и времени (NULL — NaT)
+DATETIME = "datetime64[us]"
+
+# Колонки снимка: имя -> тип NumPy (строковые колонки — None)
+COLUMNS = {
+    "id": np.int64,
+    "title": None,
+    "description": None,
+    "release_date": DATETIME,
+    "duration": np.int32,
+    "rating": np.float64,
+    "poster_url": None,
+    "created_at": DATETIME,
+    "updated_at": DATETIME,
+    "genre_id": np.int32,
+    "director_id": np.int32,
+}
+
+# Вложенные объекты фильма: имя -> (модель, строковые колонки)
+# Колонки совпадают с раскрываемыми полями app/crud/movie.RELATIONS
+RELATED = {
+    "genre": (Genre, ("name",)),
+    "director": (Director, ("first_name", "last_name", "biography")),
+}
+
+# Таблицы, версии которых определяют актуальность снимка
+VERSIONED_TABLES = ("movies", "genres", "directors")
+
+# Формат файла снимка: заголовок (сигнатура, версия формата, длина описания,
+# поколение, время начала построения, версии VERSIONED_TABLES или -1), описание
+# массивов в JSON, затем массивы, выровненные по ALIGNMENT байт
+MAGIC = b"MLCATSNP"
+FORMAT_VERSION = 3
+HEADER = struct.Struct("<8sIIQd3q")
+ALIGNMENT = 64
+
+
+# Заголовок файла снимка
+class SnapshotHeader(NamedTuple):
+    generation: int
+    built_at: float
+    manifest_size: int
+    versions: Optional[tuple[int, ...]]
+
+
+# Версии таблиц каталога или None, если база их не поддерживает
+def read_versions(db: Session) -> Optional[tuple[int, ...]]:
+    versions = get_versions(db, VERSIONED_TABLES)
+    if versions is None:
+        return None
+    return tuple(versions[table] for table in VERSIONED_TABLES)
+
+
+# Строковая колонка: значения подряд в одном буфере UTF-8, значение i занимает
+# heap[offsets[i]:offsets[i + 1]]; NULL отмечается в маске nulls
+# Буфер — bytes или memoryview отображённого файла
+class StringColumn:
+    def __init__(self, heap, offsets: np.ndarray, nulls: np.ndarray):
+        self.heap = heap
+        self.offsets = offsets
+        self.nulls = nulls
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self.nulls[index]:
+            return None
+        return str(self.heap[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+    def take(self, rows: Iterable[int]) -> list[Optional[str]]:
+        return [self[row] for row in rows]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.heap) + self.offsets.nbytes + self.nulls.nbytes
+
+
+class _StringColumnBuilder:
+    def __init__(self):
+        self.parts: list[bytes] = []
+        self.lengths: list[np.ndarray] = []
+        self.nulls: list[np.ndarray] = []
+
+    def extend(self, values: list[Optional[str]]) -> None:
+        encoded = [value.encode() if value is not None else b"" for value in values]
+        self.parts.append(b"".join(encoded))
+        self.lengths.append(np.fromiter(map(len, encoded), np.int64, len(encoded)))
+        self.nulls.append(np.array([value is None for value in values], dtype=bool))
+
+    def build(self) -> StringColumn:
+        if self.lengths:
+            lengths = np.concatenate(self.lengths)
+        else:
+            lengths = np.zeros(0, dtype=np.int64)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        nulls = np.concatenate(self.nulls) if self.nulls else np.zeros(0, bool)
+        return StringColumn(b"".join(self.parts), offsets, nulls)
+
+
+class CatalogSnapshot:
+    def __init__(
+        self,
+        columns: dict[str, Any],
+        orders: dict[str, np.ndarray],
+        title_ranks: np.ndarray,
+        title_firsts: np.ndarray,
+        relations: dict[str, dict[str, Any]],
+    ):
+        self.columns = columns
+        # Перестановки строк в порядке (поле, id) по возрастанию
+        self.orders = orders
+        # Плотный ранг названия (равные названия — равный ранг) и первая строка
+        # каждого ранга: сравнение названий сводится к сравнению чисел
+        self.title_ranks = title_ranks
+        self.title_firsts = title_firsts
+        # Жанры и режиссёры: имя -> колонки (id по возрастанию и колонки RELATED)
+        self.relations = relations
+        self.ids: np.ndarray = columns["id"]
+        self.size = len(self.ids)
+        # Время начала построения (time.time()) — только для отображения возраста
+        self.built_at = time.time()
+        # Версии таблиц каталога, прочитанные до данных снимка (None — неизвестны)
+        self.versions: Optional[tuple[int, ...]] = None
+        self.build_seconds = 0.0
+        # Поколение файла снимка (0 — снимок только в памяти процесса)
+        self.generation = 0
+        # Размер отображённого файла снимка
+        self.file_size = 0
+
+    # Построение снимка по таблицам movies, genres и directors
+    @classmethod
+    def build(cls, db: Session) -> "CatalogSnapshot":
+        built_at = time.time()
+        started = time.perf_counter()
+        # Версии читаются до данных: изменение во время построения сделает снимок
+        # устаревшим при следующей проверке, но не будет пропущено
+        versions = read_versions(db)
+        connection = db.connection()
+        # SQLite хранит даты строками ISO 8601: NumPy разбирает их сам, без создания
+        # объекта datetime на каждое значение
+        raw_dates = connection.dialect.name == "sqlite"
+        query = select(
+            *(
+                type_coerce(getattr(Movie, name), String)
+                if raw_dates and dtype == DATETIME
+                else getattr(Movie, name)
+                for name, dtype in COLUMNS.items()
+            )
+        ).order_by(Movie.id)
+        strings = {
+            name: _StringColumnBuilder()
+            for name, dtype in COLUMNS.items()
+            if dtype is None
+        }
+        parts: dict[str, list[np.ndarray]] = {
+            name: [] for name, dtype in COLUMNS.items() if dtype is not None
+        }
+        titles: list[str] = []
+        result = connection.execute(query.execution_options(yield_per=FETCH_SIZE))
+        for rows in result.partitions():
+            values = dict(zip(COLUMNS, zip(*rows)))
+            titles.extend(values["title"])
+            for name, builder in strings.items():
+                builder.extend(values[name])
+            for name, column in parts.items():
+                data = values[name]
+                if COLUMNS[name] is np.int32:
+                    data = [NULL_INT if value is None else value for value in data]
+                elif COLUMNS[name] == DATETIME and raw_dates:
+                    data = ["NaT" if value is None else value for value in data]
+                column.append(np.array(data, dtype=COLUMNS[name]))
+        columns: dict[str, Any] = {
+            name: np.concatenate(column) if column else np.zeros(0, COLUMNS[name])
+            for name, column in parts.items()
+        }
+        columns.update({name: builder.build() for name, builder in strings.items()})
+        ids = columns["id"]
+        ratings = columns["rating"]
+        orders = {
+            # Сортировка устойчива, а строки уже упорядочены по id
+            "title": np.array(
+                sorted(range(len(titles)), key=titles.__getitem__), dtype=np.int32
+            ),
+            "rating": np.lexsort(
+                (ids, np.where(np.isnan(ratings), -np.inf, ratings))
+            ).astype(np.int32),
+            "release_date": np.lexsort(
+                (ids, columns["release_date"].view(np.int64))
+            ).astype(np.int32),
+        }
+        relations = {}
+        for name, (model, names) in RELATED.items():
+            query = select(model.id, *(getattr(model, column) for column in names))
+            rows = connection.execute(query.order_by(model.id)).all()
+            values = list(zip(*rows)) or [()] * (len(names) + 1)
+            relations[name] = {"id": np.array(values[0], dtype=np.int64)}
+            for column, data in zip(names, values[1:]):
+                builder = _StringColumnBuilder()
+                builder.extend(list(data))
+                relations[name][column] = builder.build()
+        snapshot = cls(
+            columns, orders, *_rank_titles(orders["title"], titles), relations
+        )
+        snapshot.built_at = built_at
+        snapshot.versions = versions
+        snapshot.build_seconds = time.perf_counter() - started
+        return snapshot
+
+    # Все массивы снимка под плоскими именами: "таблица.колонка" (строковые колонки —
+    # "таблица.колонка.heap|offsets|nulls"), "order.поле", "title.ranks|firsts"
+    def arrays(self) -> dict[str, np.ndarray]:
+        arrays = {}
+        for table, columns in {"movie": self.columns, **self.relations}.items():
+            for name, column in columns.items():
+                if isinstance(column, StringColumn):
+                    arrays[f"{table}.{name}.heap"] = np.frombuffer(
+                        column.heap, dtype=np.uint8
+                    )
+                    arrays[f"{table}.{name}.offsets"] = column.offsets
+                    arrays[f"{table}.{name}.nulls"] = column.nulls
+                else:
+                    arrays[f"{table}.{name}"] = column
+        for sort, order in self.orders.items():
+            arrays[f"order.{sort}"] = order
+        arrays["title.ranks"] = self.title_ranks
+        arrays["title.firsts"] = self.title_firsts
+        return arrays
+
+    # Снимок из массивов с именами arrays()
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "CatalogSnapshot":
+        tables: dict[str, dict[str, Any]] = {}
+        for key, array in arrays.items():
+            table, name, *part = key.split(".")
+            columns = tables.setdefault(table, {})
+            if part:
+                columns.setdefault(name, {})[part[0]] = array
+            else:
+                columns[name] = array
+        for columns in tables.values():
+            for name, column in columns.items():
+                if isinstance(column, dict):
+                    columns[name] = StringColumn(
+                        memoryview(column["heap"]), column["offsets"], column["nulls"]
+                    )
+        orders = tables.pop("order")
+        title = tables.pop("title")
+        movies = tables.pop("movie")
+        return cls(movies, orders, title["ranks"], title["firsts"], tables)
+
+    # Запись снимка в файл формата MAGIC/FORMAT_VERSION
+    def save(self, path: str) -> None:
+        arrays = self.arrays()
+        entries, offset = {}, 0
+        for key, array in arrays.items():
+            entries[key] = [array.dtype.str, len(array), offset]
+            offset = _align(offset + array.nbytes)
+        manifest = json.dumps(
+            {"build_seconds": self.build_seconds, "arrays": entries}
+        ).encode()
+        header = HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            len(manifest),
+            self.generation,
+            self.built_at,
+            *(self.versions or (-1,) * len(VERSIONED_TABLES)),
+        )
+        base = _align(len(header) + len(manifest))
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(manifest)
+            for key, array in arrays.items():
+                f.seek(base + entries[key][2])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(base + offset)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Отображение файла снимка в память: массивы читают страницы файла без копирования
+    @classmethod
+    def load(cls, path: str) -> "CatalogSnapshot":
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _parse_header(mapped[: HEADER.size], path)
+        end = HEADER.size + header.manifest_size
+        manifest = json.loads(mapped[HEADER.size : end].decode())
+        base = _align(end)
+        arrays = {}
+        for key, (dtype, count, offset) in manifest["arrays"].items():
+            if count:
+                arrays[key] = np.frombuffer(
+                    mapped, dtype=dtype, count=count, offset=base + offset
+                )
+            else:
+                arrays[key] = np.zeros(0, dtype=dtype)
+        snapshot = cls.from_arrays(arrays)
+        snapshot.built_at = header.built_at
+        snapshot.versions = header.versions
+        snapshot.build_seconds = manifest["build_seconds"]
+        snapshot.generation = header.generation
+        snapshot.file_size = len(mapped)
+        return snapshot
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays().values())
+
+    @property
+    def bytes_per_movie(self) -> float:
+        return self.nbytes / self.size if self.size else 0.0
+
+    # Значения колонки для строк страницы (NULL — None)
+    def values(self, name: str, rows: np.ndarray) -> list:
+        return _column_values(self.columns[name], rows)
+
+    # Вложенные объекты (genre, director) по ID с колонками fields; None — нет такого
+    def related(
+        self, name: str, fields: Iterable[str], keys: list[int]
+    ) -> list[Optional[dict]]:
+        table = self.relations[name]
+        ids = table["id"]
+        if not len(ids):
+            return [None] * len(keys)
+        keys_array = np.asarray(keys, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(ids, keys_array), len(ids) - 1)
+        found = ids[positions] == keys_array
+        rows = positions[found]
+        columns = {field: iter(_column_values(table[field], rows)) for field in fields}
+        return [
+            {field: next(values) for field, values in columns.items()} if hit else None
+            for hit in found.tolist()
+        ]
+
+    # Строки страницы в порядке сортировки: фильтры, keyset-курсор after
+    # (значение ключа, id последней записи) или пропуск skip первых строк
+    def select(
+        self,
+        *,
+        filters: Optional[MovieFilter],
+        sort: str,
+        order: str,
+        skip: int,
+        limit: int,
+        after: Optional[tuple[Any, int]] = None,
+    ) -> np.ndarray:
+        conditions = filters.model_dump(exclude_none=True) if filters else {}
+        permutation = self.orders.get(sort)
+        # Границы непросмотренной части порядка (в позициях перестановки)
+        start, stop = 0, self.size
+        if after is not None and order == "asc":
+            start = self._count_before(sort, *after, inclusive=True)
+        elif after is not None:
+            stop = self._count_before(sort, *after, inclusive=False)
+        needed = skip + limit
+        if not conditions:
+            if order == "asc":
+                positions = np.arange(start + skip, min(start + needed, stop))
+            else:
+                end = max(stop - needed, start)
+                positions = np.arange(stop - 1 - skip, end - 1, -1)
+            return positions if permutation is None else permutation[positions]
+        chunks, found = [], 0
+        while start < stop and found < needed:
+            if order == "asc":
+                positions = np.arange(start, min(start + CHUNK_SIZE, stop))
+                start += CHUNK_SIZE
+            else:
+                end = max(stop - CHUNK_SIZE, start)
+                positions = np.arange(stop - 1, end - 1, -1)
+                stop -= CHUNK_SIZE
+            rows = positions if permutation is None else permutation[positions]
+            rows = rows[self._matches(rows, conditions)]
+            chunks.append(rows)
+            found += len(rows)
+        if not chunks:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(chunks)[skip:needed]
+
+    # Условия фильтров каталога (app/crud/movie.py: apply_filters) для строк rows
+    def _matches(self, rows: np.ndarray, conditions: dict[str, Any]) -> np.ndarray:
+        columns = self.columns
+        mask = np.ones(len(rows), dtype=bool)
+        for name, value in conditions.items():
+            if name in ("genre_id", "director_id"):
+                mask &= columns[name][rows] == value
+            elif name in ("min_rating", "max_rating"):
+                ratings = columns["rating"][rows]
+                mask &= ratings >= value if name == "min_rating" else ratings <= value
+            elif name in ("released_from", "released_to"):
+                dates = columns["release_date"][rows]
+                bound = _datetime64(value)
+                mask &= dates >= bound if name == "released_from" else dates <= bound
+            else:
+                durations = columns["duration"][rows]
+                known = durations != NULL_INT
+                if name == "min_duration":
+                    mask &= known & (durations >= value)
+                else:
+                    mask &= known & (durations <= value)
+        return mask
+
+    # Количество строк, идущих в порядке (поле, id) по возрастанию до позиции курсора
+    # (inclusive — включая саму строку курсора)
+    def _count_before(self, sort: str, value: Any, id: int, *, inclusive: bool) -> int:
+        side = "right" if inclusive else "left"
+        if sort == "id":
+            return int(np.searchsorted(self.ids, id, side=side))
+        ids_before = self.ids <= id if inclusive else self.ids < id
+        if sort == "title":
+            rank, exists = self._title_rank(value)
+            keys = self.title_ranks
+            before = keys < rank
+            if not exists:
+                return int(np.count_nonzero(before))
+            return int(np.count_nonzero(before | ((keys == rank) & ids_before)))
+        if sort == "rating":
+            ratings = self.columns["rating"]
+            keys = np.where(np.isnan(ratings), -np.inf, ratings)
+            key = -np.inf if value is None else float(value)
+        else:
+            keys = self.columns["release_date"].view(np.int64)
+            key = np.datetime64("NaT", "us").view(np.int64)
+            if value is not None:
+                key = _datetime64(value).view(np.int64)
+        return int(np.count_nonzero((keys < key) | ((keys == key) & ids_before)))
+
+    # Ранг названия среди различных названий (бинарный поиск по первым строкам
+    # рангов) и признак того, что такое название есть в снимке
+    def _title_rank(self, title: str) -> tuple[int, bool]:
+        titles = self.columns["title"]
+        low, high = 0, len(self.title_firsts)
+        while low < high:
+            middle = (low + high) // 2
+            if titles[self.title_firsts[middle]] < title:
+                low = middle + 1
+            else:
+                high = middle
+        exists = low < len(self.title_firsts) and (
+            titles[self.title_firsts[low]] == title
+        )
+        return low, exists
+
+
+# Значения колонки для строк rows (NULL — None)
+def _column_values(column, rows: np.ndarray) -> list:
+    if isinstance(column, StringColumn):
+        return column.take(rows.tolist())
+    values = column[rows].tolist()
+    if column.dtype == np.float64:
+        return [None if value != value else value for value in values]
+    if column.dtype == np.int32:
+        return [None if value == NULL_INT else value for value in values]
+    return values
+
+
+# Плотные ранги названий и первая строка каждого ранга по порядку сортировки
+def _rank_titles(order: np.ndarray, titles: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    changed = np.ones(len(order), dtype=bool)
+    previous = None
+    for position, row in enumerate(order.tolist()):
+        title = titles[row]
+        changed[position] = title != previous
+        previous = title
+    ranks = np.empty(len(order), dtype=np.int32)
+    ranks[order] = np.cumsum(changed) - 1
+    return ranks, order[changed]
+
+
+# SQLite сравнивает даты без учёта часового пояса (как их записывает SQLAlchemy)
+def _datetime64(value: datetime) -> np.datetime64:
+    return np.datetime64(value.replace(tzinfo=None), "us")
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _parse_header(data: bytes, path: str) -> SnapshotHeader:
+    if len(data) < HEADER.size or data[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a catalog snapshot file")
+    _, version, manifest_size, generation, built_at, *versions = HEADER.unpack(data)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} has unsupported snapshot format {version}")
+    known = tuple(versions) if min(versions) >= 0 else None
+    return SnapshotHeader(generation, built_at, manifest_size, known)
+
+
+# Заголовок файла снимка или None, если файла ещё нет или он другого формата
+# (тогда файл перестраивается)
+def read_header(path: str) -> Optional[SnapshotHeader]:
+    try:
+        with open(path, "rb") as f:
+            return _parse_header(f.read(HEADER.size), path)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        logger.warning("Ignoring catalog snapshot file: %s", e)
+        return None
+
+
+# Эксклюзивная блокировка перестройки файла снимка между процессами
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# Построение снимка в файл path со следующим номером поколения и его отображение
+# Если заданы versions, существующий файл с теми же версиями таблиц (его только что
+# перестроил другой процесс) отображается без перестройки
+def write_snapshot(
+    db: Session, path: str, *, versions: Optional[tuple[int, ...]] = None
+) -> CatalogSnapshot:
+    with _file_lock(path):
+        header = read_header(path)
+        if (
+            header is not None
+            and versions is not None
+            and header.versions == versions
+        ):
+            return CatalogSnapshot.load(path)
+        snapshot = CatalogSnapshot.build(db)
+        snapshot.generation = header.generation + 1 if header is not None else 1
+        temporary = f"{path}.{os.getpid()}.tmp"
+        snapshot.save(temporary)
+        os.replace(temporary, path)
+    return CatalogSnapshot.load(path)
+
+
+# Текущий снимок каталога и его фоновая перестройка
+# Запросы только читают текущий снимок и ставят фоновую проверку: чтение версий,
+# отображение нового поколения файла и перестройка выполняются в потоке _run
+class CatalogSnapshotStore:
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        # Счётчик изменений каталога в процессе (invalidate) и его значение перед
+        # получением текущего снимка: снимок актуален, пока они совпадают
+        self._changes = 0
+        self._fresh_changes: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        # Время следующей фоновой проверки актуального снимка (time.monotonic())
+        self._next_check = 0.0
+        # Время, до которого не повторяется перестройка после отказа или ошибки
+        self._retry_at = 0.0
+        self.builds = 0
+        self.remaps = 0
+        self.failures = 0
+
+    # Файл снимка, общий для процессов (None — снимок только в памяти процесса)
+    @property
+    def path(self) -> Optional[str]:
+        return settings.CATALOG_SNAPSHOT_PATH
+
+    # Интервал фоновой проверки версий таблиц (и поколения файла)
+    def _check_interval(self) -> float:
+        if self.path is not None:
+            return settings.CATALOG_SNAPSHOT_CHECK_INTERVAL
+        return settings.CATALOG_SNAPSHOT_MAX_AGE
+
+    # Отметка об изменении каталога: до перестройки списки читаются из базы
+    def invalidate(self) -> None:
+        with self._lock:
+            self._changes += 1
+
+    # Актуальный снимок или None (тогда запрос обслуживается базой данных)
+    def current(self) -> Optional[CatalogSnapshot]:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._snapshot
+            fresh = snapshot is not None and self._fresh_changes == self._changes
+            if fresh:
+                due = now >= self._next_check
+                if due:
+                    self._next_check = now + self._check_interval()
+            else:
+                due = now >= self._retry_at
+        if due:
+            self._schedule()
+        return snapshot if fresh else None
+
+    # Приведение снимка в соответствие с базой: повторное использование текущего
+    # снимка или файла с теми же версиями таблиц, иначе построение нового
+    def refresh(self, db: Session) -> Optional[CatalogSnapshot]:
+        with self._lock:
+            changes = self._changes
+            current = self._snapshot
+            # Каталог менялся в этом процессе после получения текущего снимка
+            changed = self._fresh_changes not in (None, changes)
+        versions = read_versions(db)
+        if self.path is None:
+            if current is not None and versions is not None:
+                reusable = current.versions == versions
+            else:
+                reusable = False
+            snapshot = current if reusable else self._build(db)
+        else:
+            snapshot = self._refresh_file(db, current, versions, changed)
+        return self._swap(snapshot, changes)
+
+    def _build(self, db: Session) -> CatalogSnapshot:
+        snapshot = CatalogSnapshot.build(db)
+        with self._lock:
+            self.builds += 1
+        return snapshot
+
+    # Файл с теми же версиями таблиц отображается (если это новое поколение),
+    # устаревший или отсутствующий файл перестраивается. Без версий таблиц файл
+    # другого процесса принимается, пока каталог не менялся в этом процессе
+    def _refresh_file(
+        self,
+        db: Session,
+        current: Optional[CatalogSnapshot],
+        versions: Optional[tuple[int, ...]],
+        changed: bool,
+    ) -> CatalogSnapshot:
+        header = read_header(self.path)
+        if versions is None:
+            reusable = header is not None and not changed
+        else:
+            reusable = header is not None and header.versions == versions
+        if reusable:
+            if current is not None and current.generation == header.generation:
+                return current
+            snapshot = CatalogSnapshot.load(self.path)
+            with self._lock:
+                self.remaps += 1
+            return snapshot
+        snapshot = write_snapshot(db, self.path, versions=versions)
+        with self._lock:
+            self.builds += 1
+        return snapshot
+
+    def _swap(
+        self, snapshot: CatalogSnapshot, changes: int
+    ) -> Optional[CatalogSnapshot]:
+        budget = settings.CATALOG_SNAPSHOT_MAX_BYTES_PER_MOVIE
+        now = time.monotonic()
+        with self._lock:
+            if snapshot.bytes_per_movie > budget:
+                logger.warning(
+                    "Catalog snapshot needs %.0f bytes per movie (budget %d), "
+                    "serving movie lists from the database",
+                    snapshot.bytes_per_movie,
+                    budget,
+                )
+                self._snapshot = None
+                self._fresh_changes = None
+                self._retry_at = now + settings.CATALOG_SNAPSHOT_MAX_AGE
+                return None
+            self._snapshot = snapshot
+            self._fresh_changes = changes
+            self._retry_at = 0.0
+            self._next_check = now + self._check_interval()
+        return snapshot
+
+    def _schedule(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="catalog-snapshot", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            with self.session_factory() as db:
+                self.refresh(db)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+                self._retry_at = time.monotonic() + settings.CATALOG_SNAPSHOT_MAX_AGE
+            logger.exception("Failed to refresh catalog snapshot")
+
+    # Ожидание завершения фоновой перестройки
+    def wait(self) -> None:
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    # Метрики снимка: размер, память на фильм, возраст, время построения и поколение
+    def stats(self) -> dict:
+        with self._lock:
+            snapshot = self._snapshot
+            fresh = snapshot is not None and self._fresh_changes == self._changes
+        stats = {
+            "enabled": settings.CATALOG_SNAPSHOT,
+            "path": self.path,
+            "fresh": fresh,
+            "builds": self.builds,
+            "remaps": self.remaps,
+            "failures": self.failures,
+            "budget_bytes_per_movie": settings.CATALOG_SNAPSHOT_MAX_BYTES_PER_MOVIE,
+        }
+        if snapshot is not None:
+            stats.update(
+                movies=snapshot.size,
+                bytes=snapshot.nbytes,
+                bytes_per_movie=round(snapshot.bytes_per_movie, 1),
+                age_seconds=round(time.time() - snapshot.built_at, 1),
+                build_seconds=round(snapshot.build_seconds, 3),
+                generation=snapshot.generation,
+                versions=snapshot.versions,
+                file_bytes=snapshot.file_size,
+            )
+        return stats
+
+
+catalog_snapshot = CatalogSnapshotStore(ReadSessionLocal)
@@ -0,0 +1,205 @@
+# Отложенная запись избранного (write-behind)
+# Каждое добавление или удаление в избранное — отдельная транзакция: на SQLite это
+# fsync на каждый клик и ожидание единственной блокировки записи. В режиме
+# FAVORITES_WRITE_BEHIND изменения копятся в памяти процесса, фоновый поток
+# объединяет их (добавление и удаление одной пары взаимно сокращаются) и фиксирует
+# одной транзакцией каждые FAVORITES_FLUSH_INTERVAL_MS или FAVORITES_FLUSH_MAX_OPS
+# изменений. Чтения избранного пользователя и синхронные операции над ним сначала
+# фиксируют его изменения (flush с user_id), остановка приложения — все изменения.
+# Очередь принадлежит процессу: чтение в другом воркере её не видит, поэтому режим
+# допускает только один воркер (app/server.py отказывается запускать несколько).
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.favorite import crud_favorite
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Ключ изменения: (user_id, movie_id)
+Pair = tuple[int, int]
+
+
+class FavoritesWriter:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        interval: float,
+        max_ops: int,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_ops = max_ops
+        self._lock = threading.Lock()
+        # Фиксация выполняется одна за раз: чтение после flush видит все изменения,
+        # поставленные в очередь до него
+        self._flush_lock = threading.Lock()
+        # Ожидающие изменения: пара -> True (добавить) или False (удалить)
+        self._pending: dict[Pair, bool] = {}
+        # Изменения, которые фиксируются прямо сейчас (видны state до конца фиксации)
+        self._in_flight: dict[Pair, bool] = {}
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.added = 0
+        self.removed = 0
+        self.failures = 0
+        self.max_flush_time = 0.0
+
+    def add(self, user_id: int, movie_id: int) -> None:
+        self._enqueue((user_id, movie_id), True)
+
+    def remove(self, user_id: int, movie_id: int) -> None:
+        self._enqueue((user_id, movie_id), False)
+
+    def _enqueue(self, pair: Pair, add: bool) -> None:
+        with self._lock:
+            self.enqueued += 1
+            if self._pending.get(pair, add) != add:
+                # Противоположное изменение той же пары ещё не зафиксировано
+                del self._pending[pair]
+                self.coalesced += 2
+            else:
+                self._pending[pair] = add
+            full = len(self._pending) >= self.max_ops
+        if full:
+            self._wakeup.set()
+
+    # Незафиксированное состояние пары: True — добавлена, False — удалена,
+    # None — изменений нет (действует состояние в базе данных)
+    def state(self, user_id: int, movie_id: int) -> Optional[bool]:
+        pair = (user_id, movie_id)
+        with self._lock:
+            state = self._pending.get(pair)
+            return self._in_flight.get(pair) if state is None else state
+
+    def has_pending(self, user_id: Optional[int] = None) -> bool:
+        with self._lock:
+            if user_id is None:
+                return bool(self._pending or self._in_flight)
+            return any(
+                pair[0] == user_id
+                for changes in (self._pending, self._in_flight)
+                for pair in changes
+            )
+
+    # Фиксация ожидающих изменений (всех или одного пользователя) одной транзакцией
+    # в переданной сессии или в новой сессии session_factory
+    # Возвращает количество зафиксированных изменений
+    def flush(
+        self, db: Optional[Session] = None, *, user_id: Optional[int] = None
+    ) -> int:
+        if not self.has_pending(user_id):
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                if user_id is None:
+                    changes, self._pending = self._pending, {}
+                else:
+                    changes = {
+                        pair: add
+                        for pair, add in self._pending.items()
+                        if pair[0] == user_id
+                    }
+                    for pair in changes:
+                        del self._pending[pair]
+                self._in_flight = changes
+            if not changes:
+                return 0
+            started = time.perf_counter()
+            try:
+                if db is None:
+                    with self.session_factory() as session:
+                        added, removed = crud_favorite.apply_changes(
+                            session, changes=changes
+                        )
+                else:
+                    added, removed = crud_favorite.apply_changes(db, changes=changes)
+            except Exception:
+                # Сессия запроса остаётся пригодной для дальнейшей работы
+                if db is not None:
+                    db.rollback()
+                self._restore(changes)
+                raise
+            finally:
+                with self._lock:
+                    self._in_flight = {}
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.flushes += 1
+                self.added += added
+                self.removed += removed
+                self.max_flush_time = max(self.max_flush_time, elapsed)
+            return len(changes)
+
+    # Возврат незафиксированных изменений в очередь после ошибки: изменения,
+    # поставленные за время фиксации, новее и сокращаются с возвращаемыми
+    def _restore(self, changes: dict[Pair, bool]) -> None:
+        with self._lock:
+            self.failures += 1
+            for pair, add in changes.items():
+                newer = self._pending.get(pair)
+                if newer is None:
+                    self._pending[pair] = add
+                elif newer != add:
+                    del self._pending[pair]
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Изменения остались в очереди и будут зафиксированы следующей попыткой
+                logger.exception("Failed to flush pending favorites")
+
+    # Запуск фонового потока фиксации (из lifespan приложения)
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="favorites-writer", daemon=True
+        )
+        self._thread.start()
+
+    # Остановка фонового потока и фиксация всех оставшихся изменений
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    # Метрики очереди: глубина, сокращённые изменения, количество и время фиксаций
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "pending": len(self._pending) + len(self._in_flight),
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "added": self.added,
+                "removed": self.removed,
+                "failures": self.failures,
+                "max_flush_ms": round(self.max_flush_time * 1000, 2),
+            }
+
+
+favorites_writer = FavoritesWriter(
+    SessionLocal,
+    interval=settings.FAVORITES_FLUSH_INTERVAL_MS / 1000,
+    max_ops=settings.FAVORITES_FLUSH_MAX_OPS,
+)
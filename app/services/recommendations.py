@@ -0,0 +1,338 @@
+# Контентные рекомендации фильмов на NumPy
+# Признаки фильма: one-hot жанра, десятилетия выхода и диапазона длительности,
+# нормированный рейтинг и режиссёр. Профиль пользователя — взвешенное среднее признаков
+# его избранных фильмов, оценка кандидата — скалярное произведение признаков на профиль.
+#
+# One-hot блоки у миллиона фильмов принимают лишь несколько тысяч различных сочетаний,
+# поэтому матрица признаков хранится в факторизованном виде: матрица уникальных сочетаний
+# (combos x признаки) и код сочетания для каждого фильма. Произведение матрицы на вектор
+# считается по уникальным сочетаниям и раздаётся фильмам по коду — результат тот же, что
+# у плотной матрицы (N x признаки) @ профиль, но без чтения N x 40 float32 на каждый запрос.
+# Режиссёр (признак с большим числом значений) учитывается так же — выборкой по ID.
+# Top-k выбирается через argpartition без полной сортировки.
+#
+# Индекс строится лениво при первом запросе и обновляется по строкам при изменении
+# фильмов через CRUD (app/crud/movie.py: invalidate).
+import threading
+import time
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import extract, func, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.models.favorite import Favorite
+from app.models.genre import Genre
+from app.models.movie import Movie
+
+# Веса блоков признаков в итоговой оценке
+GENRE_WEIGHT = 1.0
+DIRECTOR_WEIGHT = 0.5
+DECADE_WEIGHT = 0.3
+DURATION_WEIGHT = 0.2
+RATING_WEIGHT = 0.3
+# Дополнительный вес для любимого жанра из профиля пользователя (User.favorite_genre)
+FAVORITE_GENRE_WEIGHT = 0.5
+
+# Десятилетия выхода: 1900-е ... 2020-е (более ранние и поздние годы — в крайние корзины)
+FIRST_DECADE = 1900
+DECADES = 13
+# Границы корзин длительности в минутах: <80, 80-99, 100-119, 120-149, 150+
+DURATION_EDGES = (80, 100, 120, 150)
+DURATION_BUCKETS = len(DURATION_EDGES) + 1
+
+# Колонки, из которых строятся признаки; NULL заменяется на -1 (признак неизвестен)
+FEATURE_QUERY = select(
+    Movie.id,
+    Movie.genre_id,
+    Movie.director_id,
+    func.coalesce(Movie.rating, -1),
+    func.coalesce(extract("year", Movie.release_date), -1),
+    func.coalesce(Movie.duration, -1),
+)
+
+# Размер пачки строк при построении индекса
+FETCH_SIZE = 50_000
+
+
+class RecommendationIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._built = False
+        self._built_at = 0.0
+        # Изменённые фильмы, которые нужно перечитать перед следующим запросом
+        self._dirty: set[int] = set()
+        self._full_rebuild = False
+        self.size = 0
+        self.genre_ids = np.zeros(0, dtype=np.int64)
+        # Матрица уникальных сочетаний one-hot признаков (combos x признаки)
+        self.combos = np.zeros((0, 0), dtype=np.float32)
+        # Данные фильмов, упорядоченные по id (для поиска строки через searchsorted)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.codes = np.zeros(0, dtype=np.int32)
+        self.ratings = np.zeros(0, dtype=np.float32)
+        self.director_ids = np.zeros(0, dtype=np.int32)
+        self.max_director_id = 0
+        # Строки удалённых фильмов (исключаются из выдачи до полной перестройки)
+        self.deleted: set[int] = set()
+
+    # Отметка об изменении фильма (id=None — изменилось всё, нужна полная перестройка)
+    def invalidate(self, id: Optional[int] = None) -> None:
+        with self._lock:
+            if id is None:
+                self._full_rebuild = True
+            else:
+                self._dirty.add(id)
+
+    # Приведение индекса в актуальное состояние перед расчётом рекомендаций
+    def refresh(self, db: Session) -> None:
+        with self._lock:
+            expired = (
+                time.monotonic() - self._built_at > settings.RECOMMENDATIONS_MAX_AGE
+            )
+            if not self._built or self._full_rebuild or expired:
+                self._rebuild(db)
+            elif self._dirty:
+                self._apply(db, self._dirty)
+            self._dirty = set()
+
+    def _rebuild(self, db: Session) -> None:
+        self.genre_ids = np.array(
+            sorted(db.execute(select(Genre.id)).scalars()), dtype=np.int64
+        )
+        self.combos = self._combo_matrix()
+        total = db.execute(select(func.count(Movie.id))).scalar()
+        self.size = 0
+        self.max_director_id = 0
+        self.deleted = set()
+        self._grow(total)
+        # Чтение напрямую курсором DB-API: строки сразу превращаются в массивы NumPy,
+        # без создания объектов Row SQLAlchemy на каждую запись
+        statement = FEATURE_QUERY.order_by(Movie.id).compile(
+            db.get_bind(), compile_kwargs={"literal_binds": True}
+        )
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.execute(str(statement))
+            while rows := cursor.fetchmany(FETCH_SIZE):
+                self._append(np.array(rows, dtype=np.float64))
+        finally:
+            cursor.close()
+        self._built = True
+        self._built_at = time.monotonic()
+        self._full_rebuild = False
+
+    # Перечитывание изменённых фильмов: обновление строк, добавление новых в конец
+    # (id растут монотонно, порядок ids сохраняется), пометка удалённых
+    def _apply(self, db: Session, dirty: set[int]) -> None:
+        rows = np.array(
+            db.execute(FEATURE_QUERY.where(Movie.id.in_(dirty)).order_by(Movie.id))
+            .tuples()
+            .all(),
+            dtype=np.float64,
+        ).reshape(-1, 6)
+        if not np.isin(rows[:, 1], self.genre_ids).all():
+            # Появился новый жанр — меняется ширина матрицы признаков
+            self._rebuild(db)
+            return
+        positions = [self._row(int(id)) for id in rows[:, 0]]
+        existing = np.array([index is not None for index in positions], dtype=bool)
+        new = rows[~existing]
+        if len(new) and self.size and new[0, 0] < self.ids[self.size - 1]:
+            self._rebuild(db)
+            return
+        if existing.any():
+            indexes = np.array([i for i in positions if i is not None], dtype=np.int64)
+            self._fill(indexes, rows[existing])
+        if len(new):
+            self._append(new)
+        for id in dirty - set(rows[:, 0].astype(np.int64).tolist()):
+            index = self._row(id)
+            if index is not None:
+                self.deleted.add(index)
+
+    def _row(self, id: int) -> Optional[int]:
+        index = int(np.searchsorted(self.ids[: self.size], id))
+        if index < self.size and self.ids[index] == id:
+            return index
+        return None
+
+    def _append(self, rows: np.ndarray) -> None:
+        needed = self.size + len(rows)
+        if needed > len(self.ids):
+            self._grow(max(needed, int(len(self.ids) * 1.25) + 1024))
+        self._fill(np.arange(self.size, needed), rows)
+        self.size = needed
+
+    def _grow(self, capacity: int) -> None:
+        def grown(array):
+            result = np.zeros(capacity, dtype=array.dtype)
+            result[: self.size] = array[: self.size]
+            return result
+
+        self.ids = grown(self.ids)
+        self.codes = grown(self.codes)
+        self.ratings = grown(self.ratings)
+        self.director_ids = grown(self.director_ids)
+
+    # Смещения блоков в строке признаков: десятилетие, длительность, конец строки
+    @property
+    def _offsets(self) -> tuple[int, int, int]:
+        decade = len(self.genre_ids)
+        duration = decade + DECADES
+        return decade, duration, duration + DURATION_BUCKETS
+
+    # Матрица всех сочетаний (жанр, десятилетие или «неизвестно», длительность
+    # или «неизвестно»); номер строки совпадает с кодом сочетания (см. _fill)
+    def _combo_matrix(self) -> np.ndarray:
+        decade_offset, duration_offset, width = self._offsets
+        genre, decade, duration = (
+            grid.ravel()
+            for grid in np.meshgrid(
+                np.arange(len(self.genre_ids)),
+                np.arange(DECADES + 1),
+                np.arange(DURATION_BUCKETS + 1),
+                indexing="ij",
+            )
+        )
+        matrix = np.zeros((len(genre), width), dtype=np.float32)
+        rows = np.arange(len(genre))
+        matrix[rows, genre] = 1
+        known = decade < DECADES
+        matrix[rows[known], decade_offset + decade[known]] = 1
+        known = duration < DURATION_BUCKETS
+        matrix[rows[known], duration_offset + duration[known]] = 1
+        return matrix
+
+    # Заполнение строк индекса по массиву (id, genre_id, director_id, rating, year, duration)
+    def _fill(self, indexes: np.ndarray, rows: np.ndarray) -> None:
+        ids, genre_ids, director_ids, ratings, years, durations = rows.T
+        genres = np.searchsorted(self.genre_ids, genre_ids)
+        decades = np.where(
+            years >= 0,
+            np.clip((years - FIRST_DECADE) // 10, 0, DECADES - 1),
+            DECADES,
+        )
+        buckets = np.where(
+            durations >= 0,
+            np.searchsorted(DURATION_EDGES, durations, side="right"),
+            DURATION_BUCKETS,
+        )
+        self.codes[indexes] = (genres * (DECADES + 1) + decades) * (
+            DURATION_BUCKETS + 1
+        ) + buckets
+        self.ratings[indexes] = np.where(ratings >= 0, ratings / 10, 0)
+        self.ids[indexes] = ids
+        self.director_ids[indexes] = director_ids
+        if len(director_ids):
+            self.max_director_id = max(self.max_director_id, int(director_ids.max()))
+        self.deleted.difference_update(indexes.tolist())
+
+    # Вектор профиля пользователя (веса признаков) по строкам избранных фильмов
+    def profile(
+        self, rows: np.ndarray, favorite_genre_id: Optional[int] = None
+    ) -> np.ndarray:
+        decade_offset, duration_offset, width = self._offsets
+        vector = np.zeros(width, dtype=np.float32)
+        if len(rows):
+            vector = self.combos[self.codes[rows]].mean(axis=0)
+            vector[:decade_offset] *= GENRE_WEIGHT
+            vector[decade_offset:duration_offset] *= DECADE_WEIGHT
+            vector[duration_offset:] *= DURATION_WEIGHT
+        if favorite_genre_id is not None and favorite_genre_id in self.genre_ids:
+            vector[np.searchsorted(self.genre_ids, favorite_genre_id)] += (
+                FAVORITE_GENRE_WEIGHT
+            )
+        return vector
+
+    # Оценка всех фильмов и выбор top-k; избранные и удалённые фильмы исключаются
+    # Массивы индекса меняются на месте при refresh, поэтому расчёт идёт под той же
+    # блокировкой: иначе параллельная перестройка даёт смесь двух поколений
+    def recommend(
+        self,
+        favorite_ids: Iterable[int],
+        *,
+        favorite_genre_id: Optional[int] = None,
+        limit: int = 20,
+    ) -> list[tuple[int, float]]:
+        with self._lock:
+            return self._recommend(favorite_ids, favorite_genre_id, limit)
+
+    def _recommend(
+        self,
+        favorite_ids: Iterable[int],
+        favorite_genre_id: Optional[int],
+        limit: int,
+    ) -> list[tuple[int, float]]:
+        size = self.size
+        rows = [self._row(id) for id in favorite_ids]
+        rows = np.array(
+            [row for row in rows if row is not None and row not in self.deleted],
+            dtype=np.int64,
+        )
+        # Оценки уникальных сочетаний признаков и раздача их фильмам по коду
+        combo_scores = self.combos @ self.profile(rows, favorite_genre_id)
+        scores = combo_scores[self.codes[:size]]
+        scores += RATING_WEIGHT * self.ratings[:size]
+        if len(rows):
+            # Доля избранных фильмов каждого режиссёра
+            directors = np.bincount(
+                self.director_ids[rows], minlength=self.max_director_id + 1
+            ).astype(np.float32)
+            directors *= DIRECTOR_WEIGHT / len(rows)
+            scores += directors[self.director_ids[:size]]
+        excluded = list(self.deleted) + rows.tolist()
+        scores[excluded] = -np.inf
+        limit = min(limit, size - len(set(excluded)))
+        if limit <= 0:
+            return []
+        top = np.argpartition(scores, size - limit)[size - limit :]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.ids[index]), float(scores[index])) for index in top]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return self._stats()
+
+    def _stats(self) -> dict:
+        return {
+            "built": self._built,
+            "movies": self.size - len(self.deleted),
+            "combos": len(self.combos),
+            "memory_bytes": int(
+                self.combos.nbytes
+                + self.ids.nbytes
+                + self.codes.nbytes
+                + self.ratings.nbytes
+                + self.director_ids.nbytes
+            ),
+            "pending": len(self._dirty),
+        }
+
+
+# Глобальный индекс рекомендаций процесса
+recommendation_index = RecommendationIndex()
+
+
+# Рекомендации для пользователя: список кортежей (фильм, оценка) по убыванию оценки
+def recommend_movies(db: Session, user, *, limit: int = 20) -> list[tuple[Movie, float]]:
+    recommendation_index.refresh(db)
+    favorite_ids = db.execute(
+        select(Favorite.movie_id).where(Favorite.user_id == user.id)
+    ).scalars()
+    favorite_genre_id = None
+    if user.favorite_genre:
+        favorite_genre_id = db.execute(
+            select(Genre.id).where(Genre.name == user.favorite_genre)
+        ).scalar()
+    scored = recommendation_index.recommend(
+        list(favorite_ids), favorite_genre_id=favorite_genre_id, limit=limit
+    )
+    movies = {
+        movie.id: movie
+        for movie in db.query(Movie)
+        .options(joinedload(Movie.genre), joinedload(Movie.director))
+        .filter(Movie.id.in_([id for id, _ in scored]))
+    }
+    return [(movies[id], score) for id, score in scored if id in movies]
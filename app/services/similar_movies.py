@@ -0,0 +1,164 @@
+# Коллаборативная фильтрация item-item: «пользователи, добавившие этот фильм
+# в избранное, также добавили...»
+# Таблица favorites загружается в разреженную матрицу пользователи x фильмы (SciPy CSR).
+# Для фильма i совместные добавления со всеми фильмами — строка (X^T X)[i], близость —
+# косинусная: co(i, j) / sqrt(n_i * n_j). Для каждого фильма сохраняются top-K соседей
+# в таблицу movie_neighbors, поэтому выдача — чтение K строк по первичному ключу.
+#
+# Инкрементальный запуск пересчитывает только фильмы из избранного пользователей,
+# добавивших что-то после предыдущего запуска (все изменившиеся пары (i, j) лежат
+# в избранном таких пользователей). Удаления из избранного и изменение оценок у
+# остальных фильмов из-за роста популярности соседа учитываются полным пересчётом (--full).
+from typing import Iterator
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.favorite import Favorite
+from app.models.job_state import JobState
+from app.models.movie_neighbor import MovieNeighbor
+
+# Имя задачи в таблице job_states
+JOB_NAME = "similar_movies"
+
+# Количество фильмов, для которых совместные добавления считаются одним умножением
+CHUNK_SIZE = 2_000
+
+
+# Загрузка избранного в разреженную матрицу пользователи x фильмы
+# Индексы строк и столбцов совпадают с user_id и movie_id
+def load_favorites_matrix(db: Session) -> sparse.csr_matrix:
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute("SELECT user_id, movie_id FROM favorites")
+        pairs = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, 2)
+    finally:
+        cursor.close()
+    shape = (
+        int(pairs[:, 0].max(initial=0)) + 1,
+        int(pairs[:, 1].max(initial=0)) + 1,
+    )
+    return sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32), (pairs[:, 0], pairs[:, 1])),
+        shape=shape,
+    )
+
+
+# Top-K соседей для каждого фильма из movie_ids: (movie_id, ID соседей, оценки)
+def top_neighbors(
+    matrix: sparse.csr_matrix,
+    movie_ids: np.ndarray,
+    *,
+    top_k: int,
+    min_cooccurrence: int = 1,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    by_movie = matrix.T.tocsr()
+    counts = np.asarray(by_movie.getnnz(axis=1), dtype=np.float32)
+    for start in range(0, len(movie_ids), CHUNK_SIZE):
+        chunk = movie_ids[start : start + CHUNK_SIZE]
+        # Совместные добавления фильмов chunk со всеми фильмами
+        cooccurrence = (by_movie[chunk] @ matrix).tocsr()
+        for row, movie_id in enumerate(chunk):
+            begin, end = cooccurrence.indptr[row], cooccurrence.indptr[row + 1]
+            neighbors = cooccurrence.indices[begin:end]
+            together = cooccurrence.data[begin:end]
+            keep = (neighbors != movie_id) & (together >= min_cooccurrence)
+            neighbors, together = neighbors[keep], together[keep]
+            scores = together / np.sqrt(counts[movie_id] * counts[neighbors])
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+                neighbors, scores = neighbors[best], scores[best]
+            order = np.lexsort((neighbors, -scores))
+            yield int(movie_id), neighbors[order], scores[order]
+
+
+# Перезапись соседей фильмов пачками: каждая пачка — одна транзакция, поэтому
+# читатели видят для фильма либо старый, либо новый список целиком
+def _store_neighbors(db: Session, results) -> int:
+    stored = 0
+    movie_ids, rows = [], []
+    for movie_id, neighbors, scores in results:
+        movie_ids.append(movie_id)
+        rows.extend(
+            {
+                "movie_id": movie_id,
+                "rank": rank,
+                "neighbor_id": int(neighbor_id),
+                "score": float(score),
+            }
+            for rank, (neighbor_id, score) in enumerate(zip(neighbors, scores))
+        )
+        if len(movie_ids) >= CHUNK_SIZE:
+            stored += _write_chunk(db, movie_ids, rows)
+            movie_ids, rows = [], []
+    if movie_ids:
+        stored += _write_chunk(db, movie_ids, rows)
+    return stored
+
+
+def _write_chunk(db: Session, movie_ids: list[int], rows: list[dict]) -> int:
+    db.execute(delete(MovieNeighbor).where(MovieNeighbor.movie_id.in_(movie_ids)))
+    if rows:
+        db.execute(insert(MovieNeighbor), rows)
+    db.commit()
+    return len(rows)
+
+
+# Пересчёт соседей: полный или только для фильмов, затронутых новыми добавлениями
+# в избранное после предыдущего запуска. Возвращает сводку запуска
+def refresh_similar_movies(
+    db: Session,
+    *,
+    full: bool = False,
+    top_k: int | None = None,
+    min_cooccurrence: int | None = None,
+) -> dict:
+    top_k = top_k or settings.SIMILAR_MOVIES_TOP_K
+    if min_cooccurrence is None:
+        min_cooccurrence = settings.SIMILAR_MOVIES_MIN_COOCCURRENCE
+    # Отметка берётся до загрузки матрицы: записи, добавленные во время запуска,
+    # будут обработаны повторно в следующий раз, но не пропущены
+    last_id = db.execute(select(func.max(Favorite.id))).scalar() or 0
+    state = db.get(JobState, JOB_NAME)
+    full = full or state is None
+    matrix = load_favorites_matrix(db)
+
+    if full:
+        movie_ids = np.flatnonzero(matrix.getnnz(axis=0))
+        # Фильмы, которых больше нет ни в чьём избранном, остаются без соседей
+        db.execute(
+            delete(MovieNeighbor).where(
+                MovieNeighbor.movie_id.not_in(select(Favorite.movie_id))
+            )
+        )
+    else:
+        # Верхняя граница — отметка этого запуска: более поздние записи могут
+        # не попасть в уже загруженную матрицу и будут учтены в следующий раз
+        users = db.execute(
+            select(Favorite.user_id)
+            .where(Favorite.id > state.last_id, Favorite.id <= last_id)
+            .distinct()
+        ).scalars().all()
+        # Избранное пользователя могли удалить между отметкой и загрузкой матрицы
+        users = [user_id for user_id in users if user_id < matrix.shape[0]]
+        movie_ids = np.unique(matrix[users].indices) if users else np.array([], int)
+
+    results = top_neighbors(
+        matrix, movie_ids, top_k=top_k, min_cooccurrence=min_cooccurrence
+    )
+    stored = _store_neighbors(db, results)
+
+    if state is None:
+        state = JobState(name=JOB_NAME)
+        db.add(state)
+    state.last_id = last_id
+    db.commit()
+    return {
+        "full": full,
+        "movies": len(movie_ids),
+        "neighbors": stored,
+        "last_favorite_id": last_id,
+    }
@@ -0,0 +1,31 @@
+# Построение файла снимка каталога (фильмы, жанры, режиссёры) для CATALOG_SNAPSHOT_PATH
+# Воркеры отображают новое поколение файла в память без перезапуска
+#
+# Запуск: python -m app.tools.build_catalog_snapshot [путь к файлу]
+import sys
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.catalog_snapshot import write_snapshot
+
+
+def main() -> int:
+    path = sys.argv[1] if len(sys.argv) > 1 else settings.CATALOG_SNAPSHOT_PATH
+    if not path:
+        print("usage: python -m app.tools.build_catalog_snapshot PATH", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        snapshot = write_snapshot(db, path)
+    print(
+        f"wrote {path}: generation {snapshot.generation}, {snapshot.size} movies, "
+        f"{snapshot.file_size / 2**20:.1f} MiB "
+        f"({snapshot.bytes_per_movie:.0f} bytes/movie) "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
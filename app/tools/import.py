@@ -0,0 +1,48 @@
+# Массовый импорт каталога фильмов из командной строки
+#
+# Запуск: python -m app.tools.import movies.ndjson [--format csv] [--batch-size 5000]
+import argparse
+import sys
+import time
+
+from app.db.session import SessionLocal
+from app.services.catalog_import import FORMATS, detect_format, import_stream
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Bulk import movies from NDJSON or CSV"
+    )
+    parser.add_argument("path", help="input file, '-' for stdin")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--batch-size", type=int, default=5_000)
+    parser.add_argument("--max-errors", type=int, default=1_000)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.path)
+    if fmt is None:
+        parser.error("cannot detect file format, pass --format")
+
+    started = time.perf_counter()
+    stream = (
+        sys.stdin
+        if args.path == "-"
+        else open(args.path, encoding="utf-8", newline="")
+    )
+    with stream, SessionLocal() as db:
+        report = import_stream(
+            db, stream, fmt, batch_size=args.batch_size, max_errors=args.max_errors
+        )
+    elapsed = time.perf_counter() - started
+
+    for error in report.errors:
+        print(f"line {error.line}: {error.error}", file=sys.stderr)
+    print(
+        f"inserted {report.inserted}, failed {report.failed} "
+        f"in {elapsed:.1f}s ({report.inserted / max(elapsed, 1e-9):.0f} rows/s)"
+    )
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+# Перестройка счётчиков фасетов каталога (количество фильмов по жанрам и режиссёрам)
+#
+# Запуск: python -m app.tools.rebuild_facets
+import sys
+import time
+
+from app.crud.movie import crud_movie
+from app.db.session import SessionLocal
+
+
+def main() -> int:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        crud_movie.rebuild_facets(db)
+    print(f"rebuilt facet counts in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+# Перестройка полнотекстового индекса фильмов (movies_fts) по таблице movies
+# Создаёт таблицу и триггеры, если база создана до появления поиска
+#
+# Запуск: python -m app.tools.rebuild_search_index
+import sys
+import time
+
+from app.db.fts import rebuild_search_index
+from app.db.session import engine
+
+
+def main() -> int:
+    if engine.dialect.name != "sqlite":
+        print("full-text search index is only used with SQLite", file=sys.stderr)
+        return 2
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        rebuild_search_index(connection)
+    print(f"rebuilt search index in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+# Сверка счётчиков favorite_count фильмов с таблицей favorites
+#
+# Запуск: python -m app.tools.recount_favorites
+import sys
+import time
+
+from app.crud.movie import crud_movie
+from app.db.session import SessionLocal
+
+
+def main() -> int:
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        fixed = crud_movie.recount_favorites(db)
+    print(f"fixed {fixed} movies in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+# Предрасчёт похожих фильмов по совместному добавлению в избранное
+# Предназначен для периодического запуска (cron); без --full обрабатывает только
+# добавления в избранное после предыдущего запуска
+#
+# Запуск: python -m app.tools.similar_movies [--full] [--top-k 50]
+import argparse
+import sys
+import time
+
+from app.db.session import SessionLocal
+from app.services.similar_movies import refresh_similar_movies
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Precompute item-item neighbors from favorites"
+    )
+    parser.add_argument("--full", action="store_true", help="recompute all movies")
+    parser.add_argument("--top-k", type=int)
+    parser.add_argument("--min-cooccurrence", type=int)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        summary = refresh_similar_movies(
+            db,
+            full=args.full,
+            top_k=args.top_k,
+            min_cooccurrence=args.min_cooccurrence,
+        )
+    print(
+        f"{'full' if summary['full'] else 'incremental'} run: "
+        f"{summary['movies']} movies, {summary['neighbors']} neighbors "
+        f"up to favorite #{summary['last_favorite_id']} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
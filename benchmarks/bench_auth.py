@@ -0,0 +1,83 @@
+# Бенчмарк аутентифицированных запросов (GET /users/me) с кэшем токенов и пользователей и без него
+# Каждый режим запускается в отдельном процессе, потому что кэши настраиваются при импорте
+#
+# Запуск: python -m benchmarks.bench_auth --requests 5000
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+DB_PATH = "bench_auth.db"
+
+
+def prepare(db_path: str) -> None:
+    from sqlalchemy.orm import sessionmaker
+
+    from app.crud.user import crud_user
+    from app.schemas.user import UserCreate
+    from benchmarks.datagen import create_bench_engine
+
+    engine = create_bench_engine(db_path)
+    with sessionmaker(bind=engine)() as db:
+        crud_user.create(
+            db,
+            obj_in=UserCreate(username="bench", email="bench@bench.com", password="pw"),
+        )
+
+
+def measure(requests: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    from app.core import security
+    from app.main import app
+
+    token = security.create_access_token(
+        {"sub": "bench"}, expires_delta=timedelta(hours=1)
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    with TestClient(app) as client:
+        for _ in range(100):
+            client.get("/api/v1/users/me", headers=headers)
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = client.get("/api/v1/users/me", headers=headers)
+            assert response.status_code == 200
+        elapsed = time.perf_counter() - started
+    return {"requests": requests, "seconds": elapsed, "rps": requests / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.requests)))
+        return
+
+    prepare(args.db)
+    modes = {
+        "cache on": {},
+        "cache off": {"AUTH_TOKEN_CACHE_SIZE": "0", "AUTH_USER_CACHE_TTL": "0"},
+    }
+    for name, overrides in modes.items():
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{args.db}", **overrides)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_auth", "--child",
+             "--requests", str(args.requests)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{name:10} {result['rps']:10.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Бенчмарк фильтруемого каталога фильмов (GET /movies с фильтрами и сортировкой)
+# Сравнивает задержку запросов crud_movie.get_multi с составными индексами и без них
+#
+# Запуск: python -m benchmarks.bench_movie_filters --movies 1000000
+import argparse
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.movie import crud_movie
+from app.models.movie import Movie
+from app.schemas.movie import MovieFilter
+from benchmarks.datagen import create_bench_engine, generate_catalog
+
+SCENARIOS = {
+    "no filters, sort id": (MovieFilter(), "id", "asc"),
+    "genre, sort rating desc": (MovieFilter(genre_id=3), "rating", "desc"),
+    "genre + rating range": (
+        MovieFilter(genre_id=3, min_rating=7.5, max_rating=9.0),
+        "rating",
+        "desc",
+    ),
+    "director, sort release_date": (
+        MovieFilter(director_id=42),
+        "release_date",
+        "desc",
+    ),
+    "genre + release range": (
+        MovieFilter(
+            genre_id=5,
+            released_from=datetime(1990, 1, 1),
+            released_to=datetime(2000, 1, 1),
+        ),
+        "release_date",
+        "asc",
+    ),
+    "duration range, sort title": (
+        MovieFilter(min_duration=90, max_duration=100),
+        "title",
+        "asc",
+    ),
+}
+
+
+def run(session_factory, repeat: int) -> dict[str, float]:
+    results = {}
+    for name, (filters, sort, order) in SCENARIOS.items():
+        timings = []
+        for _ in range(repeat):
+            with session_factory() as db:
+                started = time.perf_counter()
+                crud_movie.get_multi(
+                    db, limit=50, filters=filters, sort=sort, order=order
+                )
+                timings.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="bench_movie_library.db")
+    parser.add_argument("--movies", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing db")
+    args = parser.parse_args()
+
+    if args.reuse:
+        from sqlalchemy import create_engine
+
+        engine = create_engine(f"sqlite:///{args.db}")
+    else:
+        engine = create_bench_engine(args.db)
+        started = time.perf_counter()
+        generate_catalog(engine, movies=args.movies)
+        print(f"generated {args.movies} movies in {time.perf_counter() - started:.1f}s")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    session_factory = sessionmaker(bind=engine)
+
+    indexed = run(session_factory, args.repeat)
+    composite = [i for i in Movie.__table__.indexes if len(i.columns) > 1]
+    for index in composite:
+        index.drop(engine)
+    try:
+        plain = run(session_factory, args.repeat)
+    finally:
+        for index in composite:
+            index.create(engine)
+
+    print(f"{'scenario':32} {'indexed ms':>12} {'no composite ms':>16}")
+    for name in SCENARIOS:
+        print(f"{name:32} {indexed[name]:12.2f} {plain[name]:16.2f}")
+
+
+if __name__ == "__main__":
+    main()
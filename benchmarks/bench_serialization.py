@@ -0,0 +1,93 @@
+# Микробенчмарк сериализации страницы каталога (GET /movies)
+# Сравнивает стоимость одной строки ответа в трёх режимах:
+# - orm + pydantic: ORM-объекты с joinedload, валидация в list[Movie] и дамп в JSON
+#   (то, что делает FastAPI с response_model)
+# - rows + TypeAdapter: Core-запрос get_multi_rows, валидация словарей и дамп в JSON
+# - rows + orjson: Core-запрос get_multi_rows и orjson.dumps (быстрый режим)
+# Кэш CRUD отключается, чтобы каждый замер включал запрос к базе
+#
+# Запуск: python -m benchmarks.bench_serialization --movies 100000
+import argparse
+import statistics
+import time
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.movie import crud_movie
+from app.schemas.movie import Movie
+from benchmarks.datagen import create_bench_engine, generate_catalog
+
+PAGE_SIZES = (100, 1_000)
+
+adapter = TypeAdapter(list[Movie])
+
+
+def orm_pydantic(db, limit: int) -> bytes:
+    movies = crud_movie.get_multi(db, limit=limit)
+    return adapter.dump_json(adapter.validate_python(movies, from_attributes=True))
+
+
+def rows_type_adapter(db, limit: int) -> bytes:
+    return adapter.dump_json(
+        adapter.validate_python(crud_movie.get_multi_rows(db, limit=limit))
+    )
+
+
+def rows_orjson(db, limit: int) -> bytes:
+    return orjson.dumps(crud_movie.get_multi_rows(db, limit=limit))
+
+
+MODES = {
+    "orm + pydantic": orm_pydantic,
+    "rows + TypeAdapter": rows_type_adapter,
+    "rows + orjson": rows_orjson,
+}
+
+
+# Медиана стоимости одной строки в микросекундах для каждого режима и размера страницы
+def run(session_factory, repeat: int) -> dict[tuple[str, int], float]:
+    results = {}
+    for limit in PAGE_SIZES:
+        for name, render in MODES.items():
+            timings = []
+            for _ in range(repeat):
+                with session_factory() as db:
+                    started = time.perf_counter()
+                    render(db, limit)
+                    timings.append((time.perf_counter() - started) / limit * 1e6)
+            results[name, limit] = statistics.median(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db", default="bench_movie_library.db")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing db")
+    args = parser.parse_args()
+
+    if args.reuse:
+        engine = create_engine(f"sqlite:///{args.db}")
+    else:
+        engine = create_bench_engine(args.db)
+        generate_catalog(engine, movies=args.movies)
+    session_factory = sessionmaker(bind=engine)
+
+    crud_movie.list_cache = None
+    with session_factory() as db:
+        assert orm_pydantic(db, 100) == rows_orjson(db, 100)
+    results = run(session_factory, args.repeat)
+
+    print(f"{'mode':20}" + "".join(f"{f'us/row @{n}':>14}" for n in PAGE_SIZES))
+    for name in MODES:
+        print(
+            f"{name:20}" + "".join(f"{results[name, n]:14.2f}" for n in PAGE_SIZES)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Детерминированный генератор синтетических данных для бенчмарков: каталог,
+# пользователи и избранное. Пишет напрямую через executemany, минуя ORM, чтобы
+# миллионы строк загружались за секунды
+import argparse
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, create_engine, func, insert, select, update
+from sqlalchemy.engine import Engine
+
+from app.core.security import get_password_hash
+from app.db.base import Base, Director, Favorite, Genre, Movie, User
+from app.db.facets import rebuild_facet_counts
+
+GENRE_NAMES = [
+    "Drama", "Comedy", "Action", "Thriller", "Horror", "Romance", "Sci-Fi",
+    "Fantasy", "Animation", "Documentary", "Crime", "Adventure", "Mystery",
+    "Family", "War", "Western", "Musical", "History", "Biography", "Sport",
+]
+# Пароль всех сгенерированных пользователей (хеш bcrypt вычисляется один раз)
+BENCH_PASSWORD = "bench-password"
+WORDS = [
+    "night", "city", "love", "war", "last", "dark", "river", "king", "girl",
+    "shadow", "summer", "storm", "secret", "road", "blood", "star", "winter",
+    "house", "dream", "fire", "ghost", "island", "heart", "stone", "empire",
+]
+
+
+# Создание движка для файла бенчмарка с пустой схемой
+def create_bench_engine(path: str) -> Engine:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+# Заполнение каталога: жанры, режиссеры и фильмы
+def generate_catalog(
+    engine: Engine,
+    *,
+    movies: int,
+    directors: int | None = None,
+    seed: int = 42,
+    batch_size: int = 50_000,
+) -> None:
+    rng = random.Random(seed)
+    directors = directors or max(1, movies // 20)
+    epoch = datetime(1950, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(Genre),
+            [{"id": i + 1, "name": name} for i, name in enumerate(GENRE_NAMES)],
+        )
+        conn.execute(
+            insert(Director),
+            [
+                {"id": i + 1, "first_name": f"First{i}", "last_name": f"Last{i}"}
+                for i in range(directors)
+            ],
+        )
+        batch = []
+        for i in range(movies):
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+            batch.append(
+                {
+                    "id": i + 1,
+                    "title": title.title(),
+                    "description": " ".join(rng.choice(WORDS) for _ in range(20)),
+                    "release_date": epoch + timedelta(days=rng.randrange(27_000)),
+                    "duration": rng.randint(70, 200),
+                    "rating": round(rng.uniform(1.0, 10.0), 1),
+                    "genre_id": rng.randint(1, len(GENRE_NAMES)),
+                    "director_id": rng.randint(1, directors),
+                }
+            )
+            if len(batch) >= batch_size:
+                conn.execute(insert(Movie), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Movie), batch)
+        rebuild_facet_counts(conn)
+
+
+# Пользователи user1..userN; user1 — суперпользователь
+def generate_users(
+    engine: Engine,
+    *,
+    users: int,
+    seed: int = 42,
+    batch_size: int = 50_000,
+) -> None:
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    with engine.begin() as conn:
+        batch = []
+        for i in range(1, users + 1):
+            batch.append(
+                {
+                    "id": i,
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "hashed_password": hashed_password,
+                    "is_active": True,
+                    "is_superuser": i == 1,
+                    "favorite_genre": rng.choice(GENRE_NAMES),
+                }
+            )
+            if len(batch) >= batch_size:
+                conn.execute(insert(User), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(User), batch)
+
+
+# Избранное: favorites пар (пользователь, фильм) без повторов
+# Популярность фильмов неравномерна (квадрат равномерной величины смещает выбор
+# к фильмам с меньшими ID), как и в реальном каталоге. Счётчики favorite_count
+# заполняются в соответствии с таблицей favorites
+def generate_favorites(
+    engine: Engine,
+    *,
+    favorites: int,
+    seed: int = 42,
+    batch_size: int = 50_000,
+) -> None:
+    rng = random.Random(seed)
+    with engine.connect() as conn:
+        users = conn.execute(select(func.max(User.id))).scalar() or 0
+        movies = conn.execute(select(func.max(Movie.id))).scalar() or 0
+    if not users or not movies:
+        raise ValueError("generate users and the catalog before favorites")
+    favorites = min(favorites, users * movies)
+    pairs = set()
+    while len(pairs) < favorites:
+        user_id = rng.randint(1, users)
+        movie_id = int(movies * rng.random() ** 2) + 1
+        pairs.add((user_id, movie_id))
+    counts = Counter(movie_id for _, movie_id in pairs)
+    created_at = datetime(2024, 1, 1)
+    rows = [
+        {"user_id": user_id, "movie_id": movie_id, "created_at": created_at}
+        for user_id, movie_id in sorted(pairs)
+    ]
+    table = Movie.__table__
+    with engine.begin() as conn:
+        for start in range(0, len(rows), batch_size):
+            conn.execute(insert(Favorite), rows[start : start + batch_size])
+        conn.execute(
+            update(table)
+            .where(table.c.id == bindparam("movie_id"))
+            .values(favorite_count=bindparam("total")),
+            [{"movie_id": m, "total": n} for m, n in counts.items()],
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark data")
+    parser.add_argument("--db", default="bench_movie_library.db")
+    parser.add_argument("--movies", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=0)
+    parser.add_argument("--favorites", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    engine = create_bench_engine(args.db)
+    generate_catalog(engine, movies=args.movies, seed=args.seed)
+    if args.users:
+        generate_users(engine, users=args.users, seed=args.seed)
+    if args.favorites:
+        generate_favorites(engine, favorites=args.favorites, seed=args.seed)
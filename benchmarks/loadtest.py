@@ -0,0 +1,172 @@
+# Нагрузочный тест HTTP API: задержки p50/p99 и пропускная способность при высокой конкурентности
+# С флагом --serve сам поднимает uvicorn на указанной базе; иначе бьёт по уже запущенному --url
+#
+# Сравнение синхронного и асинхронного стека: запустить один и тот же сценарий на коммите
+# до перехода на AsyncSession и после, например:
+#   python -m benchmarks.loadtest --serve --db bench_movie_library.db --concurrency 200
+#
+# Масштабирование по воркерам: --workers 1,2,4,8 поднимает app.server для каждого числа
+# воркеров по очереди и печатает таблицу rps/p50/p99
+#   python -m benchmarks.loadtest --serve --db bench_movie_library.db --workers 1,2,4,8
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/v1/movies/?limit=50",
+    "/api/v1/movies/?limit=50&sort=rating&order=desc&genre_id=3",
+    "/api/v1/movies/1",
+    "/api/v1/genres/",
+    "/api/v1/directors/?limit=50",
+]
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q * (len(values) - 1))))
+    return values[index]
+
+
+async def run_load(base_url: str, paths: list[str], requests: int, concurrency: int):
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for i in counter:
+            path = paths[i % len(paths)]
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def wait_ready(base_url: str, timeout: float = 30.0, path: str = "/") -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + path, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+# Запуск сервера для прогона: один процесс uvicorn или app.server с N воркерами
+def start_server(url: str, db: str, workers: int = 0) -> subprocess.Popen:
+    port = url.rsplit(":", 1)[-1]
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db}")
+    if workers:
+        command = [
+            sys.executable, "-m", "app.server", "--workers", str(workers),
+            "--port", port, "--log-level", "warning", "--no-access-log",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "app.main:app", "--port", port,
+            "--log-level", "warning",
+        ]
+    server = subprocess.Popen(command, env=env)
+    try:
+        wait_ready(url, timeout=120, path="/ready" if workers else "/")
+    except RuntimeError:
+        stop_server(server)
+        raise
+    return server
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.terminate()
+    server.wait()
+
+
+def format_result(result: dict) -> str:
+    return (
+        f"requests={result['requests']} errors={result['errors']} "
+        f"rps={result['rps']:.1f} p50={result['p50_ms']:.1f}ms "
+        f"p99={result['p99_ms']:.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--serve", action="store_true", help="start uvicorn for the run")
+    parser.add_argument("--db", default="bench_movie_library.db")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument(
+        "--workers",
+        help="comma-separated worker counts for app.server, e.g. 1,2,4,8 (with --serve)",
+    )
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    if args.workers:
+        if not args.serve:
+            parser.error("--workers requires --serve")
+        rows = []
+        for workers in [int(value) for value in args.workers.split(",")]:
+            server = start_server(args.url, args.db, workers)
+            try:
+                # Прогрев: первые запросы заполняют кэши каждого воркера
+                asyncio.run(run_load(args.url, paths, args.concurrency, args.concurrency))
+                result = asyncio.run(
+                    run_load(args.url, paths, args.requests, args.concurrency)
+                )
+            finally:
+                stop_server(server)
+            print(f"workers={workers} {format_result(result)}", flush=True)
+            rows.append((workers, result))
+        base_rps = rows[0][1]["rps"]
+        # Масштабирование ограничено числом ядер, общих с генератором нагрузки
+        print(f"\ncpus={os.cpu_count()}")
+        print("\n| workers | rps | scaling | p50, ms | p99, ms | errors |")
+        print("|---|---|---|---|---|---|")
+        for workers, result in rows:
+            print(
+                f"| {workers} | {result['rps']:.0f} | {result['rps'] / base_rps:.2f}x "
+                f"| {result['p50_ms']:.1f} | {result['p99_ms']:.1f} "
+                f"| {result['errors']} |"
+            )
+        return
+
+    server = start_server(args.url, args.db) if args.serve else None
+    try:
+        if server is None:
+            wait_ready(args.url)
+        result = asyncio.run(run_load(args.url, paths, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            stop_server(server)
+    print(format_result(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+# Набор бенчмарков производительности: все эндпоинты app/api/endpoints, операции
+# CRUDBase и функции app/core/security на синтетических данных (benchmarks/datagen.py)
+# Результаты печатаются таблицей и сохраняются в JSON (--json); сравнение с
+# результатами предыдущего релиза (--compare) завершается с кодом 1, если медиана
+# какого-либо бенчмарка выросла больше чем в --threshold раз.
+#
+# Запуск:
+#   python -m benchmarks.suite --movies 100000 --users 10000 --favorites 300000 \
+#       --json bench-results.json
+#   python -m benchmarks.suite --reuse --compare bench-results.json -k movies
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+
+class Case:
+    def __init__(
+        self,
+        group: str,
+        name: str,
+        fn: Callable[[], object],
+        *,
+        repeat: Optional[int] = None,
+    ):
+        self.group = group
+        self.name = name
+        self.fn = fn
+        # Переопределение количества замеров для медленных операций (bcrypt)
+        self.repeat = repeat
+
+
+# Замер одного бенчмарка: прогрев, затем repeat вызовов; статистика в миллисекундах
+def measure(fn: Callable[[], object], *, repeat: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    median = statistics.median(timings)
+    return {
+        "rounds": repeat,
+        "min_ms": timings[0],
+        "median_ms": median,
+        "p95_ms": timings[min(len(timings) - 1, int(0.95 * len(timings)))],
+        "mean_ms": statistics.fmean(timings),
+        "ops_per_sec": 1000 / median if median else None,
+    }
+
+
+# Сравнение с базовыми результатами: список (имя, отношение медиан) для регрессий
+def find_regressions(
+    results: dict, baseline: dict, threshold: float
+) -> list[tuple[str, float]]:
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous["median_ms"]:
+            continue
+        ratio = stats["median_ms"] / previous["median_ms"]
+        if ratio > threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _check(response, status: int = 200):
+    if response.status_code != status:
+        raise RuntimeError(
+            f"{response.request.method} {response.request.url} -> "
+            f"{response.status_code}: {response.text[:200]}"
+        )
+    return response
+
+
+# Подготовка данных: новый файл базы с синтетическими данными или существующий (--reuse)
+def prepare_database(args) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from benchmarks.datagen import (
+        create_bench_engine,
+        generate_catalog,
+        generate_favorites,
+        generate_users,
+    )
+
+    if args.reuse:
+        return
+    started = time.perf_counter()
+    engine = create_bench_engine(args.db)
+    generate_catalog(engine, movies=args.movies, seed=args.seed)
+    generate_users(engine, users=args.users, seed=args.seed)
+    generate_favorites(engine, favorites=args.favorites, seed=args.seed)
+    engine.dispose()
+
+    # Предрасчёт похожих фильмов для /movies/{id}/similar
+    from app.services.similar_movies import refresh_similar_movies
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    with Session(engine) as db:
+        refresh_similar_movies(db, full=True)
+    engine.dispose()
+    print(
+        f"generated {args.movies} movies, {args.users} users, "
+        f"{args.favorites} favorites in {time.perf_counter() - started:.1f}s"
+    )
+
+
+# Бенчмарки функций безопасности
+def security_cases() -> list[Case]:
+    from app.api.dependencies import decode_token
+    from app.core import security
+    from benchmarks.datagen import BENCH_PASSWORD
+
+    hashed = security.get_password_hash(BENCH_PASSWORD)
+    token = security.create_access_token(
+        {"sub": "user1"}, expires_delta=timedelta(minutes=30)
+    )
+    return [
+        Case(
+            "security",
+            "verify_password",
+            lambda: security.verify_password(BENCH_PASSWORD, hashed),
+            repeat=5,
+        ),
+        Case(
+            "security",
+            "get_password_hash",
+            lambda: security.get_password_hash(BENCH_PASSWORD),
+            repeat=5,
+        ),
+        Case(
+            "security",
+            "create_access_token",
+            lambda: security.create_access_token(
+                {"sub": "user1"}, expires_delta=timedelta(minutes=30)
+            ),
+        ),
+        Case("security", "decode_token", lambda: decode_token(token)),
+    ]
+
+
+# Бенчмарки операций CRUDBase (и специализированных методов CRUD фильмов)
+# Каждый вызов получает новую сессию, как обработчик запроса
+def crud_cases(movies: int) -> list[Case]:
+    from app.crud.director import crud_director
+    from app.crud.genre import crud_genre
+    from app.crud.movie import MovieProjection, crud_movie
+    from app.db.session import SessionLocal
+    from app.schemas.genre import GenreCreate
+    from app.schemas.movie import MovieFilter
+
+    def in_session(fn):
+        def run():
+            with SessionLocal() as db:
+                return fn(db)
+
+        return run
+
+    def create_update_remove(db):
+        genre = crud_genre.create(db, obj_in=GenreCreate(name="Bench CRUD Genre"))
+        crud_genre.update(db, db_obj=genre, obj_in={"description": "updated"})
+        crud_genre.remove(db, id=genre.id)
+
+    middle = max(1, movies // 2)
+    ids = list(range(1, min(movies, 100) + 1))
+    grid = MovieProjection(("title", "poster_url", "rating"), ())
+    cases = {
+        "genre.get": lambda db: crud_genre.get(db, id=1),
+        "genre.get_multi": lambda db: crud_genre.get_multi(db, limit=100),
+        "genre.create+update+remove": create_update_remove,
+        "director.get_multi": lambda db: crud_director.get_multi(db, limit=50),
+        "director.get_many[100]": lambda db: crud_director.get_many(db, ids=ids),
+        "movie.get": lambda db: crud_movie.get(db, id=middle),
+        "movie.get_many[100]": lambda db: crud_movie.get_many(db, ids=ids),
+        "movie.get_multi": lambda db: crud_movie.get_multi(db, limit=50),
+        "movie.get_multi filtered": lambda db: crud_movie.get_multi(
+            db,
+            limit=50,
+            sort="rating",
+            order="desc",
+            filters=MovieFilter(genre_id=3, min_rating=7.0),
+        ),
+        "movie.get_multi_rows": lambda db: crud_movie.get_multi_rows(db, limit=50),
+        "movie.get_multi_rows grid": lambda db: crud_movie.get_multi_rows(
+            db, limit=50, projection=grid
+        ),
+        "movie.top": lambda db: crud_movie.top(db, limit=10),
+        "movie.similar": lambda db: crud_movie.similar(db, id=1, limit=10),
+        "movie.search": lambda db: crud_movie.search(db, q="dark river", limit=20),
+    }
+    return [Case("crud", name, in_session(fn)) for name, fn in cases.items()]
+
+
+# Бенчмарки всех эндпоинтов API через TestClient (в процессе, без сети)
+# Изменяющие операции объединены в пары (создание + удаление), чтобы данные не росли
+def endpoint_cases(client, movies: int) -> list[Case]:
+    from app.core import security
+    from app.core.config import settings
+    from app.crud.user import crud_user
+    from app.db.session import SessionLocal
+    from benchmarks.datagen import BENCH_PASSWORD
+
+    api = settings.API_V1_STR
+
+    def auth(username: str) -> dict:
+        token = security.create_access_token(
+            {"sub": username}, expires_delta=timedelta(hours=1)
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    # Отдельный пользователь без избранного для изменяющих бенчмарков избранного
+    with SessionLocal() as db:
+        if crud_user.get_by_username(db, username="suite") is None:
+            from app.schemas.user import UserCreate
+
+            crud_user.create(
+                db,
+                obj_in=UserCreate(
+                    username="suite", email="suite@example.com", password=BENCH_PASSWORD
+                ),
+            )
+    admin, user, suite = auth("user1"), auth("user2"), auth("suite")
+    middle = max(1, movies // 2)
+    ids = ",".join(str(i) for i in range(1, min(movies, 50) + 1))
+
+    def get(path: str, headers: Optional[dict] = None, **params):
+        return lambda: _check(client.get(api + path, params=params, headers=headers))
+
+    # Повторный запрос с актуальным ETag; ETag запоминается при прогреве, так как
+    # предыдущие бенчмарки меняют таблицы
+    def not_modified(path: str):
+        etag = {}
+
+        def run():
+            headers = {"If-None-Match": etag.get("value", "")}
+            response = client.get(api + path, headers=headers)
+            if response.status_code == 200:
+                etag["value"] = response.headers["etag"]
+            else:
+                _check(response, 304)
+
+        return run
+
+    def login():
+        _check(
+            client.post(
+                api + "/auth/login",
+                data={"username": "user2", "password": BENCH_PASSWORD},
+            )
+        )
+
+    def register_delete():
+        _check(
+            client.post(
+                api + "/auth/register",
+                json={
+                    "username": "suite-new",
+                    "email": "suite-new@example.com",
+                    "password": BENCH_PASSWORD,
+                },
+            )
+        )
+        with SessionLocal() as db:
+            user_id = crud_user.get_by_username(db, username="suite-new").id
+        _check(client.delete(f"{api}/users/{user_id}", headers=admin))
+
+    def create_delete(path: str, payload: dict):
+        def run():
+            created = _check(client.post(api + path, json=payload, headers=admin), 201)
+            _check(client.delete(f"{api}{path}{created.json()['id']}", headers=admin))
+
+        return run
+
+    def put(path: str, payload: dict, headers: dict):
+        return lambda: _check(client.put(api + path, json=payload, headers=headers))
+
+    def import_movies():
+        lines = "".join(
+            json.dumps({"title": f"Suite Import {i}", "genre_id": 1, "director_id": 1})
+            + "\n"
+            for i in range(100)
+        )
+        report = _check(
+            client.post(
+                api + "/movies/import",
+                files={"file": ("movies.ndjson", lines, "application/x-ndjson")},
+                headers=admin,
+            )
+        ).json()
+        assert report["inserted"] == 100, report
+        # Удаляем импортированные фильмы, чтобы каталог не рос между замерами
+        from sqlalchemy import delete
+
+        from app.crud.movie import crud_movie
+        from app.models.movie import Movie
+
+        with SessionLocal() as db:
+            db.execute(delete(Movie).where(Movie.title.like("Suite Import %")))
+            db.commit()
+        crud_movie.invalidate()
+
+    def favorite_add_remove():
+        created = _check(
+            client.post(api + "/favorites/", json={"movie_id": middle}, headers=suite),
+            201,
+        )
+        _check(client.delete(f"{api}/favorites/{created.json()['id']}", headers=suite))
+
+    def favorite_batch():
+        batch = {"movie_ids": list(range(1, min(movies, 50) + 1))}
+        _check(client.post(api + "/favorites/batch", json=batch, headers=suite))
+        _check(client.post(api + "/favorites/batch/delete", json=batch, headers=suite))
+
+    def favorite_clear():
+        batch = {"movie_ids": list(range(1, min(movies, 50) + 1))}
+        _check(client.post(api + "/favorites/batch", json=batch, headers=suite))
+        _check(client.delete(api + "/favorites/", headers=suite))
+
+    user2 = {"username": "user2", "email": "user2@example.com", "full_name": "Suite"}
+    genre = {"name": "Suite Genre"}
+    director = {"first_name": "Suite", "last_name": "Director"}
+    movie = {"title": "Suite Movie", "genre_id": 1, "director_id": 1}
+    cases = {
+        # auth
+        "POST /auth/login": (login, 5),
+        "POST /auth/register + DELETE /users/{id}": (register_delete, 5),
+        # users
+        "GET /users/me": (get("/users/me", user), None),
+        "GET /users/me/recommendations": (
+            get("/users/me/recommendations", user, limit=20),
+            None,
+        ),
+        "GET /users/{id}": (get("/users/2", admin), None),
+        "PUT /users/me": (put("/users/me", user2, user), None),
+        "PUT /users/{id}": (put("/users/2", user2, admin), None),
+        # movies
+        "POST + DELETE /movies": (create_delete("/movies/", movie), None),
+        "POST /movies/import [100 rows]": (import_movies, 10),
+        "GET /movies": (get("/movies/", limit=50), None),
+        "GET /movies 304": (not_modified("/movies/?limit=50"), None),
+        "GET /movies filtered": (
+            get("/movies/", limit=50, genre_id=3, sort="rating", order="desc"),
+            None,
+        ),
+        "GET /movies grid fields": (
+            get("/movies/", limit=50, fields="title,poster_url,rating", expand=""),
+            None,
+        ),
+        "GET /movies?ids [50]": (get("/movies/", ids=ids), None),
+        "GET /movies/export [director]": (
+            get("/movies/export", admin, director_id=1),
+            None,
+        ),
+        "GET /movies/top": (get("/movies/top", limit=10), None),
+        "GET /movies/search": (get("/movies/search", q="dark river"), None),
+        "GET /movies/{id}": (get(f"/movies/{middle}"), None),
+        "GET /movies/{id}/similar": (get("/movies/1/similar", limit=10), None),
+        "PUT /movies/{id}": (
+            put(f"/movies/{middle}", {"title": "Suite Updated"}, admin),
+            None,
+        ),
+        # genres
+        "POST + DELETE /genres": (create_delete("/genres/", genre), None),
+        "GET /genres": (get("/genres/"), None),
+        "GET /genres/{id}": (get("/genres/1"), None),
+        "PUT /genres/{id}": (put("/genres/1", {"name": "Drama"}, admin), None),
+        # directors
+        "POST + DELETE /directors": (create_delete("/directors/", director), None),
+        "GET /directors": (get("/directors/", limit=50), None),
+        "GET /directors/{id}": (get("/directors/1"), None),
+        "PUT /directors/{id}": (
+            put("/directors/1", {"first_name": "First0", "last_name": "Last0"}, admin),
+            None,
+        ),
+        # favorites
+        "POST + DELETE /favorites/{id}": (favorite_add_remove, None),
+        "POST /favorites/batch + /batch/delete [50]": (favorite_batch, None),
+        "POST /favorites/batch + DELETE /favorites": (favorite_clear, None),
+        "GET /favorites": (get("/favorites/", user), None),
+        # monitoring
+        "GET /monitoring/cache": (get("/monitoring/cache", admin), None),
+        "GET /monitoring/password-pool": (get("/monitoring/password-pool", admin), None),
+        "GET /monitoring/db": (get("/monitoring/db", admin), None),
+        "GET /monitoring/recommendations": (
+            get("/monitoring/recommendations", admin),
+            None,
+        ),
+    }
+    return [
+        Case("endpoints", name, fn, repeat=repeat)
+        for name, (fn, repeat) in cases.items()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance benchmark suite")
+    parser.add_argument("--db", default="bench_movie_library.db")
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing db")
+    parser.add_argument("--movies", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--favorites", type=int, default=300_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("-k", dest="keyword", help="run only benchmarks matching")
+    parser.add_argument("--no-cache", action="store_true", help="disable CRUD caches")
+    parser.add_argument("--json", dest="json_path", help="write results to a file")
+    parser.add_argument("--compare", help="baseline results file to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    # Настройки приложения читаются при импорте, поэтому окружение задаётся до него
+    os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+    os.environ.pop("DATABASE_REPLICA_URL", None)
+    if args.no_cache:
+        os.environ["CACHE_ENABLED"] = "false"
+    prepare_database(args)
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+
+    from app.db.session import SessionLocal
+    from app.main import app
+    from app.models.movie import Movie
+
+    with SessionLocal() as db:
+        movies = db.execute(select(func.max(Movie.id))).scalar() or 0
+
+    results = {}
+    with TestClient(app) as client:
+        cases = security_cases() + crud_cases(movies) + endpoint_cases(client, movies)
+        for case in cases:
+            name = f"{case.group}: {case.name}"
+            if args.keyword and args.keyword.lower() not in name.lower():
+                continue
+            repeat = case.repeat or args.repeat
+            results[name] = measure(
+                case.fn, repeat=repeat, warmup=max(1, min(args.warmup, repeat))
+            )
+            stats = results[name]
+            print(
+                f"{name:60} {stats['median_ms']:10.3f} ms"
+                f" (p95 {stats['p95_ms']:.3f}, n={stats['rounds']})"
+            )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "db": args.db,
+            "movies": movies,
+            "cache": not args.no_cache,
+        },
+        "results": results,
+    }
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = find_regressions(results, baseline, args.threshold)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name}: median x{ratio:.2f}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions above x{args.threshold} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-# run.py
+# run.py — запуск для разработки (автоперезагрузка); в бою: python -m app.server
 import uvicorn
 from app.main import app
 
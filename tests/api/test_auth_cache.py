@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.api import dependencies
+from app.core import security
+from app.core.config import settings
+from app.crud.user import crud_user
+
+
+def test_token_cached_until_expiry():
+    token = security.create_access_token(
+        {"sub": "cached"}, expires_delta=timedelta(minutes=5)
+    )
+    assert dependencies.decode_token(token).username == "cached"
+    hits = dependencies.token_cache.hits
+    assert dependencies.decode_token(token).username == "cached"
+    assert dependencies.token_cache.hits == hits + 1
+
+    expired = security.create_access_token(
+        {"sub": "cached"}, expires_delta=timedelta(seconds=-1)
+    )
+    size = dependencies.token_cache.stats()["size"]
+    with pytest.raises(HTTPException) as error:
+        dependencies.decode_token(expired)
+    assert error.value.status_code == 403
+    assert dependencies.token_cache.stats()["size"] == size
+
+
+def test_user_update_visible_through_cache(client: TestClient, auth_headers):
+    headers = auth_headers("cacheme")
+    url = f"{settings.API_V1_STR}/users/me"
+    assert client.get(url, headers=headers).json()["full_name"] is None
+
+    response = client.put(
+        url,
+        headers=headers,
+        json={
+            "username": "cacheme",
+            "email": "cacheme@test.com",
+            "full_name": "Cached",
+        },
+    )
+    assert response.status_code == 200
+    assert client.get(url, headers=headers).json()["full_name"] == "Cached"
+
+
+def test_deleted_user_is_not_served_from_cache(
+    client: TestClient, db: Session, auth_headers
+):
+    headers = auth_headers("gone")
+    user = crud_user.get_by_username(db, username="gone")
+    url = f"{settings.API_V1_STR}/users/me"
+    assert client.get(url, headers=headers).status_code == 200
+    crud_user.remove(db, id=user.id)
+    assert client.get(url, headers=headers).status_code == 404
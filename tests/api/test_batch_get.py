@@ -0,0 +1,79 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.movie import crud_movie
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+
+API = settings.API_V1_STR
+
+
+def _catalog(db: Session) -> tuple[list[int], list[int], list[int]]:
+    genres = [Genre(name=f"Batch Genre {i}") for i in range(3)]
+    directors = [Director(first_name="Batch", last_name=str(i)) for i in range(3)]
+    db.add_all(genres + directors)
+    db.flush()
+    movies = [
+        Movie(title=f"Batch {i}", genre_id=genres[i].id, director_id=directors[i].id)
+        for i in range(3)
+    ]
+    db.add_all(movies)
+    db.commit()
+    return (
+        [m.id for m in movies],
+        [g.id for g in genres],
+        [d.id for d in directors],
+    )
+
+
+def test_movies_by_ids_in_one_query(client: TestClient, db: Session):
+    movie_ids, _, _ = _catalog(db)
+    statements = []
+    connection = db.connection()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        ids = [movie_ids[2], 10**9, movie_ids[0], movie_ids[2]]
+        response = client.get(f"{API}/movies/", params={"ids": ",".join(map(str, ids))})
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    assert response.status_code == 200
+    movies = response.json()
+    # Порядок запроса сохраняется, повторы и отсутствующие ID пропускаются
+    assert [m["id"] for m in movies] == [movie_ids[2], movie_ids[0]]
+    assert movies[0]["genre"]["name"] == "Batch Genre 2"
+    assert len([s for s in statements if "FROM movies" in s]) == 1
+
+    # Повторное чтение обслуживается из кэша объектов без запроса к базе
+    statements.clear()
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        movies = crud_movie.get_many(db, ids=[movie_ids[0], movie_ids[2]])
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+    assert [m.title for m in movies] == ["Batch 0", "Batch 2"]
+    assert statements == []
+
+
+def test_genres_and_directors_by_ids(client: TestClient, db: Session):
+    _, genre_ids, director_ids = _catalog(db)
+    response = client.get(
+        f"{API}/genres/", params={"ids": f"{genre_ids[1]},{genre_ids[0]}"}
+    )
+    assert [g["name"] for g in response.json()] == ["Batch Genre 1", "Batch Genre 0"]
+    response = client.get(f"{API}/directors/", params={"ids": str(director_ids[2])})
+    assert [d["last_name"] for d in response.json()] == ["2"]
+
+
+def test_invalid_ids_rejected(client: TestClient):
+    assert client.get(f"{API}/movies/", params={"ids": "1,x"}).status_code == 422
+    too_many = ",".join(str(i) for i in range(1001))
+    assert client.get(f"{API}/genres/", params={"ids": too_many}).status_code == 400
+    response = client.get(f"{API}/movies/", params={"ids": "1", "fields": "title"})
+    assert response.status_code == 400
@@ -0,0 +1,186 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.favorite import crud_favorite
+from app.crud.genre import crud_genre
+from app.crud.movie import crud_movie
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.schemas.genre import GenreUpdate
+from app.schemas.movie import MovieUpdate
+from app.services.catalog_snapshot import CatalogSnapshotStore, catalog_snapshot
+
+MOVIES_URL = f"{settings.API_V1_STR}/movies/"
+
+
+@pytest.fixture
+def snapshot_catalog(db: Session, monkeypatch):
+    genres = [Genre(name="Snapshot Drama"), Genre(name="Snapshot Comedy")]
+    director = Director(first_name="Snap", last_name="Shot", biography="Bio")
+    db.add_all([*genres, director])
+    db.flush()
+    db.add_all(
+        [
+            Movie(
+                title=f"Snapshot {i % 4} ё",
+                description="Desc" if i % 2 else None,
+                release_date=None if i == 3 else datetime(2000 + i % 5, 1, 2, 3, 4, i),
+                duration=None if i % 5 == 0 else 80 + i,
+                rating=None if i % 4 == 1 else float(i % 3) + 0.5,
+                poster_url=f"http://posters/{i}.jpg" if i % 3 else None,
+                genre_id=genres[i % 2].id,
+                director_id=director.id,
+            )
+            for i in range(13)
+        ]
+    )
+    db.commit()
+    # Перестройка только явная: фоновый поток не должен читать основную базу
+    monkeypatch.setattr(catalog_snapshot, "_schedule", lambda: None)
+    # После отката транзакции предыдущего теста версии таблиц совпадают с версиями
+    # его снимка, хотя данные другие
+    monkeypatch.setattr(catalog_snapshot, "_snapshot", None)
+    catalog_snapshot.refresh(db)
+    return genres
+
+
+def _walk(client: TestClient, params: dict) -> list[bytes]:
+    cursor, bodies = None, []
+    while True:
+        response = client.get(
+            MOVIES_URL, params={**params, **({"cursor": cursor} if cursor else {})}
+        )
+        assert response.status_code == 200
+        bodies.append(response.content)
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return bodies
+
+
+# Страницы из снимка совпадают с ответами базы данных байт в байт
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"limit": 4},
+        {"limit": 3, "sort": "title"},
+        {"limit": 3, "sort": "title", "order": "desc"},
+        {"limit": 2, "sort": "rating", "min_rating": 1},
+        {"limit": 5, "sort": "rating", "order": "desc"},
+        {"limit": 3, "sort": "release_date", "released_from": "2001-01-01T00:00:00"},
+        {"limit": 2, "sort": "release_date", "order": "desc", "max_duration": 88},
+        {"limit": 4, "fields": "title,rating", "expand": "genre"},
+        {"limit": 100, "skip": 3, "expand": "genre,director"},
+    ],
+)
+def test_snapshot_pages_match_database(
+    client: TestClient, snapshot_catalog, monkeypatch, params: dict
+):
+    params = {"genre_id": snapshot_catalog[0].id, **params}
+    monkeypatch.setattr(settings, "FAST_LIST_RESPONSES", True)
+    pages = {}
+    for enabled in (True, False):
+        monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", enabled)
+        pages[enabled] = _walk(client, params)
+    assert pages[True] == pages[False]
+    assert sum(len(body) > 2 for body in pages[True]) >= 1
+
+
+def test_snapshot_goes_stale_after_write(
+    client: TestClient, db: Session, snapshot_catalog, create_user, monkeypatch
+):
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", True)
+    assert catalog_snapshot.current() is not None
+    movie = db.query(Movie).filter(Movie.genre_id == snapshot_catalog[1].id).first()
+    crud_movie.update(db, db_obj=movie, obj_in=MovieUpdate(title="Renamed"))
+    # До перестройки снимка списки читаются из базы данных
+    assert catalog_snapshot.current() is None
+    response = client.get(
+        MOVIES_URL, params={"genre_id": snapshot_catalog[1].id, "sort": "title"}
+    )
+    assert response.json()[0]["title"] == "Renamed"
+    catalog_snapshot.refresh(db)
+    assert catalog_snapshot.stats()["fresh"]
+
+
+# Файл снимка строится одним процессом, остальные отображают его новое поколение
+def test_snapshot_file_is_mapped_by_other_workers(
+    client: TestClient, db: Session, snapshot_catalog, monkeypatch, tmp_path
+):
+    monkeypatch.setattr(settings, "FAST_LIST_RESPONSES", True)
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT_PATH", str(tmp_path / "catalog"))
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT_CHECK_INTERVAL", 0)
+    snapshot = catalog_snapshot.refresh(db)
+    assert snapshot.generation == 1
+    assert not snapshot.ids.flags.writeable
+
+    params = {"genre_id": snapshot_catalog[0].id, "sort": "title", "limit": 4}
+    params["expand"] = "genre,director"
+    pages = {}
+    for enabled in (True, False):
+        monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", enabled)
+        pages[enabled] = _walk(client, params)
+    assert pages[True] == pages[False]
+
+    # Другой воркер отображает файл в фоновой проверке, а не в запросе
+    worker = CatalogSnapshotStore(lambda: None)
+    scheduled = []
+    monkeypatch.setattr(worker, "_schedule", lambda: scheduled.append(True))
+    assert worker.current() is None
+    assert scheduled and worker.stats()["remaps"] == 0
+    assert worker.refresh(db).generation == 1
+    assert worker.current().generation == 1
+    # Переименование жанра требует перестройки: новое поколение видят все воркеры
+    crud_genre.update(
+        db, db_obj=snapshot_catalog[0], obj_in=GenreUpdate(name="Snapshot Noir")
+    )
+    assert catalog_snapshot.current() is None
+    catalog_snapshot.refresh(db)
+    # Версии таблиц в файле совпадают с базой: воркер отображает файл без перестройки
+    snapshot = worker.refresh(db)
+    assert (snapshot.generation, worker.stats()["remaps"]) == (2, 2)
+    assert worker.stats()["builds"] == 0
+    assert snapshot.related("genre", ("name",), [snapshot_catalog[0].id]) == [
+        {"name": "Snapshot Noir"}
+    ]
+
+
+# Актуальность определяется версиями таблиц в базе, а не временем построения:
+# без изменений снимок используется повторно, запись другого процесса (в обход
+# invalidate этого процесса) приводит к перестройке
+def test_snapshot_rebuilt_only_when_versions_change(
+    db: Session, snapshot_catalog, monkeypatch
+):
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", True)
+    builds = catalog_snapshot.stats()["builds"]
+    snapshot = catalog_snapshot.current()
+    catalog_snapshot.invalidate()
+    assert catalog_snapshot.refresh(db) is snapshot
+    assert catalog_snapshot.stats()["builds"] == builds
+
+    db.execute(update(Movie).values(title="Written elsewhere"))
+    db.commit()
+    assert catalog_snapshot.current() is snapshot
+    rebuilt = catalog_snapshot.refresh(db)
+    assert rebuilt is not snapshot
+    assert rebuilt.versions != snapshot.versions
+    assert catalog_snapshot.stats()["builds"] == builds + 1
+
+
+# Клик по избранному не перестраивает снимок: счётчик читается из базы
+def test_snapshot_reads_live_favorite_counts(
+    client: TestClient, db: Session, snapshot_catalog, create_user, monkeypatch
+):
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT", True)
+    user = create_user("snapfan")
+    params = {"genre_id": snapshot_catalog[0].id, "fields": "favorite_count"}
+    page = client.get(MOVIES_URL, params=params).json()
+    crud_favorite.add(db, user_id=user.id, movie_id=page[0]["id"])
+    assert catalog_snapshot.current() is not None
+    page = client.get(MOVIES_URL, params=params).json()
+    assert [m["favorite_count"] for m in page[:2]] == [1, 0]
@@ -0,0 +1,61 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.catalog_export import EXPORT_COLUMNS, stream_export
+
+EXPORT_URL = f"{settings.API_V1_STR}/movies/export"
+
+
+@pytest.fixture
+def genre_id(seed_movies) -> int:
+    movies = seed_movies(
+        5, "Export", rating=float, release_date=lambda i: datetime(2000 + i, 1, 1)
+    )
+    return movies[0].genre_id
+
+
+def test_ndjson_export_with_filters(client: TestClient, genre_id, auth_headers):
+    response = client.get(
+        EXPORT_URL,
+        params={"genre_id": genre_id, "min_rating": 2},
+        headers=auth_headers("exporter", is_superuser=True),
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["Export 2", "Export 3", "Export 4"]
+    assert rows[0]["release_date"] == "2002-01-01T00:00:00"
+    assert list(rows[0]) == list(EXPORT_COLUMNS)
+
+
+def test_csv_gzip_export(client: TestClient, genre_id, auth_headers):
+    response = client.get(
+        EXPORT_URL,
+        params={"format": "csv", "gzip": True, "genre_id": genre_id},
+        headers=auth_headers("exporter", is_superuser=True),
+    )
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].endswith('movies.csv.gz"')
+    reader = csv.DictReader(io.StringIO(gzip.decompress(response.content).decode()))
+    assert [row["title"] for row in reader] == [f"Export {i}" for i in range(5)]
+
+
+# Анонимный клиент и обычный пользователь не могут выгрузить каталог
+def test_export_requires_superuser(client: TestClient, genre_id, auth_headers):
+    assert client.get(EXPORT_URL).status_code in (401, 403)
+    response = client.get(EXPORT_URL, headers=auth_headers("reader"))
+    assert response.status_code == 400
+
+
+def test_export_streams_in_chunks(db: Session, genre_id):
+    chunks = list(stream_export(db, "ndjson", chunk_size=2))
+    assert len(chunks) >= 3
+    assert all(chunk.count(b"\n") <= 2 for chunk in chunks)
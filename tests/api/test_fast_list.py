@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+
+MOVIES_URL = f"{settings.API_V1_STR}/movies/"
+
+
+@pytest.fixture
+def catalog(db: Session):
+    genre = Genre(name="Fast Genre")
+    director = Director(first_name="Fast", last_name="Director", biography="Bio")
+    db.add_all([genre, director])
+    db.flush()
+    db.add_all(
+        [
+            Movie(
+                title=f"Fast Movie {i}",
+                description="Desc" if i % 2 else None,
+                release_date=datetime(2000 + i, 1, 2, 3, 4, 5, 6000 * i),
+                duration=90 + i,
+                rating=5.5 + i if i % 3 else None,
+                genre_id=genre.id,
+                director_id=director.id,
+            )
+            for i in range(5)
+        ]
+    )
+    db.commit()
+    return genre
+
+
+# Быстрый режим отдаёт тот же JSON и те же заголовки, что и путь через Pydantic
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"limit": 2},
+        {"limit": 2, "sort": "release_date", "order": "desc"},
+        {"limit": 3, "sort": "rating"},
+    ],
+)
+def test_fast_list_matches_pydantic(
+    client: TestClient, catalog, monkeypatch, params: dict
+):
+    params = {**params, "genre_id": catalog.id}
+    pages = {}
+    for fast in (True, False):
+        monkeypatch.setattr(settings, "FAST_LIST_RESPONSES", fast)
+        cursor, bodies = None, []
+        while True:
+            response = client.get(
+                MOVIES_URL, params={**params, **({"cursor": cursor} if cursor else {})}
+            )
+            assert response.status_code == 200
+            assert "etag" in response.headers
+            bodies.append(response.content)
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+        pages[fast] = bodies
+    assert pages[True] == pages[False]
+    assert sum(len(body) > 2 for body in pages[True]) >= 2
+
+
+def test_fast_list_rejects_invalid_cursor(client: TestClient):
+    response = client.get(MOVIES_URL, params={"cursor": "broken"})
+    assert response.status_code == 400
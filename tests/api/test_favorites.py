@@ -0,0 +1,248 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.favorite import crud_favorite
+from app.crud.movie import crud_movie
+from app.crud.user import crud_user
+from app.models.favorite import Favorite
+from app.models.movie import Movie
+from app.services.favorites_writer import FavoritesWriter, favorites_writer
+
+FAVORITES_URL = f"{settings.API_V1_STR}/favorites/"
+
+
+# Пользователь "fan" и четыре фильма одного жанра
+@pytest.fixture
+def fan(db: Session, auth_headers, seed_movies) -> tuple[dict, int, list[int]]:
+    headers = auth_headers("fan")
+    user = crud_user.get_by_username(db, username="fan")
+    return headers, user.id, [movie.id for movie in seed_movies(4, "Fav")]
+
+
+def _favorite_ids(db: Session, user_id: int) -> set[int]:
+    return {
+        movie_id
+        for (movie_id,) in db.query(Favorite.movie_id).filter(
+            Favorite.user_id == user_id
+        )
+    }
+
+
+def test_batch_add_remove_and_clear(client: TestClient, db: Session, fan):
+    headers, user_id, movie_ids = fan
+
+    response = client.post(
+        FAVORITES_URL + "batch",
+        headers=headers,
+        json={"movie_ids": movie_ids[:3] + [movie_ids[0], 10**9]},
+    )
+    assert response.json() == {"added": 3}
+    # Повторное добавление пропускает уже существующие записи
+    response = client.post(
+        FAVORITES_URL + "batch", headers=headers, json={"movie_ids": movie_ids}
+    )
+    assert response.json() == {"added": 1}
+    assert _favorite_ids(db, user_id) == set(movie_ids)
+
+    response = client.post(
+        FAVORITES_URL + "batch/delete",
+        headers=headers,
+        json={"movie_ids": movie_ids[:2]},
+    )
+    assert response.json() == {"removed": 2}
+    assert _favorite_ids(db, user_id) == set(movie_ids[2:])
+
+    # Удаление по ID фильма, без id записи
+    url = f"{FAVORITES_URL}movies/{movie_ids[2]}"
+    assert client.delete(url, headers=headers).status_code == 200
+    assert client.delete(url, headers=headers).status_code == 404
+    assert _favorite_ids(db, user_id) == {movie_ids[3]}
+
+    response = client.delete(FAVORITES_URL, headers=headers)
+    assert response.json()["removed"] == 1
+    assert _favorite_ids(db, user_id) == set()
+
+
+def test_duplicate_favorite_rejected_by_unique_index(
+    client: TestClient, db: Session, fan
+):
+    headers, user_id, movie_ids = fan
+    body = {"movie_id": movie_ids[0]}
+    assert client.post(FAVORITES_URL, headers=headers, json=body).status_code == 201
+    response = client.post(FAVORITES_URL, headers=headers, json=body)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Movie already in favorites"
+
+
+# Одиночное добавление несуществующего фильма — 404, как и пропуск в пакетном
+def test_favorite_of_unknown_movie_not_found(client: TestClient, db: Session, fan):
+    headers, user_id, movie_ids = fan
+    response = client.post(FAVORITES_URL, headers=headers, json={"movie_id": 10**9})
+    assert response.status_code == 404
+    assert _favorite_ids(db, user_id) == set()
+
+
+def _counts(db: Session, movie_ids: list[int]) -> list[int]:
+    db.expire_all()
+    return [db.get(Movie, movie_id).favorite_count for movie_id in movie_ids]
+
+
+def test_favorite_counts_and_top(client: TestClient, db: Session, fan, create_user):
+    headers, user_id, movie_ids = fan
+    client.post(
+        FAVORITES_URL + "batch", headers=headers, json={"movie_ids": movie_ids[:3]}
+    )
+    client.post(FAVORITES_URL, headers=headers, json={"movie_id": movie_ids[3]})
+    assert _counts(db, movie_ids) == [1, 1, 1, 1]
+
+    other = create_user("fan2")
+    crud_favorite.add_many(db, user_id=other.id, movie_ids=movie_ids[1:3])
+    client.post(
+        FAVORITES_URL + "batch/delete",
+        headers=headers,
+        json={"movie_ids": [movie_ids[2]]},
+    )
+    assert _counts(db, movie_ids) == [1, 2, 1, 1]
+
+    genre_id = db.get(Movie, movie_ids[0]).genre_id
+    response = client.get(
+        f"{settings.API_V1_STR}/movies/top", params={"genre_id": genre_id, "limit": 2}
+    )
+    assert [m["id"] for m in response.json()] == [movie_ids[1], movie_ids[3]]
+    assert response.json()[0]["favorite_count"] == 2
+
+    client.delete(FAVORITES_URL, headers=headers)
+    assert _counts(db, movie_ids) == [0, 1, 1, 0]
+
+
+# Закэшированные фильм и рейтинг сбрасываются после фиксации изменения избранного
+def test_cached_movie_and_top_see_new_counts(client: TestClient, db: Session, fan):
+    headers, user_id, movie_ids = fan
+    movie_url = f"{settings.API_V1_STR}/movies/{movie_ids[2]}"
+    genre_id = db.get(Movie, movie_ids[0]).genre_id
+    top_params = {"genre_id": genre_id, "limit": 1}
+    top_url = f"{settings.API_V1_STR}/movies/top"
+    assert client.get(movie_url).json()["favorite_count"] == 0
+    assert client.get(top_url, params=top_params).json()[0]["id"] == movie_ids[3]
+
+    client.post(FAVORITES_URL, headers=headers, json={"movie_id": movie_ids[2]})
+    assert client.get(movie_url).json()["favorite_count"] == 1
+    top = client.get(top_url, params=top_params).json()
+    assert [(m["id"], m["favorite_count"]) for m in top] == [(movie_ids[2], 1)]
+
+    client.post(
+        FAVORITES_URL + "batch/delete",
+        headers=headers,
+        json={"movie_ids": [movie_ids[2]]},
+    )
+    assert client.get(movie_url).json()["favorite_count"] == 0
+
+
+# Рейтинг содержит вложенный жанр: переименование жанра сбрасывает его кэш
+def test_top_sees_renamed_genre(client: TestClient, db: Session, fan, auth_headers):
+    _, _, movie_ids = fan
+    genre_id = db.get(Movie, movie_ids[0]).genre_id
+    top_url = f"{settings.API_V1_STR}/movies/top"
+    assert client.get(top_url).json()[0]["genre"]["name"] == "Fav Genre"
+
+    response = client.put(
+        f"{settings.API_V1_STR}/genres/{genre_id}",
+        headers=auth_headers("curator", is_superuser=True),
+        json={"name": "Renamed Genre"},
+    )
+    assert response.status_code == 200
+    assert client.get(top_url).json()[0]["genre"]["name"] == "Renamed Genre"
+
+
+def test_recount_favorites(db: Session, fan):
+    _, user_id, movie_ids = fan
+    crud_favorite.add_many(db, user_id=user_id, movie_ids=movie_ids[:2])
+    db.execute(
+        update(Movie)
+        .where(Movie.id.in_(movie_ids))
+        .values(favorite_count=Movie.id % 3 + 5)
+    )
+    db.commit()
+    assert crud_movie.recount_favorites(db) == 4
+    assert _counts(db, movie_ids) == [1, 1, 0, 0]
+    assert crud_movie.recount_favorites(db) == 0
+
+
+def test_write_behind_coalesces_and_reads_own_writes(
+    client: TestClient, db: Session, monkeypatch, fan
+):
+    monkeypatch.setattr(settings, "FAVORITES_WRITE_BEHIND", True)
+    headers, user_id, movie_ids = fan
+    crud_favorite.add_many(db, user_id=user_id, movie_ids=[movie_ids[3]])
+    favorite_id = db.query(Favorite.id).filter(Favorite.user_id == user_id).scalar()
+
+    def add(movie_id: int) -> int:
+        body = {"movie_id": movie_id}
+        return client.post(FAVORITES_URL, headers=headers, json=body).status_code
+
+    def remove() -> int:
+        url = f"{FAVORITES_URL}{favorite_id}"
+        return client.delete(url, headers=headers).status_code
+
+    assert add(movie_ids[0]) == 202
+    # Повтор отклоняется с учётом незафиксированного добавления
+    assert add(movie_ids[0]) == 400
+    assert add(10**9) == 404
+    assert add(movie_ids[1]) == add(movie_ids[2]) == 202
+    # Удаление ставится в очередь, повторное удаление той же записи — 404
+    assert remove() == 200
+    assert remove() == 404
+    assert favorites_writer.state(user_id, movie_ids[3]) is False
+    assert _favorite_ids(db, user_id) == {movie_ids[3]}
+    # Добавление из ответа 202 (без id записи) удаляется по ID фильма
+    url = f"{FAVORITES_URL}movies/{movie_ids[2]}"
+    assert client.delete(url, headers=headers).status_code == 200
+    assert client.delete(url, headers=headers).status_code == 404
+
+    # Чтение своего избранного сначала фиксирует изменения пользователя
+    response = client.get(FAVORITES_URL, headers=headers)
+    assert [f["movie_id"] for f in response.json()] == movie_ids[:2]
+    assert not favorites_writer.has_pending(user_id)
+    assert _counts(db, movie_ids) == [1, 1, 0, 0]
+
+
+def test_write_behind_batches_users_and_restores_on_failure(
+    db: Session, monkeypatch, fan, create_user
+):
+    _, user_id, movie_ids = fan
+    other = create_user("fan2")
+    crud_favorite.add_many(db, user_id=other.id, movie_ids=movie_ids[:1])
+    writer = FavoritesWriter(lambda: db, interval=1, max_ops=100)
+
+    writer.add(user_id, movie_ids[0])
+    writer.add(user_id, movie_ids[1])
+    writer.remove(user_id, movie_ids[1])
+    writer.add(other.id, movie_ids[1])
+    writer.remove(other.id, movie_ids[0])
+    writer.add(other.id, movie_ids[0])
+    writer.remove(other.id, movie_ids[0])
+    assert writer.stats()["coalesced"] == 4
+
+    def fail(db, *, changes):
+        raise RuntimeError("database is locked")
+
+    rollbacks = []
+    with monkeypatch.context() as patch:
+        patch.setattr(crud_favorite, "apply_changes", fail)
+        # Откат настоящей сессии отменил бы транзакцию теста целиком
+        patch.setattr(db, "rollback", lambda: rollbacks.append(True))
+        with pytest.raises(RuntimeError):
+            writer.flush(db)
+    # Сессия запроса откатывается после ошибки фиксации
+    assert rollbacks == [True]
+    # Изменения вернулись в очередь; новое противоположное изменение сокращается с ними
+    writer.remove(user_id, movie_ids[0])
+    assert writer.state(user_id, movie_ids[0]) is None
+    assert writer.flush(db) == 2
+    assert _favorite_ids(db, user_id) == set()
+    assert _favorite_ids(db, other.id) == {movie_ids[1]}
+    assert _counts(db, movie_ids) == [0, 1, 0, 0]
+    assert writer.stats()["failures"] == 1
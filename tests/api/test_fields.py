@@ -0,0 +1,129 @@
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.favorite import crud_favorite
+from app.crud.user import crud_user
+
+MOVIES_URL = f"{settings.API_V1_STR}/movies/"
+FAVORITES_URL = f"{settings.API_V1_STR}/favorites/"
+
+
+@pytest.fixture
+def movie_ids(seed_movies) -> list[int]:
+    movies = seed_movies(
+        3,
+        "Fields",
+        description="Long text " * 50,
+        poster_url=lambda i: f"/posters/{i}.jpg",
+        rating=lambda i: 6.0 + i,
+    )
+    return [movie.id for movie in movies]
+
+
+# Перехват SQL-запросов, выполненных через соединение сессии
+@contextmanager
+def captured_sql(db: Session):
+    statements = []
+    connection = db.connection()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", capture)
+
+
+def _movie_queries(statements: list[str]) -> list[str]:
+    return [s for s in statements if "FROM movies" in s]
+
+
+def test_sparse_fields_change_sql(client: TestClient, db: Session, movie_ids):
+    with captured_sql(db) as statements:
+        response = client.get(
+            MOVIES_URL, params={"fields": "title,poster_url", "expand": ""}
+        )
+    assert response.status_code == 200
+    items = [item for item in response.json() if item["id"] in movie_ids]
+    assert items[0] == {
+        "title": "Fields 0",
+        "poster_url": "/posters/0.jpg",
+        "id": movie_ids[0],
+    }
+    (query,) = _movie_queries(statements)
+    assert "JOIN" not in query
+    assert "description" not in query
+
+    full = client.get(MOVIES_URL)
+    assert len(response.content) * 5 < len(full.content)
+
+
+def test_expand_single_relation(client: TestClient, db: Session, movie_ids):
+    with captured_sql(db) as statements:
+        response = client.get(MOVIES_URL, params={"fields": "title", "expand": "genre"})
+    item = next(item for item in response.json() if item["id"] == movie_ids[0])
+    assert item == {
+        "title": "Fields 0",
+        "id": movie_ids[0],
+        "genre": {"name": "Fields Genre", "id": item["genre"]["id"]},
+    }
+    (query,) = _movie_queries(statements)
+    assert "JOIN genres" in query
+    assert "directors" not in query
+
+
+def test_sparse_fields_keep_sort_field_for_cursor(client: TestClient, movie_ids):
+    seen, cursor = [], None
+    while True:
+        params = {"fields": "title", "expand": "", "sort": "rating", "order": "desc"}
+        params["limit"] = 1
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(MOVIES_URL, params=params)
+        assert response.status_code == 200
+        seen.extend(item["id"] for item in response.json())
+        assert all(set(item) == {"title", "id", "rating"} for item in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert [i for i in seen if i in movie_ids] == movie_ids[::-1]
+
+
+@pytest.mark.parametrize("params", [{"fields": "title,secret"}, {"expand": "user"}])
+def test_unknown_fields_rejected(client: TestClient, params: dict):
+    response = client.get(MOVIES_URL, params=params)
+    assert response.status_code == 400
+
+
+def test_favorites_fields_and_expand(
+    client: TestClient, db: Session, movie_ids, auth_headers, monkeypatch
+):
+    headers = auth_headers("grid")
+    user = crud_user.get_by_username(db, username="grid")
+    crud_favorite.add_many(db, user_id=user.id, movie_ids=movie_ids[:2])
+
+    # Полная выборка совпадает с ответом через Pydantic
+    full = client.get(FAVORITES_URL, headers=headers)
+    monkeypatch.setattr(settings, "FAST_LIST_RESPONSES", False)
+    assert client.get(FAVORITES_URL, headers=headers).content == full.content
+
+    with captured_sql(db) as statements:
+        response = client.get(
+            FAVORITES_URL, headers=headers, params={"fields": "title", "expand": ""}
+        )
+    favorites = response.json()
+    assert [f["movie"] for f in favorites] == [
+        {"title": "Fields 0", "id": movie_ids[0]},
+        {"title": "Fields 1", "id": movie_ids[1]},
+    ]
+    assert set(favorites[0]) == {"id", "user_id", "movie_id", "created_at", "movie"}
+    (query,) = [s for s in statements if "FROM favorites" in s]
+    assert "genres" not in query and "directors" not in query
+    assert "description" not in query
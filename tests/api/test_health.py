@@ -0,0 +1,26 @@
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import OperationalError
+
+from app.main import app
+
+
+def test_health_and_ready(client: TestClient):
+    assert client.get("/health").json() == {"status": "ok", "pid": os.getpid()}
+    assert client.get("/ready").json() == {"status": "ready", "pid": os.getpid()}
+
+
+# Недоступная база данных делает воркер неготовым, но не «мёртвым»
+def test_ready_reports_unavailable_database(client: TestClient):
+    from app.db.session import get_read_db
+
+    class BrokenSession:
+        def execute(self, *args, **kwargs):
+            raise OperationalError("SELECT 1", {}, Exception("database is down"))
+
+    app.dependency_overrides[get_read_db] = lambda: BrokenSession()
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+    assert client.get("/health").status_code == 200
@@ -0,0 +1,98 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.director import crud_director
+from app.crud.genre import crud_genre
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.schemas.genre import GenreCreate
+
+GENRES_URL = f"{settings.API_V1_STR}/genres/"
+MOVIES_URL = f"{settings.API_V1_STR}/movies/"
+
+
+def test_genres_not_modified_until_table_changes(client: TestClient, db: Session):
+    crud_genre.create(db, obj_in=GenreCreate(name="Etag Genre"))
+    response = client.get(GENRES_URL)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    cached = client.get(GENRES_URL, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    # Другие параметры запроса — другой ответ и другой ETag
+    other = client.get(
+        GENRES_URL, params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert other.status_code == 200
+
+    crud_genre.create(db, obj_in=GenreCreate(name="Etag Genre 2"))
+    response = client.get(GENRES_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_movie_etag_tracks_nested_and_bulk_changes(client: TestClient, db: Session):
+    genre = Genre(name="Etag Movies")
+    director = Director(first_name="Etag", last_name="Director")
+    db.add_all([genre, director])
+    db.flush()
+    movie = Movie(title="Etag Movie", genre_id=genre.id, director_id=director.id)
+    db.add(movie)
+    db.commit()
+    url = f"{MOVIES_URL}{movie.id}"
+
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": f"W/{etag}"}).status_code == 304
+
+    # Изменение вложенного режиссёра меняет ETag фильма
+    crud_director.update(db, db_obj=director, obj_in={"last_name": "Renamed"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["director"]["last_name"] == "Renamed"
+    etag = response.headers["etag"]
+
+    # Массовое изменение в обход ORM тоже учитывается (триггеры), а закэшированный
+    # фильм сбрасывается: тело соответствует новому ETag
+    db.execute(update(Movie).where(Movie.id == movie.id).values(favorite_count=5))
+    db.commit()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["favorite_count"] == 5
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    # Запись другого процесса (без сброса кэшей этого процесса)
+    db.execute(update(Movie).where(Movie.id == movie.id).values(title="Renamed"))
+    db.commit()
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.json()["title"] == "Renamed"
+
+
+# Счётчик избранного меняет версию movie_favorites, а не movies: ETag фасетов
+# (без счётчиков) сохраняется
+def test_favorite_counts_do_not_bust_facets(client: TestClient, db: Session):
+    genre = Genre(name="Etag Facets")
+    director = Director(first_name="Facet", last_name="Director")
+    db.add_all([genre, director])
+    db.flush()
+    movie = Movie(title="Facet Movie", genre_id=genre.id, director_id=director.id)
+    db.add(movie)
+    db.commit()
+    facets_url = f"{MOVIES_URL}facets"
+    facets = client.get(facets_url).headers["etag"]
+    detail = client.get(f"{MOVIES_URL}{movie.id}").headers["etag"]
+
+    db.execute(update(Movie).where(Movie.id == movie.id).values(favorite_count=3))
+    db.commit()
+    assert client.get(facets_url).headers["etag"] == facets
+    assert client.get(f"{MOVIES_URL}{movie.id}").headers["etag"] != detail
+
+    db.execute(update(Movie).where(Movie.id == movie.id).values(rating=7.5))
+    db.commit()
+    assert client.get(facets_url).headers["etag"] != facets
@@ -0,0 +1,66 @@
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+
+
+def _seed_lookups(db: Session) -> tuple[Genre, Director]:
+    genre = Genre(name="Import Drama")
+    director = Director(first_name="Ingmar", last_name="Importer")
+    db.add_all([genre, director])
+    db.commit()
+    return genre, director
+
+
+def test_ndjson_import_reports_bad_rows(
+    client: TestClient, db: Session, auth_headers
+):
+    genre, director = _seed_lookups(db)
+    lines = [
+        {"title": "One", "genre": "import drama", "director": "Ingmar  Importer"},
+        {"title": "Two", "genre_id": genre.id, "director_id": director.id,
+         "rating": 7.5, "release_date": "2001-05-01"},
+        {"title": "Three", "genre": "Unknown", "director": "Ingmar Importer"},
+        {"genre": "Import Drama", "director": "Ingmar Importer"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines) + "\n{not json\n"
+    response = client.post(
+        f"{settings.API_V1_STR}/movies/import",
+        headers=auth_headers("importer", is_superuser=True),
+        params={"batch_size": 1},
+        files={"file": ("movies.ndjson", body.encode(), "application/x-ndjson")},
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["inserted"] == 2
+    assert report["failed"] == 3
+    assert [e["line"] for e in report["errors"]] == [3, 4, 5]
+    titles = {m.title for m in db.query(Movie).filter(Movie.genre_id == genre.id)}
+    assert titles == {"One", "Two"}
+    # Импорт обновляет счётчики фасетов в той же транзакции
+    facets = client.get(f"{settings.API_V1_STR}/movies/facets").json()
+    assert facets["genre"] == [{"id": genre.id, "name": "Import Drama", "count": 2}]
+    assert facets["director"][0]["name"] == "Ingmar Importer"
+
+
+def test_csv_import(client: TestClient, db: Session, auth_headers):
+    _seed_lookups(db)
+    body = (
+        "title,genre,director,duration,rating\n"
+        "Alpha,Import Drama,Ingmar Importer,120,\n"
+        "Beta,Import Drama,Ingmar Importer,not-a-number,5\n"
+    )
+    response = client.post(
+        f"{settings.API_V1_STR}/movies/import",
+        headers=auth_headers("importer", is_superuser=True),
+        files={"file": ("movies.csv", body.encode(), "text/csv")},
+    )
+    report = response.json()
+    assert report["inserted"] == 1
+    assert report["errors"][0]["line"] == 3
+    assert "duration" in report["errors"][0]["error"]
@@ -0,0 +1,118 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.instrumentation import (
+    N_PLUS_ONE,
+    SLOW_QUERIES,
+    InstrumentationMiddleware,
+    install_sql_instrumentation,
+)
+from app.core.metrics import Counter, Histogram, Registry
+from app.main import app
+
+MOVIES_ROUTE = f"{settings.API_V1_STR}/movies/"
+
+
+@pytest.fixture
+def instrumented(client: TestClient, monkeypatch):
+    # client настраивает зависимости приложения на тестовую сессию
+    monkeypatch.setattr(settings, "INSTRUMENTATION_ENABLED", True)
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+    install_sql_instrumentation()
+    with TestClient(InstrumentationMiddleware(app)) as instrumented_client:
+        yield instrumented_client
+
+
+def _queries(response) -> int:
+    timing = response.headers["server-timing"]
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+    return int(match.group(1))
+
+
+def test_server_timing_counts_sql_for_async_and_sync_routes(
+    instrumented, auth_headers
+):
+    response = instrumented.get(MOVIES_ROUTE)
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("app;dur=")
+    assert _queries(response) >= 1
+    assert _queries(instrumented.get("/")) == 0
+
+    # Синхронный эндпоинт выполняется в потоке пула: его запросы тоже учитываются
+    response = instrumented.get(
+        f"{settings.API_V1_STR}/favorites/", headers=auth_headers("timed")
+    )
+    assert response.status_code == 200
+    assert _queries(response) >= 1
+
+    metrics = instrumented.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert (
+        f'http_requests_total{{method="GET",route="{MOVIES_ROUTE}",status="200"}}'
+        in metrics.text
+    )
+    assert f'http_request_db_statements_count{{route="{MOVIES_ROUTE}"}}' in metrics.text
+    assert "db_statement_duration_seconds_bucket" in metrics.text
+
+
+def test_slow_and_repeated_queries_are_flagged(instrumented, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0)
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 1)
+    slow, repeated = SLOW_QUERIES.value(MOVIES_ROUTE), N_PLUS_ONE.value(MOVIES_ROUTE)
+
+    response = instrumented.get(MOVIES_ROUTE)
+    assert 'n-plus-one;desc="' in response.headers["server-timing"]
+    assert SLOW_QUERIES.value(MOVIES_ROUTE) >= slow + 1
+    assert N_PLUS_ONE.value(MOVIES_ROUTE) == repeated + 1
+
+
+def test_profile_attached_by_debug_header(instrumented, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+
+    assert "profile;" not in instrumented.get(MOVIES_ROUTE).headers["server-timing"]
+    response = instrumented.get(MOVIES_ROUTE, headers={settings.PROFILE_HEADER: "1"})
+    timing = response.headers["server-timing"]
+    profile_id = re.search(r'profile;desc="(\w+)"', timing).group(1)
+    assert (tmp_path / f"{profile_id}.collapsed").exists()
+
+
+# Server-Timing и /metrics не раскрываются без явного включения
+def test_timing_and_metrics_are_opt_in(instrumented, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", False)
+    assert "server-timing" not in instrumented.get(MOVIES_ROUTE).headers
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape")
+    assert instrumented.get("/metrics").status_code == 401
+    metrics = instrumented.get("/metrics", headers={"Authorization": "Bearer scrape"})
+    assert metrics.status_code == 200
+
+    monkeypatch.setattr(settings, "INSTRUMENTATION_ENABLED", False)
+    assert instrumented.get("/metrics").status_code == 404
+
+
+def test_prometheus_rendering():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ("path",)))
+    latency = registry.register(
+        Histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    )
+    requests.inc('/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{path="/a\\"b"} 1',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 3",
+    ]
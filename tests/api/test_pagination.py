@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+
+
+def _create_movies(db: Session, count: int = 7) -> list[Movie]:
+    genre = Genre(name="Pagination Genre")
+    director = Director(first_name="Page", last_name="Director")
+    db.add_all([genre, director])
+    db.flush()
+    movies = [
+        Movie(
+            title=f"Movie {i % 3}",
+            rating=None if i == 2 else float(i % 4),
+            release_date=datetime(2000 + i, 1, 1),
+            genre_id=genre.id,
+            director_id=director.id,
+        )
+        for i in range(count)
+    ]
+    db.add_all(movies)
+    db.commit()
+    return movies
+
+
+def _walk(client: TestClient, url: str, **params) -> list[int]:
+    ids = []
+    cursor = None
+    while True:
+        query = dict(params)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(url, params=query)
+        assert response.status_code == 200
+        ids.extend(item["id"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+
+
+def test_cursor_pagination_matches_offset_order(client: TestClient, db: Session):
+    _create_movies(db)
+    url = f"{settings.API_V1_STR}/movies/"
+    for sort in ("id", "title", "rating", "release_date"):
+        for order in ("asc", "desc"):
+            expected = [
+                item["id"]
+                for item in client.get(
+                    url, params={"sort": sort, "order": order, "limit": 100}
+                ).json()
+            ]
+            walked = _walk(client, url, sort=sort, order=order, limit=2)
+            assert walked == expected
+            assert len(walked) == len(set(walked))
+
+
+def test_skip_limit_still_supported(client: TestClient, db: Session):
+    movies = _create_movies(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/movies/", params={"skip": 2, "limit": 3}
+    )
+    assert response.status_code == 200
+    assert [m["id"] for m in response.json()] == [m.id for m in movies[2:5]]
+
+
+def test_invalid_cursor_and_sort(client: TestClient, db: Session):
+    url = f"{settings.API_V1_STR}/genres/"
+    assert client.get(url, params={"cursor": "garbage"}).status_code == 400
+    assert client.get(url, params={"sort": "rating"}).status_code == 400
@@ -0,0 +1,99 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.favorite import crud_favorite
+from app.crud.movie import crud_movie
+from app.crud.user import crud_user
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.schemas.movie import MovieCreate, MovieUpdate
+from app.services.recommendations import recommendation_index
+
+RECOMMENDATIONS_URL = f"{settings.API_V1_STR}/users/me/recommendations"
+
+
+def _catalog(db: Session) -> dict[str, Movie]:
+    drama, comedy = Genre(name="Rec Drama"), Genre(name="Rec Comedy")
+    bergman, allen = (
+        Director(first_name="Rec", last_name="Bergman"),
+        Director(first_name="Rec", last_name="Allen"),
+    )
+    db.add_all([drama, comedy, bergman, allen])
+    db.flush()
+    specs = {
+        "seen_drama": (drama, bergman, 1957, 90, 8.0),
+        "drama_same_director": (drama, bergman, 1961, 95, 7.0),
+        "drama_other_director": (drama, allen, 1985, 150, 7.0),
+        "comedy": (comedy, allen, 1977, 93, 9.0),
+    }
+    movies = {
+        name: Movie(
+            title=name,
+            genre_id=genre.id,
+            director_id=director.id,
+            release_date=datetime(year, 1, 1),
+            duration=duration,
+            rating=rating,
+        )
+        for name, (genre, director, year, duration, rating) in specs.items()
+    }
+    db.add_all(movies.values())
+    db.commit()
+    # Индекс общий для процесса, а каждый тест работает в своей транзакции
+    recommendation_index.invalidate()
+    return movies
+
+
+def test_recommendations_follow_favorites(
+    client: TestClient, db: Session, auth_headers
+):
+    movies = _catalog(db)
+    headers = auth_headers("viewer")
+    user = crud_user.get_by_username(db, username="viewer")
+    crud_favorite.add(db, user_id=user.id, movie_id=movies["seen_drama"].id)
+
+    response = client.get(RECOMMENDATIONS_URL, headers=headers, params={"limit": 10})
+    assert response.status_code == 200
+    titles = [item["movie"]["title"] for item in response.json()]
+    # Избранное исключается; тот же жанр и режиссёр выше, чем только тот же жанр
+    assert titles[:2] == ["drama_same_director", "drama_other_director"]
+    assert "seen_drama" not in titles
+    scores = [item["score"] for item in response.json()]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_favorite_genre_and_incremental_updates(
+    client: TestClient, db: Session, auth_headers
+):
+    movies = _catalog(db)
+    headers = auth_headers("viewer", favorite_genre="Rec Comedy")
+    response = client.get(RECOMMENDATIONS_URL, headers=headers, params={"limit": 1})
+    assert response.json()[0]["movie"]["title"] == "comedy"
+
+    # Изменения через CRUD применяются к индексу без полной перестройки
+    genre_id = movies["seen_drama"].genre_id
+    crud_movie.update(
+        db,
+        db_obj=movies["comedy"],
+        obj_in=MovieUpdate(title="comedy", genre_id=genre_id),
+    )
+    created = crud_movie.create(
+        db,
+        obj_in=MovieCreate(
+            title="new_comedy",
+            genre_id=genre_id + 1,
+            director_id=movies["comedy"].director_id,
+        ),
+    )
+    assert recommendation_index.stats()["pending"] == 2
+    response = client.get(RECOMMENDATIONS_URL, headers=headers, params={"limit": 1})
+    assert response.json()[0]["movie"]["id"] == created.id
+
+    crud_movie.remove(db, id=created.id)
+    response = client.get(RECOMMENDATIONS_URL, headers=headers, params={"limit": 10})
+    assert created.id not in [item["movie"]["id"] for item in response.json()]
+    assert len(response.json()) == 4
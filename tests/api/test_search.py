@@ -0,0 +1,120 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.movie import crud_movie
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+
+
+def _search(client: TestClient, q: str) -> list[dict]:
+    response = client.get(f"{settings.API_V1_STR}/movies/search", params={"q": q})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _seed(db: Session) -> list[Movie]:
+    genre = Genre(name="Search Genre")
+    director = Director(first_name="Search", last_name="Director")
+    db.add_all([genre, director])
+    db.flush()
+    movies = [
+        Movie(
+            title="Interstellar",
+            description="Explorers travel through a wormhole in space.",
+            genre_id=genre.id,
+            director_id=director.id,
+        ),
+        Movie(
+            title="Space Cowboys",
+            description="Retired pilots return for one last mission.",
+            genre_id=genre.id,
+            director_id=director.id,
+        ),
+    ]
+    db.add_all(movies)
+    db.commit()
+    return movies
+
+
+def test_search_ranks_title_matches_first(client: TestClient, db: Session):
+    interstellar, cowboys = _seed(db)
+    results = _search(client, "space")
+    assert [r["movie"]["id"] for r in results] == [cowboys.id, interstellar.id]
+    assert "<mark>" in results[1]["snippet"]
+
+
+def test_search_prefix_and_sync_with_crud(client: TestClient, db: Session):
+    interstellar, cowboys = _seed(db)
+    assert [r["movie"]["id"] for r in _search(client, "inters")] == [interstellar.id]
+
+    crud_movie.update(db, db_obj=interstellar, obj_in={"title": "Wormhole"})
+    assert _search(client, "inters") == []
+    assert [r["movie"]["id"] for r in _search(client, "wormh")] == [interstellar.id]
+
+    crud_movie.remove(db, id=cowboys.id)
+    assert _search(client, "cowboys") == []
+
+
+def test_search_ignores_fts_syntax(client: TestClient, db: Session):
+    _seed(db)
+    assert _search(client, '"') == []
+    assert len(_search(client, 'space "pilots')) == 1
+
+
+# Текст фрагмента экранируется, подсветка остаётся тегом <mark>
+def test_search_snippet_is_escaped_html(client: TestClient, db: Session):
+    genre = Genre(name="Escape Genre")
+    director = Director(first_name="Escape", last_name="Director")
+    db.add_all([genre, director])
+    db.flush()
+    db.add(
+        Movie(
+            title="Markup",
+            description="A <script>alert(1)</script> heist & chase",
+            genre_id=genre.id,
+            director_id=director.id,
+        )
+    )
+    db.commit()
+    snippet = _search(client, "heist")[0]["snippet"]
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "<mark>heist</mark> &amp; chase" in snippet
+
+
+# create_all на базе, созданной до появления поиска, строит и заполняет индекс
+def test_create_all_backfills_search_index(tmp_path):
+    from sqlalchemy import create_engine, text
+
+    from app.db.base_class import Base
+    from app.db.fts import FTS_TABLE
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE {FTS_TABLE}"))
+        for suffix in ("ai", "ad", "au"):
+            connection.execute(text(f"DROP TRIGGER movies_fts_{suffix}"))
+        connection.execute(text("INSERT INTO genres (id, name) VALUES (1, 'G')"))
+        connection.execute(
+            text(
+                "INSERT INTO directors (id, first_name, last_name) "
+                "VALUES (1, 'A', 'B')"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO movies (title, genre_id, director_id, favorite_count) "
+                "VALUES ('Legacy Picture', 1, 1, 0)"
+            )
+        )
+
+    Base.metadata.create_all(engine)
+    with engine.connect() as connection:
+        found = connection.execute(
+            text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH 'legacy'")
+        ).all()
+    engine.dispose()
+    assert len(found) == 1
@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.favorite import crud_favorite
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.services.similar_movies import refresh_similar_movies
+
+
+def _movies(db: Session) -> dict[str, int]:
+    genre = Genre(name="Similar Genre")
+    director = Director(first_name="Similar", last_name="Director")
+    db.add_all([genre, director])
+    db.flush()
+    movies = {
+        name: Movie(title=name, genre_id=genre.id, director_id=director.id)
+        for name in "ABCD"
+    }
+    db.add_all(movies.values())
+    db.commit()
+    return {name: movie.id for name, movie in movies.items()}
+
+
+def _favorite(db: Session, user, movie_ids: list[int]) -> None:
+    crud_favorite.add_many(db, user_id=user.id, movie_ids=movie_ids)
+
+
+def _similar(client: TestClient, movie_id: int) -> list[tuple[int, float]]:
+    response = client.get(f"{settings.API_V1_STR}/movies/{movie_id}/similar")
+    assert response.status_code == 200
+    return [(item["movie"]["id"], item["score"]) for item in response.json()]
+
+
+def test_similar_movies_full_and_incremental(
+    client: TestClient, db: Session, create_user
+):
+    ids = _movies(db)
+    _favorite(db, create_user("u1"), [ids["A"], ids["B"], ids["C"]])
+    _favorite(db, create_user("u2"), [ids["A"], ids["B"]])
+    _favorite(db, create_user("u3"), [ids["A"], ids["C"], ids["D"]])
+
+    summary = refresh_similar_movies(db, min_cooccurrence=1)
+    assert summary["full"] and summary["movies"] == 4
+    similar = _similar(client, ids["A"])
+    # cos(A, B) = cos(A, C) = 2 / sqrt(3 * 2), cos(A, D) = 1 / sqrt(3 * 1)
+    assert [movie_id for movie_id, _ in similar] == [ids["B"], ids["C"], ids["D"]]
+    assert similar[0][1] == pytest.approx(2 / 6**0.5)
+    assert similar[2][1] == pytest.approx(1 / 3**0.5)
+    assert _similar(client, ids["B"])[0][0] == ids["A"]
+
+    # Инкрементальный запуск пересчитывает только фильмы новых пользователей
+    _favorite(db, create_user("u4"), [ids["B"], ids["D"]])
+    summary = refresh_similar_movies(db, min_cooccurrence=1)
+    assert not summary["full"] and summary["movies"] == 2
+    assert ids["B"] in [movie_id for movie_id, _ in _similar(client, ids["D"])]
+    assert refresh_similar_movies(db, min_cooccurrence=1)["movies"] == 0
+
+
+def test_similar_unknown_movie(client: TestClient):
+    response = client.get(f"{settings.API_V1_STR}/movies/999999/similar")
+    assert response.status_code == 404
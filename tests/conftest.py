@@ -1,10 +1,11 @@
 import os
 import sys
+from datetime import timedelta
 from pathlib import Path
 import pytest
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.db.base_class import Base
+from app.db.engine import create_db_engine
 from app.core.config import settings
 
 # Импортируем приложение
@@ -18,9 +19,7 @@ if project_root not in sys.path:
 
 
 # Создаем отдельную базу данных для тестов
-test_engine = create_engine(
-    "sqlite:///./test_movie_library.db", connect_args={"check_same_thread": False}
-)
+test_engine = create_db_engine("sqlite:///./test_movie_library.db", pool_class="static")
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
 
@@ -31,6 +30,16 @@ def db_engine():
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_app_caches():
+    # Каждый тест откатывает свою транзакцию, поэтому кэш не должен переживать тест
+    from app.core.cache import clear_caches
+
+    clear_caches()
+    yield
+    clear_caches()
+
+
 @pytest.fixture(scope="function")
 def db(db_engine):
     connection = test_engine.connect()
@@ -44,23 +53,111 @@ def db(db_engine):
     connection.close()
 
 
+# Асинхронные эндпоинты работают с БД только через AsyncSession.run_sync,
+# поэтому в тестах они получают ту же транзакционную сессию, что и синхронные
+class SyncSessionRunner:
+    def __init__(self, session):
+        self.session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(self.session, *args, **kwargs)
+
+
 @pytest.fixture(scope="function")
 def client(db):
     from fastapi.testclient import TestClient
-    from app.db.session import get_db_session
+    from app.db.session import (
+        get_async_db,
+        get_async_read_db,
+        get_db as get_db_session,
+        get_read_db,
+    )
 
     # Создаем новое приложение для тестов, чтобы не влиять на основное
     test_app = app
 
-    # Сохраняем оригинальную зависимость
-    original_get_db = test_app.dependency_overrides.get(get_db_session, None)
+    # Сохраняем оригинальные зависимости
+    original_overrides = dict(test_app.dependency_overrides)
     test_app.dependency_overrides[get_db_session] = lambda: db
+    test_app.dependency_overrides[get_read_db] = lambda: db
+    test_app.dependency_overrides[get_async_db] = lambda: SyncSessionRunner(db)
+    test_app.dependency_overrides[get_async_read_db] = lambda: SyncSessionRunner(db)
 
     with TestClient(test_app) as test_client:
         yield test_client
 
-    # Восстанавливаем оригинальную зависимость
-    if original_get_db is not None:
-        test_app.dependency_overrides[get_db_session] = original_get_db
-    else:
-        test_app.dependency_overrides.pop(get_db_session, None)
+    # Восстанавливаем оригинальные зависимости
+    test_app.dependency_overrides.clear()
+    test_app.dependency_overrides.update(original_overrides)
+
+
+# Хеш пароля тестовых пользователей считается один раз: crud_user.create
+# с открытым паролем запустил бы пул процессов bcrypt
+@pytest.fixture(scope="session")
+def hashed_password():
+    from app.core.security import get_password_hash
+
+    return get_password_hash("pw")
+
+
+# Фабрика пользователей: create_user("fan", is_superuser=True)
+@pytest.fixture
+def create_user(db, hashed_password):
+    from app.crud.user import crud_user
+    from app.schemas.user import UserCreate
+
+    def create(username: str, **fields):
+        obj_in = UserCreate(
+            username=username, email=f"{username}@test.com", password="pw", **fields
+        )
+        return crud_user.create(db, obj_in=obj_in, hashed_password=hashed_password)
+
+    return create
+
+
+# Фабрика заголовков Authorization: создаёт пользователя и выпускает ему токен
+@pytest.fixture
+def auth_headers(create_user):
+    from app.core.security import create_access_token
+
+    def headers(username: str, is_superuser: bool = False, **fields) -> dict:
+        create_user(username, is_superuser=is_superuser, **fields)
+        token = create_access_token(
+            {"sub": username}, expires_delta=timedelta(minutes=5)
+        )
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
+
+
+# Фабрика каталога: жанр, режиссёр и n фильмов "<name> 0" ... "<name> n-1"
+# Значения полей фильмов — константы или функции от номера фильма:
+# seed_movies(3, "Export", rating=float)
+@pytest.fixture
+def seed_movies(db):
+    from app.models.director import Director
+    from app.models.genre import Genre
+    from app.models.movie import Movie
+
+    def seed(n: int, name: str = "Seed", **fields) -> list:
+        genre = Genre(name=f"{name} Genre")
+        director = Director(first_name=name, last_name="Director")
+        db.add_all([genre, director])
+        db.flush()
+        movies = [
+            Movie(
+                title=f"{name} {i}",
+                genre_id=genre.id,
+                director_id=director.id,
+                **{
+                    key: value(i) if callable(value) else value
+                    for key, value in fields.items()
+                },
+            )
+            for i in range(n)
+        ]
+        db.add_all(movies)
+        db.commit()
+        return movies
+
+    return seed
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.crud.genre import async_crud_genre
+from app.crud.movie import async_crud_movie
+from app.crud.user import async_crud_user, crud_user
+from app.db.base_class import Base
+from app.db.engine import create_async_db_engine, create_db_engine
+from app.db.session import get_async_db, get_async_read_db, get_db, get_read_db
+from app.main import app
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.schemas.genre import GenreCreate
+from app.schemas.user import UserCreate
+
+
+# Отдельная файловая база: асинхронный движок aiosqlite и синхронный движок для
+# подготовки данных работают с ней через разные соединения
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "async.db"
+    engine = create_db_engine(f"sqlite:///{path}", pool_class="null")
+    Base.metadata.create_all(bind=engine)
+    SyncSession = sessionmaker(bind=engine, autoflush=False)
+    with SyncSession() as db:
+        genre = Genre(name="Async Genre")
+        director = Director(first_name="Async", last_name="Director")
+        db.add_all([genre, director])
+        db.flush()
+        db.add_all(
+            [
+                Movie(
+                    title=f"Async Movie {i}",
+                    genre_id=genre.id,
+                    director_id=director.id,
+                    rating=float(i),
+                )
+                for i in range(3)
+            ]
+        )
+        crud_user.create(
+            db,
+            obj_in=UserCreate(username="async", email="async@me.com", password="pw"),
+        )
+        db.commit()
+    async_engine = create_async_db_engine(
+        f"sqlite+aiosqlite:///{path}", pool_class="null"
+    )
+    yield SyncSession, async_sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False
+    )
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+# Асинхронный CRUD выполняет запросы через настоящую AsyncSession и aiosqlite
+def test_async_crud_with_aiosqlite_session(database):
+    _, AsyncSessionLocal = database
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            movies = await async_crud_movie.get_multi(db, limit=10)
+            titles = [m.title for m in movies]
+            movie = await async_crud_movie.get(db, id=movies[0].id)
+            assert movie is movies[0]
+            user = await async_crud_user.get_by_username(db, username="async")
+            assert user.email == "async@me.com"
+            genre = await async_crud_genre.create(
+                db, obj_in=GenreCreate(name="Created Async")
+            )
+        async with AsyncSessionLocal() as db:
+            created = await async_crud_genre.get(db, id=genre.id)
+            return titles, created.name
+
+    titles, created = asyncio.run(scenario())
+    assert titles == [f"Async Movie {i}" for i in range(3)]
+    assert created == "Created Async"
+
+
+# Асинхронные эндпоинты каталога отвечают через AsyncSession без подмены на Session
+def test_async_endpoints_with_aiosqlite_session(database):
+    SyncSession, AsyncSessionLocal = database
+
+    def sync_db():
+        with SyncSession() as db:
+            yield db
+
+    async def async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    original_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides.update(
+        {
+            get_db: sync_db,
+            get_read_db: sync_db,
+            get_async_db: async_db,
+            get_async_read_db: async_db,
+        }
+    )
+    try:
+        with TestClient(app) as client:
+            movies = client.get(f"{settings.API_V1_STR}/movies/", params={"limit": 2})
+            assert movies.status_code == 200
+            assert [m["title"] for m in movies.json()] == [
+                "Async Movie 0",
+                "Async Movie 1",
+            ]
+            movie_id = movies.json()[0]["id"]
+            movie = client.get(f"{settings.API_V1_STR}/movies/{movie_id}")
+            assert movie.json()["genre"]["name"] == "Async Genre"
+            genres = client.get(f"{settings.API_V1_STR}/genres/")
+            assert [g["name"] for g in genres.json()] == ["Async Genre"]
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(original_overrides)
@@ -0,0 +1,61 @@
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.crud.genre import crud_genre
+from app.crud.movie import crud_movie
+from app.models.director import Director
+from app.models.movie import Movie
+from app.schemas.genre import GenreCreate
+
+
+def test_lru_eviction_and_ttl():
+    cache = TTLCache("test", maxsize=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b", None) is None
+    assert cache.get("a") == 1
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d", None) is None
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["expirations"] == 1
+    assert stats["hits"] == 2
+
+
+def test_stale_generation_is_not_stored():
+    cache = TTLCache("test", maxsize=10, ttl=None)
+    generation = cache.generation
+    cache.delete("a")
+    cache.set("a", "stale", generation=generation)
+    assert cache.get("a", None) is None
+
+
+def test_get_served_from_cache_and_invalidated(db: Session):
+    genre = crud_genre.create(db, obj_in=GenreCreate(name="Cached"))
+    first = crud_genre.get(db, id=genre.id)
+    misses = crud_genre.cache.misses
+    second = crud_genre.get(db, id=genre.id)
+    assert crud_genre.cache.misses == misses
+    assert second.name == first.name == "Cached"
+
+    updated = crud_genre.update(db, db_obj=second, obj_in={"name": "Renamed"})
+    assert updated.name == "Renamed"
+    assert crud_genre.get(db, id=genre.id).name == "Renamed"
+
+
+def test_genre_change_invalidates_movies(db: Session):
+    genre = crud_genre.create(db, obj_in=GenreCreate(name="Nested"))
+    director = Director(first_name="Cache", last_name="Director")
+    db.add(director)
+    db.flush()
+    movie = Movie(title="Cached movie", genre_id=genre.id, director_id=director.id)
+    db.add(movie)
+    db.commit()
+
+    assert crud_movie.get(db, id=movie.id).genre.name == "Nested"
+    assert crud_movie.get_multi(db)[0].genre.name == "Nested"
+    crud_genre.update(db, db_obj=genre, obj_in={"name": "Nested 2"})
+    assert crud_movie.get(db, id=movie.id).genre.name == "Nested 2"
+    assert crud_movie.get_multi(db)[0].genre.name == "Nested 2"
@@ -0,0 +1,109 @@
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.crud.movie import crud_movie
+from app.models.director import Director
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.schemas.movie import MovieCreate, MovieFilter, MovieUpdate
+
+
+def _seed(db: Session):
+    drama, comedy = Genre(name="Filter Drama"), Genre(name="Filter Comedy")
+    director = Director(first_name="Filter", last_name="Director")
+    db.add_all([drama, comedy, director])
+    db.flush()
+    movies = [
+        Movie(title="A", rating=8.0, duration=100, release_date=datetime(1995, 1, 1),
+              genre_id=drama.id, director_id=director.id),
+        Movie(title="B", rating=6.0, duration=130, release_date=datetime(2005, 1, 1),
+              genre_id=drama.id, director_id=director.id),
+        Movie(title="C", rating=9.0, duration=90, release_date=datetime(2015, 1, 1),
+              genre_id=comedy.id, director_id=director.id),
+    ]
+    db.add_all(movies)
+    db.commit()
+    return drama, comedy, movies
+
+
+def test_filters_are_combined(db: Session):
+    drama, comedy, movies = _seed(db)
+    result = crud_movie.get_multi(
+        db, filters=MovieFilter(genre_id=drama.id, min_rating=7.0)
+    )
+    assert [m.title for m in result] == ["A"]
+
+    result = crud_movie.get_multi(
+        db,
+        filters=MovieFilter(
+            released_from=datetime(2000, 1, 1), max_duration=120
+        ),
+    )
+    assert [m.title for m in result] == ["C"]
+
+
+def test_filters_with_sort(db: Session):
+    drama, comedy, movies = _seed(db)
+    result = crud_movie.get_multi(
+        db,
+        filters=MovieFilter(director_id=movies[0].director_id),
+        sort="rating",
+        order="desc",
+    )
+    assert [m.title for m in result] == ["C", "A", "B"]
+
+
+def _counts(facets: dict) -> dict:
+    return {
+        name: {value["name"]: value["count"] for value in values}
+        for name, values in facets.items()
+    }
+
+
+def test_facet_counts_are_maintained_incrementally(db: Session):
+    drama, comedy = Genre(name="Facet Drama"), Genre(name="Facet Comedy")
+    first = Director(first_name="Facet", last_name="First")
+    second = Director(first_name="Facet", last_name="Second")
+    db.add_all([drama, comedy, first, second])
+    db.commit()
+    movies = [
+        crud_movie.create(
+            db,
+            obj_in=MovieCreate(
+                title=title, rating=rating, genre_id=genre.id, director_id=director.id
+            ),
+        )
+        for title, rating, genre, director in [
+            ("A", 8.0, drama, first),
+            ("B", 6.0, drama, second),
+            ("C", 9.0, comedy, first),
+        ]
+    ]
+    crud_movie.update(
+        db, db_obj=movies[1], obj_in=MovieUpdate(title="B", genre_id=comedy.id)
+    )
+    crud_movie.update(db, db_obj=movies[2], obj_in={"rating": 7.0})
+    crud_movie.remove(db, id=movies[0].id)
+
+    facets = crud_movie.facets(db)
+    assert _counts(facets) == {
+        "genre": {"Facet Comedy": 2},
+        "director": {"Facet First": 1, "Facet Second": 1},
+    }
+    assert facets["genre"][0]["id"] == comedy.id
+    # Инкрементальные счётчики совпадают с полной перестройкой по таблице movies
+    crud_movie.rebuild_facets(db)
+    assert crud_movie.facets(db) == facets
+
+    # Фильтр по фасету не сужает его собственные значения, остальные фильтры — сужают
+    facets = crud_movie.facets(db, filters=MovieFilter(director_id=second.id))
+    assert _counts(facets) == {
+        "genre": {"Facet Comedy": 1},
+        "director": {"Facet First": 1, "Facet Second": 1},
+    }
+    facets = crud_movie.facets(db, filters=MovieFilter(min_rating=6.5), limit=1)
+    assert _counts(facets) == {
+        "genre": {"Facet Comedy": 1},
+        "director": {"Facet First": 1},
+    }
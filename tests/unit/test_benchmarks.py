@@ -0,0 +1,40 @@
+from sqlalchemy import func, select
+
+from app.models.favorite import Favorite
+from app.models.movie import Movie
+from benchmarks.datagen import (
+    create_bench_engine,
+    generate_catalog,
+    generate_favorites,
+    generate_users,
+)
+from benchmarks.suite import find_regressions, measure
+
+
+def _generate(path) -> list[tuple]:
+    engine = create_bench_engine(str(path))
+    generate_catalog(engine, movies=200, seed=7)
+    generate_users(engine, users=20, seed=7)
+    generate_favorites(engine, favorites=300, seed=7)
+    with engine.connect() as conn:
+        favorites = conn.execute(
+            select(Favorite.user_id, Favorite.movie_id).order_by(Favorite.id)
+        ).all()
+        total = conn.execute(select(func.sum(Movie.favorite_count))).scalar()
+    engine.dispose()
+    assert total == len(favorites) == 300
+    return favorites
+
+
+def test_datagen_is_deterministic(tmp_path):
+    assert _generate(tmp_path / "a.db") == _generate(tmp_path / "b.db")
+
+
+def test_measure_and_regressions():
+    stats = measure(lambda: None, repeat=5, warmup=1)
+    assert stats["rounds"] == 5
+    assert stats["min_ms"] <= stats["median_ms"] <= stats["p95_ms"]
+
+    baseline = {"a": {"median_ms": 1.0}, "b": {"median_ms": 2.0}}
+    results = {"a": {"median_ms": 1.1}, "b": {"median_ms": 3.0}, "c": {"median_ms": 9}}
+    assert find_regressions(results, baseline, 1.25) == [("b", 1.5)]
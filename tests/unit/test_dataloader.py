@@ -0,0 +1,72 @@
+import asyncio
+import gc
+
+import pytest
+
+from app.core.dataloader import DataLoader
+
+
+def test_concurrent_loads_are_batched_and_cached():
+    calls = []
+
+    async def batch_load(keys):
+        calls.append(keys)
+        return [key * 10 if key != 3 else None for key in keys]
+
+    async def scenario():
+        loader = DataLoader(batch_load)
+        first = await asyncio.gather(loader.load(1), loader.load(2), loader.load(1))
+        second = await loader.load_many([2, 3])
+        return loader, first, second
+
+    loader, first, second = asyncio.run(scenario())
+    assert first == [10, 20, 10]
+    assert second == [20, None]
+    # Ключ 2 взят из результатов первого пакета
+    assert calls == [[1, 2], [3]]
+    assert loader.batches == 2
+
+
+def test_batch_errors_are_not_cached():
+    attempts = []
+
+    async def batch_load(keys):
+        attempts.append(keys)
+        if len(attempts) == 1:
+            raise RuntimeError("db is down")
+        return keys
+
+    async def scenario():
+        loader = DataLoader(batch_load)
+        with pytest.raises(RuntimeError):
+            await loader.load_many([1, 2])
+        return await loader.load_many([1, 2])
+
+    assert asyncio.run(scenario()) == [1, 2]
+    assert attempts == [[1, 2], [1, 2]]
+
+
+# Загрузчик держит ссылку на выполняющийся пакет: сборка мусора во время ожидания
+# не теряет задачу и ожидающие её future
+def test_dispatch_task_survives_garbage_collection():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def batch_load(keys):
+            await release.wait()
+            return keys
+
+        loader = DataLoader(batch_load)
+        future = loader.load(1)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert len(loader._tasks) == 1
+        gc.collect()
+        release.set()
+        value = await asyncio.wait_for(future, timeout=1)
+        await asyncio.sleep(0)
+        return value, loader
+
+    value, loader = asyncio.run(scenario())
+    assert value == 1
+    assert loader._tasks == set()
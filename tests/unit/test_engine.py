@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.engine import create_db_engine, pool_stats
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert (
+            conn.execute(text("PRAGMA busy_timeout")).scalar()
+            == settings.SQLITE_BUSY_TIMEOUT
+        )
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    stats = pool_stats(engine)
+    assert stats["pool"] == "QueuePool"
+    assert stats["checkedout"] == 0
+    engine.dispose()
+
+
+def test_read_only_engine_rejects_writes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    writer = create_db_engine(url)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    reader = create_db_engine(url, pool_class="static", read_only=True)
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+        try:
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+        except Exception as e:
+            assert "readonly" in str(e).lower()
+        else:
+            raise AssertionError("write on a read-only engine succeeded")
+    writer.dispose()
+    reader.dispose()
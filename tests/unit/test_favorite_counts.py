@@ -0,0 +1,46 @@
+from sqlalchemy import inspect, text
+
+from app.db.engine import create_db_engine
+from app.db.favorite_counts import ensure_favorite_counts
+
+
+# База, созданная до счётчиков избранного: колонка, индексы и значения появляются
+# при запуске, повторное добавление фильма в избранное удаляется
+def test_ensure_favorite_counts_upgrades_old_database(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE movies (id INTEGER PRIMARY KEY, title VARCHAR, "
+                "genre_id INTEGER, director_id INTEGER, updated_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE favorites "
+                "(id INTEGER PRIMARY KEY, user_id INTEGER, movie_id INTEGER)"
+            )
+        )
+        conn.execute(text("INSERT INTO movies (id, title) VALUES (1, 'A'), (2, 'B')"))
+        conn.execute(
+            text(
+                "INSERT INTO favorites (user_id, movie_id) "
+                "VALUES (1, 1), (2, 1), (2, 1), (1, 2)"
+            )
+        )
+
+    with engine.begin() as conn:
+        assert ensure_favorite_counts(conn) is True
+    with engine.begin() as conn:
+        assert ensure_favorite_counts(conn) is False
+        counts = conn.execute(
+            text("SELECT id, favorite_count FROM movies ORDER BY id")
+        ).all()
+        assert counts == [(1, 2), (2, 1)]
+        inspector = inspect(conn)
+        assert {"ix_movies_favorite_count", "ix_movies_genre_id_favorite_count"} <= {
+            index["name"] for index in inspector.get_indexes("movies")
+        }
+        (unique,) = inspector.get_indexes("favorites")
+        assert unique["name"] == "ix_favorites_user_id_movie_id" and unique["unique"]
+    engine.dispose()
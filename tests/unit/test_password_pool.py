@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.core import security
+from app.core.password_pool import PasswordHasherPool, PasswordPoolBusyError
+
+
+def test_hash_and_verify_in_worker_process():
+    pool = PasswordHasherPool(workers=1, max_queue=4, retry_after=1)
+
+    async def scenario():
+        hashed = await pool.hash("secret")
+        return hashed, await pool.verify("secret", hashed), await pool.verify("x", hashed)
+
+    try:
+        hashed, ok, wrong = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert security.verify_password("secret", hashed)
+    assert ok and not wrong
+    stats = pool.stats()
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+
+
+def test_full_queue_is_rejected():
+    pool = PasswordHasherPool(workers=1, max_queue=0, retry_after=7)
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.hash("one"))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordPoolBusyError) as exc_info:
+            await pool.hash("two")
+        await first
+        return exc_info.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert error.retry_after == 7
+    assert pool.stats()["rejected"] == 1
+
+
+# Ошибка задачи учитывается как failed, а не как completed
+def test_failed_jobs_are_counted_separately():
+    pool = PasswordHasherPool(workers=1, max_queue=4, retry_after=1)
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await pool.verify("secret", "not a bcrypt hash")
+
+    try:
+        asyncio.run(scenario())
+        hashed = pool.hash_blocking("secret")
+    finally:
+        pool.shutdown()
+    assert security.verify_password("secret", hashed)
+    stats = pool.stats()
+    assert (stats["completed"], stats["failed"], stats["in_flight"]) == (1, 1, 0)
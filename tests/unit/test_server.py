@@ -0,0 +1,116 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.db.base_class import Base
+from app.db.engine import create_db_engine
+from app.server import main
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _pids(url: str, requests: int = 8) -> set[int]:
+    # Новое соединение на каждый запрос, чтобы запросы распределялись по воркерам
+    return {httpx.get(url + "/health").json()["pid"] for _ in range(requests)}
+
+
+def _wait(predicate, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = predicate()
+            if result:
+                return result
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("condition not reached")
+
+
+@pytest.fixture
+def start_server(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'server.db'}"
+    engine = create_db_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    servers = []
+
+    def start(*args: str):
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.server", "--host", "127.0.0.1"]
+            + ["--port", str(port), "--log-level", "warning", "--no-access-log"]
+            + list(args),
+            cwd=PROJECT_ROOT,
+            env=dict(os.environ, DATABASE_URL=database_url),
+        )
+        servers.append(server)
+        url = f"http://127.0.0.1:{port}"
+        _wait(lambda: httpx.get(url + "/ready").status_code == 200)
+        return server, url
+
+    yield start
+    for server in servers:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
+
+
+# SIGHUP заменяет всех воркеров по одному без отказов, SIGTERM завершает мастер
+def test_rolling_reload_and_graceful_stop(start_server):
+    server, url = start_server("--workers", "2")
+    before = _pids(url)
+
+    server.send_signal(signal.SIGHUP)
+    # Во время замены каждый запрос обслуживается старым или новым воркером
+    after = _wait(lambda: (pids := _pids(url)).isdisjoint(before) and pids)
+    assert len(after) <= 2
+    assert httpx.get(url + "/ready").json()["status"] == "ready"
+
+    server.send_signal(signal.SIGTERM)
+    assert server.wait(timeout=30) == 0
+
+
+# Без preload воркер заново импортирует приложение, в том числе модули, уже
+# загруженные мастером, и SIGHUP заменяет его новым
+def test_no_preload_workers_import_app_themselves(start_server):
+    server, url = start_server("--workers", "1", "--no-preload")
+    before = _pids(url, requests=2)
+    server.send_signal(signal.SIGHUP)
+    _wait(lambda: _pids(url, requests=2).isdisjoint(before))
+    assert httpx.get(url + "/ready").json()["status"] == "ready"
+
+    server.send_signal(signal.SIGTERM)
+    assert server.wait(timeout=30) == 0
+
+
+# Воркер перезапускается после --max-requests запросов
+def test_worker_recycled_after_max_requests(start_server):
+    server, url = start_server("--workers", "1", "--max-requests", "5")
+    first = httpx.get(url + "/health").json()["pid"]
+    _wait(lambda: httpx.get(url + "/health").json()["pid"] != first)
+
+    server.send_signal(signal.SIGTERM)
+    assert server.wait(timeout=30) == 0
+
+
+# Очередь отложенной записи избранного не разделяется между воркерами
+def test_write_behind_refuses_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "FAVORITES_WRITE_BEHIND", True)
+    with pytest.raises(SystemExit) as exited:
+        main(["--workers", "2"])
+    assert exited.value.code == 2